@@ -0,0 +1 @@
+"""Performance-oriented companions for the scrapy APIs under test."""
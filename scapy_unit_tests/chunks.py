@@ -0,0 +1,127 @@
+"""Chunked reading of files and buffers, memory-mapped or in memory, and
+decompressed if gzipped"""
+
+import mmap
+import os
+import typing
+import zlib
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+Buffer = typing.Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def map_chunks(
+    path: typing.Union[str, os.PathLike], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Generator[bytes, None, None]:
+    """Memory-maps a file and yields its (decompressed) chunks, as
+    buffer_chunks does."""
+    with open(path, "rb") as file:
+        # Empty files can't be mapped.
+        if not os.fstat(file.fileno()).st_size:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from buffer_chunks(mapped, chunk_size)
+
+
+def buffer_chunks(
+    buffer: Buffer, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Generator[bytes, None, None]:
+    """Yields the chunks of an in-memory or mapped buffer, decompressed if it
+    starts with the gzip magic number. The compressed chunks are views of
+    the buffer, instead of copies."""
+    mapped = buffer if isinstance(buffer, mmap.mmap) else None
+    with memoryview(buffer) as view:
+        chunks = split_view(view, chunk_size, mapped)
+        if view[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+            yield from gunzip(chunks, chunk_size)
+        else:
+            yield from map(bytes, chunks)
+
+
+def split_view(
+    view: memoryview,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mapped: typing.Optional[mmap.mmap] = None,
+) -> typing.Generator[memoryview, None, None]:
+    """Splits a buffer view into views of chunks of a given size.
+
+    If the buffer is mapped, the pages of each chunk are released once the
+    next one is requested, so that the already read part of the file does
+    not remain in the resident memory.
+    """
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size]
+        yield chunk
+
+        if mapped is not None and hasattr(mmap, "MADV_DONTNEED"):
+            # The released range must start on a page boundary.
+            page_start = start - start % mmap.PAGESIZE
+            mapped.madvise(
+                mmap.MADV_DONTNEED, page_start, start + len(chunk) - page_start
+            )
+
+
+def split_buffer(
+    buffer: Buffer,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Generator[bytes, None, None]:
+    """Splits an in-memory buffer into chunks of a given size."""
+    yield from map(bytes, split_view(memoryview(buffer), chunk_size))
+
+
+def read_chunks(
+    file: typing.BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Generator[bytes, None, None]:
+    """Reads a binary file in chunks of a given size."""
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+def maybe_gunzip(
+    chunks: typing.Iterable[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Generator[bytes, None, None]:
+    """Decompresses the chunks if they start with the gzip magic number."""
+    iterator = iter(chunks)
+
+    head = b""
+    for chunk in iterator:
+        head += chunk
+        if len(head) >= len(GZIP_MAGIC):
+            break
+
+    if head.startswith(GZIP_MAGIC):
+        yield from gunzip(_prepend(head, iterator), chunk_size)
+    else:
+        yield from _prepend(head, iterator)
+
+
+def gunzip(
+    chunks: typing.Iterable[typing.Union[bytes, memoryview]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Generator[bytes, None, None]:
+    """Incrementally decompresses a (multi-member) gzip stream, without
+    yielding chunks bigger than the given size."""
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk, chunk_size)
+
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+            else:
+                chunk = decompressor.unconsumed_tail
+
+    yield decompressor.flush()
+
+
+def _prepend(
+    head: bytes, chunks: typing.Iterator[bytes]
+) -> typing.Generator[bytes, None, None]:
+    if head:
+        yield head
+    yield from chunks
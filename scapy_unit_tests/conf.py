@@ -0,0 +1,79 @@
+"""Configuration helpers, mirroring scrapy.utils.conf"""
+
+import os
+import threading
+import typing
+
+from scrapy.utils import conf
+from scrapy.utils.conf import ConfigParser
+
+SourceStat = tuple[str, typing.Optional[int], typing.Optional[int]]
+SourceSignature = tuple[SourceStat, ...]
+
+
+def get_sources_signature(sources: list[str]) -> SourceSignature:
+    """Returns the path, modification time and size of each source file, the
+    last two being None for the missing files."""
+    signature: list[SourceStat] = []
+    for source in sources:
+        try:
+            stat = os.stat(source)
+        except OSError:
+            signature.append((source, None, None))
+        else:
+            signature.append((source, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(signature)
+
+
+class ConfigCache:
+    """Merged configurations of the scrapy.cfg sources, reused while none of
+    the source files is created, removed or modified.
+
+    A modification keeping both the size and the modification time of a file
+    (on a file system with a coarse time resolution) is not detected, so the
+    cache can also be invalidated explicitly.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[
+            tuple[str, ...], tuple[SourceSignature, ConfigParser]
+        ] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, use_closest: bool = True) -> ConfigParser:
+        sources = conf.get_sources(use_closest)
+        key = tuple(sources)
+        signature = get_sources_signature(sources)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        config = ConfigParser()
+        config.read(sources)
+        with self._lock:
+            self._entries[key] = (signature, config)
+
+        return config
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+config_cache = ConfigCache()
+
+
+def get_config(use_closest: bool = True) -> ConfigParser:
+    """Gets the Scrapy configuration as a ConfigParser, as get_config does,
+    but reusing the last one parsed from unchanged sources.
+
+    The returned configuration is shared by the callers, so it must not be
+    modified.
+    """
+    return config_cache.get(use_closest)
@@ -0,0 +1,160 @@
+"""Crawlers, mirroring scrapy.crawler"""
+
+import datetime
+import multiprocessing
+import multiprocessing.connection
+import numbers
+import os
+import typing
+
+from scrapy.crawler import CrawlerProcess
+
+from scapy_unit_tests.frontier import Frontier, FrontierBroker, FrontierClient
+
+BASE_DUPEFILTER = "scrapy.dupefilters.BaseDupeFilter"
+MAXIMUM_STATS_SUFFIXES = ("max", "elapsed_time_seconds")
+SHARDED_SCHEDULER = "scapy_unit_tests.scheduler.ShardedScheduler"
+
+
+def merge_stats(shard_stats: typing.Iterable[dict]) -> dict:
+    """Returns the stats of the shards of a crawl merged together: the start
+    times are the earliest, the other times, the maxima and the elapsed times
+    are the largest, the other numbers are summed, and the other values are
+    the ones of the first shard having them."""
+    merged_stats: dict = {}
+    for stats in shard_stats:
+        for key, value in stats.items():
+            if key not in merged_stats:
+                merged_stats[key] = value
+            elif isinstance(value, datetime.datetime):
+                merged_stats[key] = (
+                    min(merged_stats[key], value)
+                    if key.endswith("start_time")
+                    else max(merged_stats[key], value)
+                )
+            elif not isinstance(value, numbers.Real) or isinstance(
+                value, bool
+            ):
+                continue
+            elif key.endswith(MAXIMUM_STATS_SUFFIXES):
+                merged_stats[key] = max(merged_stats[key], value)
+            else:
+                merged_stats[key] += value
+
+    return merged_stats
+
+
+def _start_requests_of_other_shards(spider: typing.Any) -> typing.Iterator:
+    return iter(())
+
+
+def _crawl_shard(
+    settings: dict,
+    spidercls: type,
+    args: tuple,
+    kwargs: dict,
+) -> None:
+    # Runs in the process of the shard
+    if settings["FRONTIER_SHARD"]:
+        # The start requests are scheduled by the first shard only.
+        spidercls = type(
+            spidercls.__name__,
+            (spidercls,),
+            {"start_requests": _start_requests_of_other_shards},
+        )
+
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(spidercls)
+    process.crawl(crawler, *args, **kwargs)
+    process.start()
+
+    frontier = FrontierClient(
+        settings["FRONTIER_ADDRESS"], settings["FRONTIER_AUTHKEY"]
+    )
+    frontier.report_stats(
+        settings["FRONTIER_SHARD"], crawler.stats.get_stats()
+    )
+    frontier.close()
+
+
+class ShardedCrawlerProcess:
+    """Process crawling a spider with several processes, the shards, each
+    running its own CrawlerProcess and reactor.
+
+    The shards share a frontier, served by a broker in this process: each
+    host is crawled by a single shard, and each request is crawled once over
+    all the shards (unless not filtered). Once the crawl is finished, the
+    stats of the shards are available in shard_stats, and merged in stats.
+
+    The shards are forked, so that they can crawl spiders defined in any
+    module, including __main__, and no reactor must be installed in this
+    process beforehand.
+    """
+
+    def __init__(
+        self,
+        settings: typing.Optional[dict] = None,
+        shards: typing.Optional[int] = None,
+    ) -> None:
+        self.settings = dict(settings or {})
+        self.shards = shards or os.cpu_count() or 1
+        self.stats: dict = {}
+        self.shard_stats: list[dict] = []
+        self._crawl_args: typing.Optional[tuple[type, tuple, dict]] = None
+
+    def crawl(
+        self, spidercls: type, *args: typing.Any, **kwargs: typing.Any
+    ) -> None:
+        self._crawl_args = (spidercls, args, kwargs)
+
+    def start(self) -> None:
+        if self._crawl_args is None:
+            raise ValueError("No spider to crawl")
+
+        frontier = Frontier(self.shards)
+        broker = FrontierBroker(frontier)
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(
+                target=_crawl_shard,
+                args=(
+                    {
+                        **self.settings,
+                        "SCHEDULER": SHARDED_SCHEDULER,
+                        # The requests are deduplicated by the frontier.
+                        "DUPEFILTER_CLASS": BASE_DUPEFILTER,
+                        "FRONTIER_ADDRESS": broker.address,
+                        "FRONTIER_AUTHKEY": broker.authkey,
+                        "FRONTIER_SHARD": shard,
+                    },
+                    *self._crawl_args,
+                ),
+            )
+            for shard in range(self.shards)
+        ]
+        # The processes are forked before the broker starts its threads.
+        for process in processes:
+            process.start()
+        broker.start()
+
+        try:
+            running_processes = {
+                process.sentinel: (shard, process)
+                for shard, process in enumerate(processes)
+            }
+            while running_processes:
+                for sentinel in multiprocessing.connection.wait(
+                    list(running_processes)
+                ):
+                    shard, process = running_processes.pop(
+                        typing.cast(int, sentinel)
+                    )
+                    process.join()
+                    # Closes the shard if its process failed to do it, so
+                    # that the other ones don't wait for it.
+                    frontier.close_shard(shard)
+        finally:
+            broker.close()
+
+        self.shard_stats = frontier.shard_stats()
+        self.stats = merge_stats(self.shard_stats)
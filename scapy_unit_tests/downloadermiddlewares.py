@@ -0,0 +1,227 @@
+"""Downloader middlewares, mirroring scrapy.downloadermiddlewares"""
+
+import copy
+import logging
+import pickle
+import typing
+
+from scrapy.core.downloader import Slot
+from scrapy.downloadermiddlewares.robotstxt import RobotsTxtMiddleware
+from scrapy.http import Request, Response
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet.defer import Deferred
+
+from scapy_unit_tests.offloading import deferred_from_future, get_parser_pool
+from scapy_unit_tests.robotstxt import RobotParser, RobotsCache, robots_cache
+from scapy_unit_tests.spiders import (
+    DEFAULT_SITEMAP_CONCURRENCY_PER_HOST,
+    SITEMAP_SLOT_PREFIX,
+)
+
+# Has a rule, as the empty parsers of some backends can be pickled
+PICKLING_CHECK_ROBOTSTXT = b"User-agent: *\nDisallow: /"
+
+logger = logging.getLogger(__name__)
+
+
+class CachedRobotsTxtMiddleware(RobotsTxtMiddleware):
+    """RobotsTxtMiddleware reusing the robots.txt objects already parsed by
+    the other crawlers of the process.
+
+    The objects are kept in a process-wide RobotsCache, keyed by host, user
+    agent and parser backend. Its size and TTL can be changed with the
+    ROBOTSTXT_CACHE_SIZE and ROBOTSTXT_CACHE_TTL settings of the first
+    crawler of the process, the different values of the next ones being
+    ignored with a warning. A robots.txt that is still downloaded by a
+    crawler is awaited by the others instead of being requested again.
+
+    The cached objects are copies not referencing the spider which
+    downloaded them, so that it is not kept alive by the cache, while the
+    crawler parsing a robots.txt keeps using its own object.
+    """
+
+    cache: RobotsCache = robots_cache
+    _downloading: dict[typing.Hashable, Deferred] = {}
+
+    def __init__(self, crawler: typing.Any) -> None:
+        super().__init__(crawler)
+
+        settings = crawler.settings
+        maxsize = settings.get("ROBOTSTXT_CACHE_SIZE")
+        ttl = settings.get("ROBOTSTXT_CACHE_TTL")
+        if not self.cache.configure(
+            None if maxsize is None else int(maxsize),
+            None if ttl is None else float(ttl),
+        ):
+            logger.warning(
+                (
+                    "The robots.txt cache is shared by the crawlers of the"
+                    " process and was configured by the first one, so"
+                    " ROBOTSTXT_CACHE_SIZE=%(maxsize)s and"
+                    " ROBOTSTXT_CACHE_TTL=%(ttl)s are ignored in favour of"
+                    " %(cache_maxsize)s and %(cache_ttl)s"
+                ),
+                {
+                    "maxsize": maxsize,
+                    "ttl": ttl,
+                    "cache_maxsize": self.cache.maxsize,
+                    "cache_ttl": self.cache.ttl,
+                },
+            )
+
+    def robot_parser(self, request: Request, spider: typing.Any) -> typing.Any:
+        netloc = urlparse_cached(request).netloc
+
+        if netloc not in self._parsers:
+            key = self._cache_key(netloc)
+            parser = self.cache.get(key)
+
+            if parser is not None:
+                self._parsers[netloc] = parser
+                self.crawler.stats.inc_value("robotstxt/cache_hit_count")
+            elif key in self._downloading:
+                self._parsers[netloc] = self._await_download(key, netloc)
+                self.crawler.stats.inc_value("robotstxt/cache_hit_count")
+            else:
+                self.crawler.stats.inc_value("robotstxt/cache_miss_count")
+                result = super().robot_parser(request, spider)
+
+                # The download may have already failed, synchronously.
+                if isinstance(self._parsers[netloc], Deferred):
+                    self._downloading[key] = self._parsers[netloc]
+
+                return result
+
+        return super().robot_parser(request, spider)
+
+    def _parse_robots(
+        self, response: Response, netloc: str, spider: typing.Any
+    ) -> None:
+        key = self._cache_key(netloc)
+        self._downloading.pop(key, None)
+
+        super()._parse_robots(response, netloc, spider)
+
+        shared_parser = copy.copy(self._parsers[netloc])
+        shared_parser.spider = None
+        self.cache.set(key, shared_parser)
+
+    def _robots_error(self, failure: typing.Any, netloc: str) -> None:
+        self._downloading.pop(self._cache_key(netloc), None)
+
+        super()._robots_error(failure, netloc)
+
+    def _await_download(self, key: typing.Hashable, netloc: str) -> Deferred:
+        result: Deferred = Deferred()
+
+        def share(parser: typing.Optional[RobotParser]) -> typing.Any:
+            self._parsers[netloc] = parser
+            result.callback(parser)
+
+            return parser
+
+        self._downloading[key].addCallback(share)
+
+        return result
+
+    def _cache_key(self, netloc: str) -> typing.Hashable:
+        user_agent = self._robotstxt_useragent or self._default_useragent
+
+        return (netloc, user_agent, self._parserimpl)
+
+
+class OffloadedRobotsTxtMiddleware(RobotsTxtMiddleware):
+    """RobotsTxtMiddleware parsing the robots.txt files in the pool of
+    PARSER_POOL_PROCESSES processes, out of the reactor thread.
+
+    The parsed objects are pickled back from the pool, so a parser backend
+    set by ROBOTSTXT_PARSER which can't be pickled, as the default
+    ProtegoRobotParser, is still run in the reactor thread, with a warning.
+    PythonRobotParser and CompiledRobotParser can be offloaded.
+    """
+
+    def __init__(self, crawler: typing.Any) -> None:
+        super().__init__(crawler)
+
+        try:
+            pickle.dumps(self._parserimpl(PICKLING_CHECK_ROBOTSTXT, None))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            logger.warning(
+                (
+                    "The robots.txt parser %(parser)s can't be pickled, so it"
+                    " is not offloaded to the parser pool"
+                ),
+                {"parser": self._parserimpl.__name__},
+            )
+            self.offloaded = False
+        else:
+            self.offloaded = True
+
+    def _parse_robots(
+        self, response: Response, netloc: str, spider: typing.Any
+    ) -> typing.Optional[Deferred]:
+        if not self.offloaded:
+            return super()._parse_robots(response, netloc, spider)
+
+        self.crawler.stats.inc_value("robotstxt/response_count")
+        self.crawler.stats.inc_value(
+            f"robotstxt/response_status_count/{response.status}"
+        )
+
+        pool = get_parser_pool(
+            self.crawler.settings.getint("PARSER_POOL_PROCESSES")
+        )
+        dfd = deferred_from_future(
+            pool.parse_robots(self._parserimpl, response.body)
+        )
+
+        def set_parser(parser: RobotParser) -> None:
+            parser.spider = spider  # type: ignore[attr-defined]
+
+            parser_dfd = self._parsers[netloc]
+            self._parsers[netloc] = parser
+            parser_dfd.callback(parser)
+
+        return dfd.addCallback(set_parser)
+
+
+class SitemapSlotMiddleware:
+    """Downloader middleware creating the download slots of the sitemaps of
+    FanOutSitemapSpider, with SITEMAP_CONCURRENCY_PER_HOST concurrent
+    requests.
+
+    The downloader would create them with the concurrency of the pages, so
+    they are created right before it looks them up, including when they are
+    created again after being collected for being idle.
+    """
+
+    def __init__(self, crawler: typing.Any) -> None:
+        self.crawler = crawler
+
+        settings = crawler.settings
+        self.concurrency = settings.getint(
+            "SITEMAP_CONCURRENCY_PER_HOST",
+            DEFAULT_SITEMAP_CONCURRENCY_PER_HOST,
+        )
+        self.randomize_delay = settings.getbool("RANDOMIZE_DOWNLOAD_DELAY")
+
+    @classmethod
+    def from_crawler(cls, crawler: typing.Any) -> "SitemapSlotMiddleware":
+        return cls(crawler)
+
+    def process_request(self, request: Request, spider: typing.Any) -> None:
+        key = request.meta.get("download_slot")
+        if not isinstance(key, str) or not key.startswith(SITEMAP_SLOT_PREFIX):
+            return
+
+        slots = self.crawler.engine.downloader.slots
+        if key not in slots:
+            slots[key] = Slot(
+                self.concurrency,
+                getattr(
+                    spider,
+                    "download_delay",
+                    self.crawler.settings.getfloat("DOWNLOAD_DELAY"),
+                ),
+                self.randomize_delay,
+            )
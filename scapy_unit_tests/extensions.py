@@ -0,0 +1,317 @@
+"""Extensions, mirroring scrapy.extensions"""
+
+import functools
+import inspect
+import time
+import typing
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.utils.defer import defer_succeed
+from scrapy.utils.misc import warn_on_generator_with_return_value
+from scrapy.utils.spider import iterate_spider_output
+from twisted.internet import task
+from twisted.internet.defer import Deferred
+
+from scapy_unit_tests.metrics import (
+    DEPTH_BUCKETS,
+    HistogramFamily,
+    format_prometheus,
+)
+
+DEFAULT_LAG_INTERVAL = 0.05
+MIDDLEWARE_METHODS = (
+    "process_request",
+    "process_response",
+    "process_exception",
+)
+STATS_PREFIX = "instrumentation/"
+
+
+class CrawlInstrumentation:
+    """Extension recording histograms of where the time of a crawl goes.
+
+    The recorded metrics are:
+    - the lag of the event loop, measured every INSTRUMENTATION_LAG_INTERVAL
+        seconds as the delay of a call scheduled by the reactor;
+    - the number of requests queued in the downloader slots, sampled at the
+        same time;
+    - the time spent in each spider callback, including the iteration of the
+        generators it returns and the steps of its coroutines and
+        asynchronous generators, but not the time they wait for;
+    - the time spent in each method of the downloader middlewares, excluding
+        the Deferreds and coroutines they return.
+
+    It is enabled by INSTRUMENTATION_ENABLED. The histograms are summarized
+    in the stats when the spider is closed, and written in the Prometheus
+    text format to the INSTRUMENTATION_PROMETHEUS_FILE file, if set.
+    """
+
+    def __init__(self, crawler: typing.Any) -> None:
+        settings = crawler.settings
+        if not settings.getbool("INSTRUMENTATION_ENABLED"):
+            raise NotConfigured
+
+        self.crawler = crawler
+        self.lag_interval = settings.getfloat(
+            "INSTRUMENTATION_LAG_INTERVAL", DEFAULT_LAG_INTERVAL
+        )
+        self.prometheus_file = settings.get("INSTRUMENTATION_PROMETHEUS_FILE")
+
+        self.loop_lag = HistogramFamily(
+            "scrapy_loop_lag_seconds",
+            "Delay of the calls scheduled by the reactor.",
+        )
+        self.queue_depth = HistogramFamily(
+            "scrapy_downloader_queue_depth",
+            "Number of requests queued in the downloader slots.",
+            DEPTH_BUCKETS,
+        )
+        self.callback_time = HistogramFamily(
+            "scrapy_spider_callback_seconds",
+            "Time spent in the spider callbacks.",
+        )
+        self.middleware_time = HistogramFamily(
+            "scrapy_downloader_middleware_seconds",
+            "Time spent in the methods of the downloader middlewares.",
+        )
+
+        self._lag_task: typing.Optional[task.LoopingCall] = None
+        self._call_spider: typing.Callable[..., Deferred]
+        self._last_tick = 0.0
+
+        crawler.signals.connect(
+            self.spider_opened, signal=signals.spider_opened
+        )
+        crawler.signals.connect(
+            self.spider_closed, signal=signals.spider_closed
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler: typing.Any) -> "CrawlInstrumentation":
+        return cls(crawler)
+
+    @property
+    def families(self) -> list[HistogramFamily]:
+        return [
+            self.loop_lag,
+            self.queue_depth,
+            self.callback_time,
+            self.middleware_time,
+        ]
+
+    def spider_opened(self, spider: typing.Any) -> None:
+        engine = self.crawler.engine
+        self._instrument_middlewares(engine.downloader.middleware)
+        # Shadows the method on the instance, as the scraper calls it
+        self._call_spider = engine.scraper.call_spider
+        engine.scraper.call_spider = self._call_timed_spider
+
+        self._last_tick = time.perf_counter()
+        self._lag_task = task.LoopingCall(self._tick)
+        self._lag_task.start(self.lag_interval, now=False)
+
+    def spider_closed(self, spider: typing.Any) -> None:
+        if self._lag_task is not None and self._lag_task.running:
+            self._lag_task.stop()
+
+        stats = self.crawler.stats
+        for family in self.families:
+            for labels, histogram in family.histograms.items():
+                key = (
+                    STATS_PREFIX
+                    + family.name
+                    + "".join(f"/{value}" for _, value in labels)
+                )
+                stats.set_value(key, histogram.as_dict(), spider=spider)
+
+        if self.prometheus_file:
+            with open(self.prometheus_file, "w", encoding="utf-8") as file:
+                file.write(self.prometheus_text())
+
+    def prometheus_text(self) -> str:
+        return format_prometheus(self.families)
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        self.loop_lag.labels().observe(
+            max(now - self._last_tick - self.lag_interval, 0.0)
+        )
+        self._last_tick = now
+
+        slots = self.crawler.engine.downloader.slots
+        self.queue_depth.labels().observe(
+            sum(len(slot.queue) for slot in slots.values())
+        )
+
+    def _instrument_middlewares(self, manager: typing.Any) -> None:
+        for name in MIDDLEWARE_METHODS:
+            methods = manager.methods[name]
+            for index, method in enumerate(methods):
+                histogram = self.middleware_time.labels(
+                    middleware=type(method.__self__).__name__, method=name
+                )
+                methods[index] = self._timed(method, histogram)
+
+    @staticmethod
+    def _timed(
+        method: typing.Callable, histogram: typing.Any
+    ) -> typing.Callable:
+        @functools.wraps(method)
+        def timed_method(
+            *args: typing.Any, **kwargs: typing.Any
+        ) -> typing.Any:
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return timed_method
+
+    def _call_timed_spider(
+        self, result: typing.Any, request: typing.Any, spider: typing.Any
+    ) -> Deferred:
+        # Mirrors Scraper.call_spider, with a timed callback
+        if not isinstance(result, Response):
+            return self._call_spider(result, request, spider)
+
+        if getattr(result, "request", None) is None:
+            result.request = request
+        callback = result.request.callback or spider._parse
+        warn_on_generator_with_return_value(spider, callback)
+
+        name = get_callback_name(result.request.callback)
+
+        dfd = defer_succeed(result)
+        dfd.addCallbacks(
+            callback=self._timed_callback(callback, name),
+            callbackKeywords=result.request.cb_kwargs,
+        )
+
+        return dfd.addCallback(iterate_spider_output)
+
+    def _timed_callback(
+        self, callback: typing.Callable, name: str
+    ) -> typing.Callable:
+        histogram = self.callback_time.labels(callback=name)
+
+        def timed_callback(
+            *args: typing.Any, **kwargs: typing.Any
+        ) -> typing.Any:
+            start = time.perf_counter()
+            try:
+                output = callback(*args, **kwargs)
+            except BaseException:
+                histogram.observe(time.perf_counter() - start)
+                raise
+            elapsed = time.perf_counter() - start
+
+            if inspect.isgenerator(output):
+                return self._timed_output(output, histogram, elapsed)
+            if inspect.iscoroutine(output):
+                return self._timed_coroutine(output, histogram, elapsed)
+            if inspect.isasyncgen(output):
+                return self._timed_async_output(output, histogram, elapsed)
+
+            histogram.observe(elapsed)
+            return output
+
+        return timed_callback
+
+    @staticmethod
+    def _timed_output(
+        output: typing.Generator, histogram: typing.Any, elapsed: float
+    ) -> typing.Generator:
+        # The callback runs while its generator is iterated.
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(output)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+
+                yield item
+        finally:
+            output.close()
+            histogram.observe(elapsed)
+
+    @staticmethod
+    async def _timed_coroutine(
+        output: typing.Coroutine, histogram: typing.Any, elapsed: float
+    ) -> typing.Any:
+        steps = _TimedSteps(output, elapsed)
+        try:
+            return await steps
+        finally:
+            histogram.observe(steps.elapsed)
+
+    @staticmethod
+    async def _timed_async_output(
+        output: typing.AsyncGenerator, histogram: typing.Any, elapsed: float
+    ) -> typing.AsyncGenerator:
+        # The callback runs while its generator is iterated.
+        try:
+            while True:
+                steps = _TimedSteps(output.__anext__(), elapsed)
+                try:
+                    item = await steps
+                except StopAsyncIteration:
+                    return
+                finally:
+                    elapsed = steps.elapsed
+
+                yield item
+        finally:
+            histogram.observe(elapsed)
+
+
+def get_callback_name(callback: typing.Optional[typing.Callable]) -> str:
+    """Returns the label of a request callback: the name of its function,
+    unwrapping the partial functions, or of its class for the other
+    callables. The default callback is labelled parse, as Spider._parse
+    calls the parse method."""
+    if callback is None:
+        return "parse"
+
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+
+    return getattr(callback, "__name__", type(callback).__name__)
+
+
+class _TimedSteps:
+    """Awaitable running another one step by step, and adding the time of
+    its steps to elapsed, without the time it waits for between them."""
+
+    def __init__(self, awaitable: typing.Awaitable, elapsed: float) -> None:
+        self.awaitable = awaitable
+        self.elapsed = elapsed
+
+    def __await__(
+        self,
+    ) -> typing.Generator[typing.Any, typing.Any, typing.Any]:
+        steps = typing.cast(typing.Generator, self.awaitable.__await__())
+        value: typing.Any = None
+        error: typing.Optional[BaseException] = None
+        while True:
+            start = time.perf_counter()
+            try:
+                if error is None:
+                    awaited = steps.send(value)
+                else:
+                    awaited = steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.elapsed += time.perf_counter() - start
+
+            # The awaited objects and their results go through unchanged.
+            try:
+                value, error = (yield awaited), None
+            except BaseException as thrown:
+                value, error = None, thrown
@@ -0,0 +1,227 @@
+"""Crawl frontier shared by the processes of a sharded crawl, served by a
+broker on a local socket"""
+
+import collections
+import os
+import threading
+import typing
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+
+# Host, fingerprint (None if the request is not filtered) and request, as
+# serialized by Request.to_dict
+PushedRequest = tuple[str, typing.Optional[bytes], dict]
+
+FRONTIER_METHODS = frozenset(
+    ("push", "pop", "finished", "close_shard", "report_stats")
+)
+
+
+class Frontier:
+    """Queues of the requests of each shard of a crawl, deduplicated by
+    their fingerprints.
+
+    Each host is assigned to a single shard, the open one with the fewest
+    hosts when the host is first seen, so that a single process downloads
+    from it and enforces its politeness settings.
+
+    A shard is idle once it polls the frontier while having no request in
+    progress, and until it pops requests. The crawl is finished when all the
+    shards are idle or closed, and their queues are empty. The requests
+    queued for a shard when it closes are routed to the open shards.
+    """
+
+    def __init__(self, shards: int) -> None:
+        self.shards = shards
+        self.shards_by_host: dict[str, int] = {}
+        self.filtered_count = 0
+        # Hosts and requests
+        self._queues: list[collections.deque[tuple[str, dict]]] = [
+            collections.deque() for _ in range(shards)
+        ]
+        self._seen: set[bytes] = set()
+        self._host_counts = [0] * shards
+        self._idle = [False] * shards
+        self._closed = [False] * shards
+        self._stats: dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def _shard_of(self, host: str) -> typing.Optional[int]:
+        # The hosts of the closed shards are assigned again.
+        shard = self.shards_by_host.get(host)
+        if shard is None or self._closed[shard]:
+            open_shards = [
+                shard
+                for shard, closed in enumerate(self._closed)
+                if not closed
+            ]
+            if not open_shards:
+                return None
+
+            shard = min(open_shards, key=self._host_counts.__getitem__)
+            self._host_counts[shard] += 1
+            self.shards_by_host[host] = shard
+
+        return shard
+
+    def push(self, requests: list[PushedRequest]) -> None:
+        with self._lock:
+            for host, fingerprint, request in requests:
+                if fingerprint is not None:
+                    if fingerprint in self._seen:
+                        self.filtered_count += 1
+                        continue
+                    self._seen.add(fingerprint)
+
+                shard = self._shard_of(host)
+                # The requests are dropped once all the shards are closed.
+                if shard is not None:
+                    self._queues[shard].append((host, request))
+
+    def pop(self, shard: int, count: int, idle: bool = False) -> list[dict]:
+        """Returns at most count requests of the shard, and marks it as idle
+        if there are none and it has no request in progress."""
+        with self._lock:
+            queue = self._queues[shard]
+            requests = [
+                queue.popleft()[1] for _ in range(min(count, len(queue)))
+            ]
+            if requests:
+                self._idle[shard] = False
+            elif idle:
+                self._idle[shard] = True
+
+            return requests
+
+    def finished(self) -> bool:
+        with self._lock:
+            return all(
+                closed or (idle and not queue)
+                for closed, idle, queue in zip(
+                    self._closed, self._idle, self._queues
+                )
+            )
+
+    def close_shard(self, shard: int) -> None:
+        with self._lock:
+            self._closed[shard] = True
+            queue = self._queues[shard]
+            while queue:
+                host, request = queue.popleft()
+                open_shard = self._shard_of(host)
+                # The requests are dropped once all the shards are closed.
+                if open_shard is not None:
+                    self._queues[open_shard].append((host, request))
+
+    def report_stats(self, shard: int, stats: dict) -> None:
+        with self._lock:
+            self._stats[shard] = stats
+
+    def shard_stats(self) -> list[dict]:
+        """Returns the stats reported by the shards, in their order."""
+        with self._lock:
+            return [self._stats.get(shard, {}) for shard in range(self.shards)]
+
+
+class FrontierBroker:
+    """Server exposing a frontier to the processes of a crawl, through a
+    local socket authenticated with a random key.
+
+    The connections are handled by threads, and the calls of the frontier
+    methods are serialized by its lock.
+    """
+
+    def __init__(self, frontier: Frontier) -> None:
+        self.frontier = frontier
+        self.authkey = os.urandom(32)
+        self._listener = Listener(
+            authkey=self.authkey, backlog=frontier.shards
+        )
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._closing = False
+
+    @property
+    def address(self) -> typing.Any:
+        return self._listener.address
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        self._closing = True
+        if self._thread.is_alive():
+            # Wakes up the thread waiting for a connection
+            Client(self.address, authkey=self.authkey).close()
+            self._thread.join()
+        self._listener.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Raised by the connections failing the authentication
+                continue
+
+            if self._closing:
+                connection.close()
+                return
+
+            threading.Thread(
+                target=self._serve, args=(connection,), daemon=True
+            ).start()
+
+    def _serve(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    name, args = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                if name not in FRONTIER_METHODS:
+                    connection.send(
+                        (False, ValueError(f"Unknown method: {name!r}"))
+                    )
+                    continue
+
+                try:
+                    result = getattr(self.frontier, name)(*args)
+                except Exception as error:
+                    connection.send((False, error))
+                else:
+                    connection.send((True, result))
+
+
+class FrontierClient:
+    """Connection of a process to the frontier served by a broker, calling
+    its methods remotely."""
+
+    def __init__(self, address: typing.Any, authkey: bytes) -> None:
+        self._connection = Client(address, authkey=authkey)
+
+    def push(self, requests: list[PushedRequest]) -> None:
+        self._call("push", requests)
+
+    def pop(self, shard: int, count: int, idle: bool = False) -> list[dict]:
+        return self._call("pop", shard, count, idle)
+
+    def finished(self) -> bool:
+        return self._call("finished")
+
+    def close_shard(self, shard: int) -> None:
+        self._call("close_shard", shard)
+
+    def report_stats(self, shard: int, stats: dict) -> None:
+        self._call("report_stats", shard, stats)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _call(self, name: str, *args: typing.Any) -> typing.Any:
+        self._connection.send((name, args))
+        succeeded, result = self._connection.recv()
+        if not succeeded:
+            raise result
+
+        return result
@@ -0,0 +1,188 @@
+"""FTP functions, mirroring scrapy.utils.ftp"""
+
+import collections
+import ftplib
+import posixpath
+import threading
+import time
+import typing
+
+from scrapy.utils.ftp import ftp_makedirs_cwd
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_KEEPALIVE = 60
+
+# Errors of a connection closed by the server, such as after an idle timeout
+STALE_CONNECTION_ERRORS = (EOFError, OSError, ftplib.error_temp)
+
+
+class PooledFTP(ftplib.FTP):
+    """FTP connection remembering its initial working directory."""
+
+    home = "/"
+
+
+class FTPConnectionPool:
+    """Bounded pool of FTP connections logged in with the same credentials.
+
+    At most maxsize connections are open at once, the other users waiting
+    for one to be released. A connection idle for more than keepalive
+    seconds is closed instead of being reused, and one closed by the server
+    meanwhile is replaced by a new connection.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: typing.Optional[str],
+        password: typing.Optional[str],
+        use_active_mode: bool = False,
+        maxsize: int = DEFAULT_POOL_SIZE,
+        keepalive: float = DEFAULT_KEEPALIVE,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_active_mode = use_active_mode
+        self.maxsize = maxsize
+        self.keepalive = keepalive
+        self.clock = clock
+        self.opened_connections = 0
+
+        # Idle connections, with the moments they were released
+        self._idle: collections.deque[
+            tuple[PooledFTP, float]
+        ] = collections.deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def run(
+        self, operation: typing.Callable[[PooledFTP], typing.Any]
+    ) -> typing.Any:
+        """Runs an operation with a pooled connection, again with a new one
+        if the pooled connection turns out to be stale."""
+        with self._slots:
+            ftp = self._pop_idle()
+            if ftp is not None:
+                try:
+                    return self._run_with(ftp, operation)
+                except STALE_CONNECTION_ERRORS:
+                    pass
+
+            return self._run_with(self._connect(), operation)
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+
+        for ftp, _ in idle:
+            self._close(ftp)
+
+    def _run_with(
+        self,
+        ftp: PooledFTP,
+        operation: typing.Callable[[PooledFTP], typing.Any],
+    ) -> typing.Any:
+        try:
+            result = operation(ftp)
+        except ftplib.error_perm:
+            # The command was refused, but the connection is still usable.
+            self._release(ftp)
+            raise
+        except BaseException:
+            self._close(ftp)
+            raise
+
+        self._release(ftp)
+
+        return result
+
+    def _pop_idle(self) -> typing.Optional[PooledFTP]:
+        with self._lock:
+            while self._idle:
+                ftp, released_at = self._idle.pop()
+                if self.clock() - released_at <= self.keepalive:
+                    return ftp
+
+                self._close(ftp)
+
+        return None
+
+    def _connect(self) -> PooledFTP:
+        ftp = PooledFTP()
+        ftp.connect(self.host, self.port)
+        ftp.login(self.username or "", self.password or "")
+        if self.use_active_mode:
+            ftp.set_pasv(False)
+        ftp.home = ftp.pwd()
+
+        with self._lock:
+            self.opened_connections += 1
+
+        return ftp
+
+    def _release(self, ftp: PooledFTP) -> None:
+        with self._lock:
+            self._idle.append((ftp, self.clock()))
+
+    def _close(self, ftp: PooledFTP) -> None:
+        try:
+            ftp.close()
+        except OSError:
+            pass
+
+
+_pools: dict[tuple[str, int, typing.Optional[str]], FTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_ftp_pool(
+    host: str,
+    port: int,
+    username: typing.Optional[str],
+    password: typing.Optional[str],
+    **kwargs: typing.Any,
+) -> FTPConnectionPool:
+    """Returns the process-wide pool of connections to host:port as
+    username, creating it with the given arguments if needed."""
+    key = (host, port, username)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = FTPConnectionPool(host, port, username, password, **kwargs)
+            _pools[key] = pool
+
+        return pool
+
+
+def pooled_ftp_store_file(
+    *,
+    pool: FTPConnectionPool,
+    path: str,
+    file: typing.BinaryIO,
+    overwrite: bool = True,
+) -> None:
+    """Uploads the file as ftp_store_file does, but with a pooled
+    connection."""
+
+    def store(ftp: PooledFTP) -> None:
+        file.seek(0)
+        # The pooled connections may be in another working directory.
+        dirname, filename = posixpath.split(posixpath.join(ftp.home, path))
+        try:
+            ftp_makedirs_cwd(ftp, dirname)
+        except ftplib.error_perm:
+            # A concurrent upload may have created a directory meanwhile.
+            ftp_makedirs_cwd(ftp, dirname)
+        command = "STOR" if overwrite else "APPE"
+        ftp.storbinary(f"{command} {filename}", file)
+
+    pool.run(store)
+    file.close()
@@ -0,0 +1,153 @@
+"""Histograms of the crawl metrics, exported in the Prometheus text format"""
+
+import bisect
+import math
+import typing
+
+# Upper bounds of the buckets, in seconds
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+# Upper bounds of the buckets, in number of requests
+DEPTH_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Counts of the observed values falling in each bucket, delimited by
+    sorted upper bounds, as a Prometheus histogram."""
+
+    def __init__(self, bounds: typing.Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        # The last bucket holds the values above the last bound.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-quantile, or
+        the maximum if it's above the last bound."""
+        rank = q * self.count
+        cumulative_count = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative_count += count
+            if cumulative_count >= rank and cumulative_count:
+                return min(bound, self.max)
+
+        return self.max
+
+    def as_dict(self) -> dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class HistogramFamily:
+    """Histograms of a metric, one per set of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        bounds: typing.Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.bounds = tuple(bounds)
+        self.histograms: dict[Labels, Histogram] = {}
+
+    def labels(self, **labels: str) -> Histogram:
+        key = tuple(sorted(labels.items()))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.bounds)
+
+        return histogram
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    return (
+        "{"
+        + ",".join(
+            '{}="{}"'.format(
+                name,
+                value.replace("\\", "\\\\")
+                .replace("\n", "\\n")
+                .replace('"', '\\"'),
+            )
+            for name, value in labels
+        )
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_prometheus(families: typing.Iterable[HistogramFamily]) -> str:
+    """Returns the histograms in the Prometheus text exposition format."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} histogram")
+
+        for labels, histogram in sorted(family.histograms.items()):
+            cumulative_count = 0
+            for bound, count in zip(
+                histogram.bounds + (math.inf,), histogram.counts
+            ):
+                cumulative_count += count
+                bucket_labels = _format_labels(
+                    labels + (("le", _format_value(bound)),)
+                )
+                lines.append(
+                    f"{family.name}_bucket{bucket_labels} {cumulative_count}"
+                )
+
+            label_string = _format_labels(labels)
+            lines.append(
+                f"{family.name}_sum{label_string}"
+                f" {_format_value(histogram.sum)}"
+            )
+            lines.append(
+                f"{family.name}_count{label_string} {histogram.count}"
+            )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,381 @@
+"""Helper functions, mirroring scrapy.utils.misc"""
+
+import ast
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import pkgutil
+import sys
+import threading
+import types
+import typing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from scrapy.utils.misc import walk_modules as serial_walk_modules
+from scrapy.utils.spider import iter_spider_classes
+
+# Suffix of the names of the base classes recognised as spiders, such as
+# Spider, CrawlSpider or SitemapSpider
+SPIDER_BASE_SUFFIX = "Spider"
+
+
+class ModuleFile(typing.NamedTuple):
+    name: str
+    origin: typing.Optional[str]
+
+
+class ClassInfo(typing.NamedTuple):
+    name: str
+    base_names: list[str]
+    spider_name: typing.Optional[str]
+
+
+class SpiderCandidate(typing.NamedTuple):
+    name: str
+    module: str
+    class_name: str
+
+
+def walk_modules(path: str, workers: int = 1) -> list[types.ModuleType]:
+    """Loads a module and all its submodules, as walk_modules does.
+
+    With several workers, the submodules of a package are imported
+    concurrently as soon as the package itself is imported, so the sibling
+    modules must not import each other. The modules are returned in the same
+    order and, if some imports fail, the raised error is the one of the first
+    failing module in this order.
+    """
+    if workers <= 1:
+        return serial_walk_modules(path)
+
+    root = importlib.import_module(path)
+    tree: dict[str, list[tuple[bool, Future]]] = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def walk_package(package: types.ModuleType) -> list[Future]:
+            tree[package.__name__] = [
+                (
+                    ispkg,
+                    executor.submit(
+                        importlib.import_module,
+                        package.__name__ + "." + subpath,
+                    ),
+                )
+                for _, subpath, ispkg in pkgutil.iter_modules(package.__path__)
+            ]
+
+            return [
+                future for ispkg, future in tree[package.__name__] if ispkg
+            ]
+
+        pending = (
+            set(walk_package(root)) if hasattr(root, "__path__") else set()
+        )
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    pending.update(walk_package(future.result()))
+
+    return _collect_modules(root, tree)
+
+
+def _collect_modules(
+    module: types.ModuleType, tree: dict[str, list[tuple[bool, Future]]]
+) -> list[types.ModuleType]:
+    modules = [module]
+    for ispkg, future in tree.get(module.__name__, []):
+        # Raises the error of the first failing module, in the walk order
+        submodule = future.result()
+        if ispkg:
+            modules += _collect_modules(submodule, tree)
+        else:
+            modules.append(submodule)
+
+    return modules
+
+
+def walk_module_files(path: str) -> list[ModuleFile]:
+    """Returns the names and the source files of a module and all its
+    submodules, in the order of walk_modules, but without importing them."""
+    if path.startswith("."):
+        raise TypeError(
+            "the 'package' argument is required to perform a relative import"
+            f" for {path!r}"
+        )
+
+    return _walk_spec(path, _find_module_spec(path))
+
+
+def _find_module_spec(path: str) -> importlib.machinery.ModuleSpec:
+    parent, _, _ = path.rpartition(".")
+    search_locations = None
+    if parent:
+        search_locations = _find_module_spec(parent).submodule_search_locations
+        if search_locations is None:
+            raise ModuleNotFoundError(
+                f"No module named {path!r}; {parent!r} is not a package",
+                name=path,
+            )
+
+    spec = _find_spec(path, search_locations)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {path!r}", name=path)
+
+    return spec
+
+
+def _find_spec(
+    name: str, search_locations: typing.Optional[list[str]]
+) -> typing.Optional[importlib.machinery.ModuleSpec]:
+    # As PathFinder.find_spec, but without requiring the parent of a
+    # namespace package to be imported
+    namespace_locations: list[str] = []
+    for entry in sys.path if search_locations is None else search_locations:
+        finder = pkgutil.get_importer(entry)
+        spec = finder.find_spec(name) if finder else None  # type: ignore
+        if spec is None:
+            continue
+        if spec.loader is not None:
+            return spec
+
+        namespace_locations += spec.submodule_search_locations or []
+
+    if not namespace_locations:
+        return None
+
+    spec = importlib.machinery.ModuleSpec(name, None, is_package=True)
+    spec.submodule_search_locations = namespace_locations
+
+    return spec
+
+
+def _walk_spec(
+    path: str, spec: importlib.machinery.ModuleSpec
+) -> list[ModuleFile]:
+    files = [ModuleFile(path, spec.origin if spec.has_location else None)]
+    if spec.submodule_search_locations is None:
+        return files
+
+    for finder, subpath, _ in pkgutil.iter_modules(
+        spec.submodule_search_locations
+    ):
+        fullpath = path + "." + subpath
+        subspec = finder.find_spec(fullpath)  # type: ignore[call-arg]
+        if subspec is not None:
+            files += _walk_spec(fullpath, subspec)
+
+    return files
+
+
+def scan_classes(source: str) -> list[ClassInfo]:
+    """Returns the top-level classes defined in a module's source, with the
+    literal value of their name attribute."""
+    classes = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef):
+            classes.append(
+                ClassInfo(
+                    node.name,
+                    [
+                        base_name
+                        for base_name in map(_get_base_name, node.bases)
+                        if base_name
+                    ],
+                    _get_spider_name(node),
+                )
+            )
+
+    return classes
+
+
+def _get_base_name(base: ast.expr) -> typing.Optional[str]:
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        return base.attr
+
+    return None
+
+
+def _get_spider_name(node: ast.ClassDef) -> typing.Optional[str]:
+    for statement in node.body:
+        value: typing.Optional[ast.expr]
+        if isinstance(statement, ast.Assign):
+            targets, value = statement.targets, statement.value
+        elif isinstance(statement, ast.AnnAssign):
+            targets, value = [statement.target], statement.value
+        else:
+            continue
+
+        if any(
+            isinstance(target, ast.Name) and target.id == "name"
+            for target in targets
+        ):
+            if isinstance(value, ast.Constant) and isinstance(
+                value.value, str
+            ):
+                return value.value
+
+    return None
+
+
+class ScanCache:
+    """Classes scanned from the source files, reused while the files keep
+    their modification time and size. If a filename is given, the cache is
+    loaded from and saved to this JSON file."""
+
+    def __init__(self, filename: typing.Optional[str] = None) -> None:
+        self.filename = filename
+        self._entries: dict[str, tuple[int, int, list[ClassInfo]]] = {}
+        self._lock = threading.Lock()
+
+        if filename and os.path.isfile(filename):
+            self._load(filename)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def scan(self, origin: str) -> list[ClassInfo]:
+        """Returns the classes of a source file, decoded as the interpreter
+        does. Raises a SyntaxError or a UnicodeDecodeError if it can't be
+        parsed."""
+        stat = os.stat(origin)
+        with self._lock:
+            entry = self._entries.get(origin)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[2]
+
+        with open(origin, "rb") as file:
+            classes = scan_classes(importlib.util.decode_source(file.read()))
+        with self._lock:
+            self._entries[origin] = (stat.st_mtime_ns, stat.st_size, classes)
+
+        return classes
+
+    def save(self) -> None:
+        if not self.filename:
+            return
+
+        with self._lock:
+            content = {
+                origin: [mtime, size, [list(info) for info in classes]]
+                for origin, (mtime, size, classes) in self._entries.items()
+            }
+
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.filename, "w") as file:
+            json.dump(content, file)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self, filename: str) -> None:
+        try:
+            with open(filename) as file:
+                content = json.load(file)
+
+            self._entries = {
+                origin: (mtime, size, [ClassInfo(*info) for info in classes])
+                for origin, (mtime, size, classes) in content.items()
+            }
+        except (ValueError, TypeError):
+            # A corrupted cache is rebuilt from the sources.
+            self._entries = {}
+
+
+scan_cache = ScanCache()
+
+
+def find_spider_candidates(
+    path: str, cache: typing.Optional[ScanCache] = None
+) -> list[SpiderCandidate]:
+    """Returns the classes of a module and its submodules which look like
+    spiders, without importing them.
+
+    A class is a candidate if its name attribute is a string literal (maybe
+    inherited from a class of the same package) and if one of its bases is
+    named like a spider class or is a candidate itself. A base is looked up
+    in the module of the class first, then in the other modules. The
+    candidates are confirmed only when their modules are imported.
+
+    The modules which can't be parsed are imported instead, so that their
+    errors are raised as walk_modules raises them.
+    """
+    if cache is None:
+        cache = scan_cache
+
+    module_classes = []
+    candidates = []
+    for module in walk_module_files(path):
+        if not (module.origin and module.origin.endswith(".py")):
+            continue
+
+        try:
+            module_classes.append((module.name, cache.scan(module.origin)))
+        except (SyntaxError, UnicodeDecodeError):
+            candidates += _import_spider_candidates(module.name)
+
+    known_classes = {
+        (module_name, info.name): info
+        for module_name, classes in module_classes
+        for info in classes
+    }
+    modules_by_class: dict[str, list[str]] = {}
+    for module_name, class_name in known_classes:
+        modules_by_class.setdefault(class_name, []).append(module_name)
+
+    def resolve(
+        module_name: str, class_name: str, visited: frozenset
+    ) -> tuple[bool, str]:
+        # Returns if the class is a spider, and its (maybe inherited) name.
+        key = (module_name, class_name)
+        if key not in known_classes:
+            modules = modules_by_class.get(class_name)
+            key = (modules[0] if modules else module_name, class_name)
+
+        info = known_classes.get(key)
+        if info is None or key in visited:
+            return class_name.endswith(SPIDER_BASE_SUFFIX), ""
+
+        is_spider, spider_name = False, info.spider_name or ""
+        for base_name in info.base_names:
+            base_is_spider, base_spider_name = resolve(
+                key[0], base_name, visited | {key}
+            )
+            is_spider = is_spider or base_is_spider
+            spider_name = spider_name or base_spider_name
+
+        return is_spider, spider_name
+
+    for module_name, classes in module_classes:
+        for info in classes:
+            is_spider, spider_name = resolve(
+                module_name, info.name, frozenset()
+            )
+            if is_spider and spider_name:
+                candidates.append(
+                    SpiderCandidate(spider_name, module_name, info.name)
+                )
+
+    return candidates
+
+
+def _import_spider_candidates(module_name: str) -> list[SpiderCandidate]:
+    module = importlib.import_module(module_name)
+
+    return [
+        SpiderCandidate(spider.name, module_name, spider.__name__)
+        for spider in iter_spider_classes(module)
+    ]
@@ -0,0 +1,139 @@
+"""Process pool running the CPU-bound parsers out of the reactor thread"""
+
+import copyreg
+import multiprocessing
+import os
+import threading
+import typing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import lxml.etree
+from scrapy.robotstxt import RobotParser
+from scrapy.utils.sitemap import Sitemap
+from twisted.internet.defer import Deferred
+
+
+class ParsedSitemap:
+    """Type and entries of a sitemap parsed by Sitemap, which can be iterated
+    as Sitemap."""
+
+    def __init__(self, type: str, entries: list[dict]) -> None:
+        self.type = type
+        self.entries = entries
+
+    def __iter__(self) -> typing.Iterator[dict]:
+        return iter(self.entries)
+
+
+def _reduce_xml_syntax_error(
+    error: lxml.etree.XMLSyntaxError,
+) -> tuple[type, tuple]:
+    # Sends the parsing errors back from the pool without their error log,
+    # which can't be pickled
+    return type(error), (error.msg, error.code, *error.position)
+
+
+copyreg.pickle(lxml.etree.XMLSyntaxError, _reduce_xml_syntax_error)
+
+
+def parse_sitemap(body: bytes) -> ParsedSitemap:
+    sitemap = Sitemap(body)
+
+    return ParsedSitemap(sitemap.type, list(sitemap))
+
+
+def parse_robots(parser_class: type[RobotParser], body: bytes) -> RobotParser:
+    # The spider is only used to log the decoding errors, and can't be sent
+    # to the pool.
+    return parser_class(body, None)  # type: ignore[call-arg]
+
+
+class ParserPool:
+    """Pool of processes parsing sitemaps and robots.txt files, started on
+    its first use.
+
+    The parsers return futures, which deferred_from_future converts into
+    Deferreds. The processes are spawned, as forking a process running a
+    reactor and its threads is unsafe.
+    """
+
+    def __init__(self, max_workers: typing.Optional[int] = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: typing.Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def parse_sitemap(self, body: bytes) -> "Future[ParsedSitemap]":
+        return self._submit(parse_sitemap, body)
+
+    def parse_robots(
+        self, parser_class: type[RobotParser], body: bytes
+    ) -> "Future[RobotParser]":
+        return self._submit(parse_robots, parser_class, body)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def _submit(self, function: typing.Callable, *args: typing.Any) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+            return self._executor.submit(function, *args)
+
+
+_parser_pool: typing.Optional[ParserPool] = None
+
+
+def get_parser_pool(max_workers: typing.Optional[int] = None) -> ParserPool:
+    """Returns the parser pool of the process, created with the given size on
+    the first call, and shut down with the reactor."""
+    global _parser_pool
+
+    if _parser_pool is None:
+        from twisted.internet import reactor
+
+        _parser_pool = ParserPool(max_workers)
+        reactor.addSystemEventTrigger(  # type: ignore[attr-defined]
+            "before", "shutdown", _parser_pool.shutdown
+        )
+
+    return _parser_pool
+
+
+def deferred_from_future(future: Future) -> Deferred:
+    """Returns a Deferred fired in the reactor thread with the result of a
+    concurrent future, and cancelling it when cancelled."""
+    from twisted.internet import reactor
+
+    def cancel(_: Deferred) -> None:
+        future.cancel()
+
+    deferred: Deferred = Deferred(cancel)
+
+    def resolve(future: Future) -> None:
+        # The Deferred was already fired if it was cancelled.
+        if deferred.called:
+            return
+        if future.cancelled():
+            deferred.cancel()
+            return
+
+        exception = future.exception()
+        if exception is not None:
+            deferred.errback(exception)
+        else:
+            deferred.callback(future.result())
+
+    future.add_done_callback(
+        lambda future: reactor.callFromThread(  # type: ignore[attr-defined]
+            resolve, future
+        )
+    )
+
+    return deferred
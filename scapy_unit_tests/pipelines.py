@@ -0,0 +1,97 @@
+"""Item pipelines, mirroring scrapy.pipelines"""
+
+import hashlib
+import typing
+
+from scrapy.pipelines.files import FilesPipeline, FTPFilesStore
+from twisted.internet import threads
+
+from scapy_unit_tests.ftp import (
+    DEFAULT_KEEPALIVE,
+    DEFAULT_POOL_SIZE,
+    FTPConnectionPool,
+    PooledFTP,
+    get_ftp_pool,
+    pooled_ftp_store_file,
+)
+
+
+class PooledFTPFilesStore(FTPFilesStore):
+    """FTPFilesStore reusing logged in connections, from a pool shared by the
+    stores with the same host, port and user.
+
+    The number of connections of a pool, which bounds the concurrent
+    transfers, and their keepalive are set by the FTP_POOL_SIZE and
+    FTP_POOL_KEEPALIVE settings.
+    """
+
+    POOL_SIZE = DEFAULT_POOL_SIZE
+    POOL_KEEPALIVE = DEFAULT_KEEPALIVE
+
+    def __init__(self, uri: str) -> None:
+        super().__init__(uri)
+
+        self.pool: FTPConnectionPool = get_ftp_pool(
+            self.host,
+            self.port,
+            self.username,
+            self.password,
+            use_active_mode=bool(self.USE_ACTIVE_MODE),
+            maxsize=self.POOL_SIZE,
+            keepalive=self.POOL_KEEPALIVE,
+        )
+
+    def persist_file(
+        self,
+        path: str,
+        buf: typing.BinaryIO,
+        info: typing.Any,
+        meta: typing.Any = None,
+        headers: typing.Any = None,
+    ) -> typing.Any:
+        return threads.deferToThread(
+            pooled_ftp_store_file,
+            pool=self.pool,
+            path=f"{self.basedir}/{path}",
+            file=buf,
+        )
+
+    def stat_file(self, path: str, info: typing.Any) -> typing.Any:
+        def get_stat(ftp: PooledFTP) -> dict[str, typing.Any]:
+            file_path = f"{self.basedir}/{path}"
+            last_modified = float(ftp.voidcmd(f"MDTM {file_path}")[4:].strip())
+            checksum = hashlib.md5()
+            ftp.retrbinary(f"RETR {file_path}", checksum.update)
+
+            return {
+                "last_modified": last_modified,
+                "checksum": checksum.hexdigest(),
+            }
+
+        def stat_file() -> dict[str, typing.Any]:
+            try:
+                return self.pool.run(get_stat)
+            # The file doesn't exist
+            except Exception:
+                return {}
+
+        return threads.deferToThread(stat_file)
+
+
+class PooledFilesPipeline(FilesPipeline):
+    """FilesPipeline storing the files of ftp:// URIs with
+    PooledFTPFilesStore."""
+
+    STORE_SCHEMES = {**FilesPipeline.STORE_SCHEMES, "ftp": PooledFTPFilesStore}
+
+    @classmethod
+    def from_settings(cls, settings: typing.Any) -> "PooledFilesPipeline":
+        ftp_store = cls.STORE_SCHEMES["ftp"]
+        ftp_store.POOL_SIZE = settings.getint(
+            "FTP_POOL_SIZE", DEFAULT_POOL_SIZE
+        )
+        ftp_store.POOL_KEEPALIVE = settings.getfloat(
+            "FTP_POOL_KEEPALIVE", DEFAULT_KEEPALIVE
+        )
+
+        return super().from_settings(settings)
@@ -0,0 +1,216 @@
+"""Feed postprocessing plugins, mirroring scrapy.extensions.postprocessing"""
+
+import collections
+import gzip
+import os
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import lz4.frame
+import zstandard
+
+DEFAULT_GZIP_BLOCK_SIZE = 128 * 1024
+DEFAULT_ZSTD_LEVEL = 3
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class ParallelGzipPlugin:
+    """Drop-in replacement of GzipPlugin, compressing independent blocks of
+    the received data on a thread pool, as pigz does.
+
+    Each block is written as a member of a multi-member GZIP stream, which is
+    read back as a whole by any GZIP decompressor.
+
+    Accepted feed_options parameters:
+    - gzip_compresslevel
+    - gzip_mtime
+    - gzip_block_size: Size of the compressed blocks, in bytes
+    - gzip_workers: Number of compressing threads, by default the number of
+        CPUs
+    """
+
+    def __init__(
+        self, file: typing.BinaryIO, feed_options: dict[str, typing.Any]
+    ) -> None:
+        self.file = file
+        self.feed_options = feed_options
+        self.compress_level = self.feed_options.get("gzip_compresslevel", 9)
+        self.mtime = self.feed_options.get("gzip_mtime")
+        self.block_size = self.feed_options.get(
+            "gzip_block_size", DEFAULT_GZIP_BLOCK_SIZE
+        )
+        self.workers: int = (
+            self.feed_options.get("gzip_workers") or os.cpu_count() or 1
+        )
+
+        self._buffer = bytearray()
+        self._pending: collections.deque[Future] = collections.deque()
+        self._written_members = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+
+        self._write_members(wait=len(self._pending) > 2 * self.workers)
+
+        return len(data)
+
+    def close(self) -> None:
+        # An empty input still results in a valid, empty GZIP stream.
+        if self._buffer or not (self._pending or self._written_members):
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+
+        while self._pending:
+            self._write_members(wait=True)
+
+        self._executor.shutdown()
+        self.file.close()
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(
+            self._executor.submit(
+                gzip.compress,
+                block,
+                compresslevel=self.compress_level,
+                mtime=self.mtime,
+            )
+        )
+
+    def _write_members(self, wait: bool) -> None:
+        # The members are written in the order of their blocks, so only the
+        # compressed blocks preceded by no pending one are written.
+        if wait and self._pending:
+            self._pending[0].result()
+
+        while self._pending and self._pending[0].done():
+            self.file.write(self._pending.popleft().result())
+            self._written_members += 1
+
+
+class ZstdPlugin:
+    """Compresses the received data into a Zstandard frame, streamed into the
+    file.
+
+    Accepted feed_options parameters:
+    - zstd_level
+    - zstd_threads: Number of compressing threads, with 0 compressing on the
+        calling thread and -1 using one thread per CPU
+    - zstd_dict: Dictionary, as bytes or as a ZstdCompressionDict, needed
+        again for the decompression
+    """
+
+    def __init__(
+        self, file: typing.BinaryIO, feed_options: dict[str, typing.Any]
+    ) -> None:
+        self.file = file
+        self.feed_options = feed_options
+        level = self.feed_options.get("zstd_level", DEFAULT_ZSTD_LEVEL)
+        threads = self.feed_options.get("zstd_threads", 0)
+        dict_data = self.feed_options.get("zstd_dict")
+        if isinstance(dict_data, bytes):
+            dict_data = zstandard.ZstdCompressionDict(dict_data)
+
+        compressor = zstandard.ZstdCompressor(
+            level=level, dict_data=dict_data, threads=threads
+        )
+        self.zstdfile = compressor.stream_writer(
+            self.file, closefd=False, write_return_read=True
+        )
+
+    def write(self, data: bytes) -> int:
+        return self.zstdfile.write(data)
+
+    def close(self) -> None:
+        self.zstdfile.close()
+        self.file.close()
+
+
+class LZ4Plugin:
+    """Compresses the received data into a LZ4 frame, streamed into the file.
+
+    Accepted feed_options parameters:
+    - lz4_compression_level
+    - lz4_block_size
+    - lz4_content_checksum
+
+    See lz4.frame.LZ4FrameFile for more info about parameters.
+    """
+
+    def __init__(
+        self, file: typing.BinaryIO, feed_options: dict[str, typing.Any]
+    ) -> None:
+        self.file = file
+        self.feed_options = feed_options
+        compression_level = self.feed_options.get("lz4_compression_level", 0)
+        block_size = self.feed_options.get(
+            "lz4_block_size", lz4.frame.BLOCKSIZE_DEFAULT
+        )
+        content_checksum = self.feed_options.get("lz4_content_checksum", False)
+        self.lz4file = lz4.frame.LZ4FrameFile(
+            self.file,
+            mode="wb",
+            compression_level=compression_level,
+            block_size=block_size,
+            content_checksum=content_checksum,
+        )
+
+    def write(self, data: bytes) -> int:
+        return self.lz4file.write(data)
+
+    def close(self) -> None:
+        self.lz4file.close()
+        self.file.close()
+
+
+class BufferedPlugin:
+    """Coalesces the received data into larger writes to the next plugin of
+    the chain, or to the file if it is the last one.
+
+    Placed first in the postprocessing plugins, it saves the compressors a
+    call (and the file a system call) per exported item.
+
+    Accepted feed_options parameters:
+    - buffer_size: Number of buffered bytes triggering a write
+    - buffer_flush_interval: Number of seconds after which the buffered data
+        is written, checked on each write
+    """
+
+    def __init__(
+        self, file: typing.BinaryIO, feed_options: dict[str, typing.Any]
+    ) -> None:
+        self.file = file
+        self.feed_options = feed_options
+        self.size = self.feed_options.get("buffer_size", DEFAULT_BUFFER_SIZE)
+        self.flush_interval = self.feed_options.get("buffer_flush_interval")
+        self.clock: typing.Callable[[], float] = time.monotonic
+
+        self._buffer = bytearray()
+        self._buffered_since = 0.0
+
+    def write(self, data: bytes) -> int:
+        if not self._buffer and self.flush_interval is not None:
+            self._buffered_since = self.clock()
+        self._buffer += data
+
+        if len(self._buffer) >= self.size or (
+            self.flush_interval is not None
+            and self.clock() - self._buffered_since >= self.flush_interval
+        ):
+            self.flush()
+
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.file.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
@@ -0,0 +1,312 @@
+"""Response functions, mirroring scrapy.utils.response"""
+
+import codecs
+import functools
+import html.entities
+import re
+import typing
+import urllib.parse
+import weakref
+
+from w3lib import html as w3lib_html
+from w3lib.encoding import html_to_unicode
+
+BASE_URL_SCAN_LIMIT = 4096
+# Most bytes taken by a character, in the encodings of the web, and by a
+# byte order mark
+_MAX_CHARACTER_BYTES = 4
+
+_HEAD_END_BYTES_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+_HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+
+# Skips the comments, the processing instructions and the raw text of the
+# scripts and styles, which the HTML parser doesn't parse as elements,
+# captures the attributes of the anchors, and skips the other tags as a
+# whole, so that the markup in their attribute values is not scanned. As in
+# the HTML parser of libxml2, the values are only quoted right after the
+# equal sign, and the unterminated values and tags end with the body.
+_TAG_ATTRIBUTES_PATTERN = (
+    r"(?:[^>=]|=\s*(?:\"[^\"]*(?:\"|\Z)|'[^']*(?:'|\Z)|[^\s>]*))*"
+)
+_ANCHORS_PATTERN = (
+    r"<!--.*?(?:-->|\Z)"
+    r"|<\?[^>]*(?:>|\Z)"
+    rf"|<(script|style)(?=[\s/>]){_TAG_ATTRIBUTES_PATTERN}"
+    r"(?:>.*?(?:</\1\s*>|\Z)|\Z)"
+    rf"|<a(?=[\s>])({_TAG_ATTRIBUTES_PATTERN})(?:>|\Z)"
+    rf"|</?[a-zA-Z]{_TAG_ATTRIBUTES_PATTERN}(?:>|\Z)"
+)
+_ATTRIBUTE_PATTERN = (
+    r"([^\s\"'>/=]+)"
+    r"(?:\s*=\s*(?:\"([^\"]*)(?:\"|\Z)|'([^']*)(?:'|\Z)|([^\s>]*)))?"
+)
+_ANCHORS_RE = re.compile(_ANCHORS_PATTERN, re.IGNORECASE | re.DOTALL)
+_ANCHORS_BYTES_RE = re.compile(
+    _ANCHORS_PATTERN.encode("ascii"), re.IGNORECASE | re.DOTALL
+)
+_ATTRIBUTE_RE = re.compile(_ATTRIBUTE_PATTERN)
+_ATTRIBUTE_BYTES_RE = re.compile(_ATTRIBUTE_PATTERN.encode("ascii"))
+# The URLs which urljoin would return as they are, or appended to the scheme
+# and the network location of the base URL, without empty or dot segments,
+# parameters, empty query or fragment, or characters it removes
+_ABSOLUTE_URL_RE = re.compile(
+    r"https?://[^\x00-\x20\x7f/?#;@\[\]]+(?:/[^\x00-\x20\x7f;?#]*)*"
+    r"(?:\?[^\x00-\x20\x7f#]+)?(?:#[^\x00-\x20\x7f]+)?\Z"
+)
+_ROOT_RELATIVE_URL_RE = re.compile(
+    r"(?:/(?![/.])[^\x00-\x20\x7f;?#/]*)+"
+    r"(?:\?[^\x00-\x20\x7f#]+)?(?:#[^\x00-\x20\x7f]+)?\Z"
+)
+# The paths which urljoin would resolve against the directory of the base
+# URL, without parameters or characters it removes
+_RELATIVE_URL_RE = re.compile(
+    r"([^\x00-\x20\x7f;?#:/]+(?:/[^\x00-\x20\x7f;?#/]*)*)"
+    r"((?:\?[^\x00-\x20\x7f#]+)?(?:#[^\x00-\x20\x7f]+)?)\Z"
+)
+# The HTML 4 entities, as the HTML parser of libxml2, and the numeric
+# references, whose semicolon is optional, or malformed
+_ENTITY_RE = re.compile(r"&(?:#(\d+);?|#[xX]([0-9a-fA-F]+);?|#|(\w+);)")
+_ENTITIES = {**html.entities.name2codepoint, "apos": ord("'")}
+
+_baseurl_cache: "weakref.WeakKeyDictionary[typing.Any, str]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def fast_get_base_url(
+    response: typing.Any, scan_limit: int = BASE_URL_SCAN_LIMIT
+) -> str:
+    """Returns the base URL of a response, as get_base_url does, but decodes
+    only the bytes of the first scan_limit characters of the body, up to the
+    </head> tag.
+
+    The result is cached per response object, if it supports weak
+    references.
+    """
+    try:
+        return _baseurl_cache[response]
+    except (KeyError, TypeError):
+        pass
+
+    text, encoding = _read_head(response, scan_limit)
+    base_url = w3lib_html.get_base_url(text, response.url, encoding)
+    try:
+        _baseurl_cache[response] = base_url
+    except TypeError:
+        pass
+
+    return base_url
+
+
+def _read_head(response: typing.Any, scan_limit: int) -> tuple[str, str]:
+    text, encoding = _decode_head(response, scan_limit)
+
+    # As get_base_url, the first scan_limit characters are scanned.
+    return text[:scan_limit], encoding
+
+
+def _decode_head(response: typing.Any, scan_limit: int) -> tuple[str, str]:
+    body = getattr(response, "body", None)
+
+    # Responses without a raw body, or already decoded, are scanned as text.
+    if not isinstance(body, bytes) or getattr(response, "_cached_ubody", None):
+        text = response.text[:scan_limit]
+        match = _HEAD_END_RE.search(text)
+
+        return text[: match.start()] if match else text, response.encoding
+
+    # The bytes of scan_limit characters, at most
+    head = body[: (scan_limit + 1) * _MAX_CHARACTER_BYTES]
+    head_end = _HEAD_END_BYTES_RE.search(head)
+    if head_end:
+        head = head[: head_end.start()]
+
+    # The encoding property of TextResponse decodes the whole body when no
+    # encoding is declared, so it is rather inferred from the head only.
+    declared_encoding = getattr(response, "_declared_encoding", None)
+    encoding = declared_encoding() if declared_encoding else response.encoding
+    if encoding:
+        return html_to_unicode(f"charset={encoding}", head)[1], encoding
+
+    return html_to_unicode(
+        response.headers.get(b"Content-Type", b"").decode("latin-1"),
+        head,
+        default_encoding=getattr(response, "_DEFAULT_ENCODING", "utf-8"),
+        auto_detect_fun=getattr(response, "_auto_detect_fun", None),
+    )
+
+
+def extract_links(response: typing.Any) -> list[str]:
+    """Returns the URLs of the anchors of a response, resolved against its
+    base URL, as [response.urljoin(href) for href in
+    response.css("a::attr(href)").getall()] does, but scanning the body in a
+    single pass, without parsing it into a tree.
+
+    The body is scanned as bytes if its encoding is a superset of ASCII, and
+    decoded otherwise.
+    """
+    base_url = fast_get_base_url(response)
+    body = getattr(response, "body", None)
+
+    hrefs: typing.Iterable[str]
+    if not isinstance(body, bytes) or getattr(response, "_cached_ubody", None):
+        hrefs = _scan_hrefs(response.text, _ANCHORS_RE, _ATTRIBUTE_RE, "href")
+    else:
+        _, encoding = _read_head(response, BASE_URL_SCAN_LIMIT)
+        if _is_ascii_superset(encoding):
+            hrefs = (
+                href.decode(encoding, "replace")
+                for href in _scan_hrefs(
+                    body, _ANCHORS_BYTES_RE, _ATTRIBUTE_BYTES_RE, b"href"
+                )
+            )
+        else:
+            hrefs = _scan_hrefs(
+                response.text, _ANCHORS_RE, _ATTRIBUTE_RE, "href"
+            )
+
+    join = _url_joiner(base_url)
+
+    return [
+        join(_replace_entities(href) if "&" in href else href)
+        for href in hrefs
+    ]
+
+
+def _scan_hrefs(
+    body: typing.AnyStr,
+    anchors_re: "re.Pattern[typing.AnyStr]",
+    attribute_re: "re.Pattern[typing.AnyStr]",
+    href_name: typing.AnyStr,
+) -> typing.Generator[typing.AnyStr, None, None]:
+    for anchor in anchors_re.finditer(body):
+        attributes = anchor.group(2)
+        if attributes is None:
+            continue
+
+        # The first one is kept when an attribute is repeated.
+        for attribute in attribute_re.finditer(attributes):
+            if attribute.group(1).lower() == href_name:
+                yield attribute.group(2) or attribute.group(
+                    3
+                ) or attribute.group(4) or href_name[:0]
+                break
+
+
+def _url_joiner(base_url: str) -> typing.Callable[[str], str]:
+    """Returns a function resolving URLs against the base URL, as urljoin
+    does, but without parsing the most common ones."""
+    parts = urllib.parse.urlsplit(base_url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+
+        def urljoin(url: str) -> str:
+            return urllib.parse.urljoin(base_url, url)
+
+        return urljoin
+
+    origin = f"{parts.scheme}://{parts.netloc}"
+    # As urljoin, drops the last segment and the empty ones of the base path
+    base_segments = urllib.parse.urlparse(base_url).path.split("/")[:-1]
+    base_segments[1:] = filter(None, base_segments[1:])
+    base_segments = _resolve_dot_segments([], base_segments)
+
+    def join(url: str) -> str:
+        if _ROOT_RELATIVE_URL_RE.match(url):
+            return origin + url
+        if _ABSOLUTE_URL_RE.match(url):
+            return url
+
+        match = _RELATIVE_URL_RE.match(url)
+        if match is None:
+            return urllib.parse.urljoin(base_url, url)
+
+        segments = match.group(1).split("/")
+        segments[:-1] = filter(None, segments[:-1])
+        resolved_segments = _resolve_dot_segments(
+            base_segments.copy(), segments
+        )
+        if segments[-1] in (".", ".."):
+            resolved_segments.append("")
+
+        path = "/".join(resolved_segments)
+
+        return (
+            origin
+            + ("" if path.startswith("/") else "/")
+            + path
+            + match.group(2)
+        )
+
+    return join
+
+
+def _resolve_dot_segments(
+    resolved_segments: list[str], segments: typing.Iterable[str]
+) -> list[str]:
+    for segment in segments:
+        if segment == "..":
+            if resolved_segments:
+                resolved_segments.pop()
+        elif segment != ".":
+            resolved_segments.append(segment)
+
+    return resolved_segments
+
+
+@functools.lru_cache(maxsize=None)
+def _is_ascii_superset(encoding: str) -> bool:
+    # The stateful encodings can encode the ASCII characters as others.
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    if "2022" in name or name in ("utf-7", "hz"):
+        return False
+
+    characters = "<>!-/='\"\t\n abcdefghijklmnopqrstuvwxyz"
+    try:
+        return characters.encode(name) == characters.encode("ascii")
+    except UnicodeError:
+        return False
+
+
+def _replace_entities(href: str) -> str:
+    replaced = []
+    position = 0
+    for match in _ENTITY_RE.finditer(href):
+        replaced.append(href[position : match.start()])
+        position = match.end()
+
+        decimal, hexadecimal, name = match.groups()
+        if name is not None:
+            codepoint = _ENTITIES.get(name)
+            replaced.append(
+                chr(codepoint) if codepoint is not None else match.group(0)
+            )
+            continue
+
+        codepoint = (
+            int(decimal)
+            if decimal
+            else int(hexadecimal, 16)
+            if hexadecimal
+            else 0
+        )
+        # The HTML parser of libxml2 ends the value at the references which
+        # are malformed or don't refer to XML characters.
+        if not _is_xml_character(codepoint):
+            return "".join(replaced)
+        replaced.append(chr(codepoint))
+
+    replaced.append(href[position:])
+
+    return "".join(replaced)
+
+
+def _is_xml_character(codepoint: int) -> bool:
+    return (
+        codepoint in (0x9, 0xA, 0xD)
+        or 0x20 <= codepoint <= 0xD7FF
+        or 0xE000 <= codepoint <= 0xFFFD
+        or 0x10000 <= codepoint <= 0x10FFFF
+    )
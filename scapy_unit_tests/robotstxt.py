@@ -0,0 +1,339 @@
+"""Robots.txt parser backends, mirroring scrapy.robotstxt"""
+
+import collections
+import functools
+import logging
+import math
+import os
+import threading
+import time
+import typing
+import urllib.parse
+from urllib.robotparser import RobotFileParser
+
+from scrapy.robotstxt import PythonRobotParser, RobotParser, decode_robotstxt
+from scrapy.utils.python import to_unicode
+
+from scapy_unit_tests.chunks import map_chunks
+
+USER_AGENTS_CACHE_SIZE = 1024
+DEFAULT_ROBOTS_CACHE_SIZE = 1024
+DEFAULT_ROBOTS_CACHE_TTL = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class RuleTrieNode:
+    """Node of a prefix trie holding the rules of an user-agent group."""
+
+    __slots__ = ("children", "rule_index", "subtree_min_index")
+
+    def __init__(self) -> None:
+        self.children: dict[str, RuleTrieNode] = {}
+        self.rule_index = math.inf
+        self.subtree_min_index = math.inf
+
+
+class CompiledRuleGroup:
+    """Rules of an user-agent group compiled into a prefix trie.
+
+    As urllib.robotparser does, the first rule (in the file order) whose path
+    prefixes the URL decides the allowance. Each trie node knows the lowest
+    rule index below it, so the walk stops as soon as no deeper rule can
+    precede the best one already found.
+    """
+
+    def __init__(self, entry: typing.Any) -> None:
+        self.allowances = [rule.allowance for rule in entry.rulelines]
+        self.root = RuleTrieNode()
+
+        # The paths are already quoted by RobotFileParser, so a "*" path is
+        # matched literally, as "%2A", like any other one.
+        for index, rule in enumerate(entry.rulelines):
+            self._insert(rule.path, index)
+
+    def allowance(self, url: str) -> bool:
+        node = self.root
+        best_index = node.rule_index
+
+        for char in url:
+            child = node.children.get(char)
+            if child is None or child.subtree_min_index >= best_index:
+                break
+
+            node = child
+            if node.rule_index < best_index:
+                best_index = node.rule_index
+
+        if best_index == math.inf:
+            return True
+
+        return self.allowances[int(best_index)]
+
+    def _insert(self, path: str, index: int) -> None:
+        node = self.root
+        node.subtree_min_index = min(node.subtree_min_index, index)
+
+        for char in path:
+            node = node.children.setdefault(char, RuleTrieNode())
+            node.subtree_min_index = min(node.subtree_min_index, index)
+
+        node.rule_index = min(node.rule_index, index)
+
+
+class CompiledRobotParser(RobotParser):
+    """Drop-in replacement of PythonRobotParser, answering allowed() in a
+    time proportional to the URL's length instead of the number of rules.
+
+    The robots.txt body can also be given already parsed, as a
+    RobotFileParser.
+    """
+
+    def __init__(self, robotstxt_body: typing.Any, spider: typing.Any) -> None:
+        self.spider = spider
+        # The parsed entries are not part of RobotFileParser's typed API.
+        self.rp: typing.Any
+        if isinstance(robotstxt_body, RobotFileParser):
+            self.rp = robotstxt_body
+        else:
+            robotstxt_body = decode_robotstxt(
+                robotstxt_body, spider, to_native_str_type=True
+            )
+            self.rp = RobotFileParser()
+            self.rp.parse(robotstxt_body.splitlines())
+        self._compile()
+
+    def __getstate__(self) -> dict:
+        # The cache of the groups is rebuilt once unpickled
+        state = self.__dict__.copy()
+        del state["_find_group"]
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._cache_find_group()
+
+    @classmethod
+    def from_crawler(
+        cls, crawler: typing.Any, robotstxt_body: typing.Any
+    ) -> "CompiledRobotParser":
+        spider = None if not crawler else crawler.spider
+        o = cls(robotstxt_body, spider)
+        return o
+
+    def allowed(self, url: typing.Any, user_agent: typing.Any) -> bool:
+        if self.rp.disallow_all:
+            return False
+        if self.rp.allow_all:
+            return True
+
+        group = self._find_group(to_unicode(user_agent))
+        if group is None:
+            return True
+
+        return group.allowance(normalize_url(to_unicode(url)))
+
+    def _compile(self) -> None:
+        self.groups = [
+            (
+                [agent.lower() for agent in entry.useragents],
+                CompiledRuleGroup(entry),
+            )
+            for entry in self.rp.entries
+        ]
+        self.default_group = (
+            CompiledRuleGroup(self.rp.default_entry)
+            if self.rp.default_entry
+            else None
+        )
+        self._cache_find_group()
+
+    def _cache_find_group(self) -> None:
+        self._find_group = functools.lru_cache(maxsize=USER_AGENTS_CACHE_SIZE)(
+            self._find_group_uncached
+        )
+
+    def _find_group_uncached(
+        self, user_agent: str
+    ) -> typing.Optional[CompiledRuleGroup]:
+        name = user_agent.split("/")[0].lower()
+        for agents, group in self.groups:
+            if any(agent == "*" or agent in name for agent in agents):
+                return group
+
+        return self.default_group
+
+
+def normalize_url(url: str) -> str:
+    """Reduces an URL to its quoted path, as RobotFileParser.can_fetch does."""
+    parsed_url = urllib.parse.urlparse(urllib.parse.unquote(url))
+    url = urllib.parse.urlunparse(
+        (
+            "",
+            "",
+            parsed_url.path,
+            parsed_url.params,
+            parsed_url.query,
+            parsed_url.fragment,
+        )
+    )
+
+    return urllib.parse.quote(url) or "/"
+
+
+def iter_robotstxt_lines(
+    path: typing.Union[str, os.PathLike]
+) -> typing.Generator[str, None, None]:
+    """Yields the lines of a (gzipped) robots.txt file, as str.splitlines
+    splits its decoded content, decoding the memory-mapped file line by line
+    instead of as a whole."""
+    pending = b""
+    for chunk in map_chunks(path):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            # The lines are also split on the other line boundaries.
+            yield from line.decode("utf-8").splitlines() or [""]
+
+    if pending:
+        yield from pending.decode("utf-8").splitlines()
+
+
+def robot_parser_from_path(
+    path: typing.Union[str, os.PathLike],
+    spider: typing.Any = None,
+    parser_class: type[RobotParser] = PythonRobotParser,
+) -> RobotParser:
+    """Returns a parser of a (gzipped) robots.txt file, as parser_class
+    parses its content.
+
+    The parsers built on RobotFileParser, PythonRobotParser,
+    CompiledRobotParser and their subclasses, are fed with the lines of
+    iter_robotstxt_lines. CompiledRobotParser is given the parsed
+    RobotFileParser, and PythonRobotParser an empty body, whose parser is
+    then replaced. The other ones are given the whole decompressed content.
+    """
+    if not issubclass(parser_class, (PythonRobotParser, CompiledRobotParser)):
+        return parser_class(  # type: ignore[call-arg]
+            b"".join(map_chunks(path)), spider
+        )
+
+    # The parsed entries are not part of RobotFileParser's typed API.
+    rp: typing.Any = RobotFileParser()
+    try:
+        rp.parse(iter_robotstxt_lines(path))
+    except UnicodeDecodeError:
+        # As decode_robotstxt, the file is treated as an empty one.
+        logger.warning(
+            (
+                "Failure while parsing robots.txt. File either contains"
+                " garbage or is in an encoding other than UTF-8, treating it"
+                " as an empty file."
+            ),
+            exc_info=True,
+            extra={"spider": spider},
+        )
+        rp = RobotFileParser()
+        rp.parse([])
+
+    if issubclass(parser_class, CompiledRobotParser):
+        return parser_class(rp, spider)
+
+    parser: typing.Any = parser_class(b"", spider)  # type: ignore[call-arg]
+    parser.rp = rp
+
+    return parser
+
+
+class RobotsCache:
+    """Size-bounded LRU cache of parsed robots.txt objects, whose entries
+    expire after a given number of seconds.
+
+    As the cache can be shared by several crawlers, its size and TTL can be
+    configured once, by the first of them calling configure().
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_ROBOTS_CACHE_SIZE,
+        ttl: float = DEFAULT_ROBOTS_CACHE_TTL,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._configured = False
+        self._entries: collections.OrderedDict[
+            typing.Hashable, tuple[float, RobotParser]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure(
+        self,
+        maxsize: typing.Optional[int] = None,
+        ttl: typing.Optional[float] = None,
+    ) -> bool:
+        """Sets the given size and TTL if the cache was not configured yet,
+        and returns whether they are the ones in use."""
+        with self._lock:
+            if not self._configured:
+                self._configured = True
+                if maxsize is not None:
+                    self.maxsize = maxsize
+                if ttl is not None:
+                    self.ttl = ttl
+
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+                return True
+
+            return (maxsize is None or maxsize == self.maxsize) and (
+                ttl is None or ttl == self.ttl
+            )
+
+    def get(self, key: typing.Hashable) -> typing.Optional[RobotParser]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                self._entries.pop(key, None)
+                self.misses += 1
+
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key: typing.Hashable, parser: RobotParser) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, parser)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def keys(self) -> list[typing.Hashable]:
+        """Returns the keys, from the least to the most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        """Removes the entries and resets the counters and the
+        configuration."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self._configured = False
+
+
+robots_cache = RobotsCache()
@@ -0,0 +1,153 @@
+"""Schedulers, mirroring scrapy.core.scheduler"""
+
+import typing
+
+from scrapy import signals
+from scrapy.core.scheduler import Scheduler
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import Request
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.request import request_from_dict
+
+from scapy_unit_tests.frontier import FrontierClient, PushedRequest
+
+DEFAULT_FRONTIER_BATCH_SIZE = 64
+DEFAULT_FRONTIER_POLL_INTERVAL = 0.05
+
+
+class ShardedScheduler(Scheduler):
+    """Scheduler of a shard of a crawl, exchanging its requests with the
+    other shards through the frontier served at FRONTIER_ADDRESS.
+
+    The scheduled requests are pushed to the frontier, in batches of
+    FRONTIER_BATCH_SIZE, which deduplicates them and routes them to the shard
+    of their host. The requests of the shard FRONTIER_SHARD are popped from
+    the frontier into the local queues when they are empty. While the spider
+    is idle, the frontier is polled every FRONTIER_POLL_INTERVAL seconds,
+    until the whole crawl is finished.
+
+    As with JOBDIR, the callbacks of the requests must be methods of the
+    spider, as they are serialized.
+    """
+
+    frontier: FrontierClient
+    shard: int
+    batch_size: int
+    poll_interval: float
+    _pushed_requests: list[PushedRequest]
+    _pulled_requests: set[Request]
+    _poll_call: typing.Any
+
+    def open(self, spider: typing.Any) -> typing.Any:
+        settings = self.crawler.settings  # type: ignore[union-attr]
+        self.frontier = FrontierClient(
+            settings["FRONTIER_ADDRESS"], settings["FRONTIER_AUTHKEY"]
+        )
+        self.shard = settings.getint("FRONTIER_SHARD")
+        self.batch_size = settings.getint(
+            "FRONTIER_BATCH_SIZE", DEFAULT_FRONTIER_BATCH_SIZE
+        )
+        self.poll_interval = settings.getfloat(
+            "FRONTIER_POLL_INTERVAL", DEFAULT_FRONTIER_POLL_INTERVAL
+        )
+        self._pushed_requests = []
+        self._pulled_requests = set()
+        self._poll_call = None
+
+        self.crawler.signals.connect(  # type: ignore[union-attr]
+            self._spider_idle, signal=signals.spider_idle
+        )
+
+        return super().open(spider)
+
+    def close(self, reason: str) -> typing.Any:
+        if self._poll_call is not None and self._poll_call.active():
+            self._poll_call.cancel()
+
+        # The queue of the shard is dropped and its hosts are assigned to the
+        # other shards, so that they don't wait for it.
+        self.frontier.close_shard(self.shard)
+        self.frontier.close()
+
+        return super().close(reason)
+
+    def has_pending_requests(self) -> bool:
+        return len(self) > 0 or bool(self._pushed_requests)
+
+    def enqueue_request(self, request: Request) -> bool:
+        # The requests popped while the spider is idle are crawled by the
+        # engine, to wake it up, and enqueued locally.
+        if request in self._pulled_requests:
+            self._pulled_requests.remove(request)
+
+            return super().enqueue_request(request)
+
+        fingerprinter = self.crawler.request_fingerprinter  # type: ignore
+        fingerprint = (
+            None if request.dont_filter else fingerprinter.fingerprint(request)
+        )
+        self._pushed_requests.append(
+            (
+                urlparse_cached(request).hostname or "",
+                fingerprint,
+                request.to_dict(spider=self.spider),
+            )
+        )
+        if len(self._pushed_requests) >= self.batch_size:
+            self._flush()
+
+        return True
+
+    def next_request(self) -> typing.Optional[Request]:
+        self._flush()
+        if not len(self):
+            for request in self._pop():
+                super().enqueue_request(request)
+
+        return super().next_request()
+
+    def _flush(self) -> None:
+        if self._pushed_requests:
+            self.frontier.push(self._pushed_requests)
+            self._pushed_requests = []
+
+    def _pop(self, idle: bool = False) -> list[Request]:
+        return [
+            request_from_dict(request, spider=self.spider)
+            for request in self.frontier.pop(self.shard, self.batch_size, idle)
+        ]
+
+    def _spider_idle(self, spider: typing.Any) -> None:
+        if not self._poll():
+            raise DontCloseSpider
+
+    def _poll(self) -> bool:
+        """Pops the requests of the idle shard, and returns whether the whole
+        crawl is finished."""
+        self._flush()
+        requests = self._pop(idle=True)
+        if requests:
+            engine = self.crawler.engine  # type: ignore[union-attr]
+            for request in requests:
+                self._pulled_requests.add(request)
+                engine.crawl(request)
+
+            return False
+
+        if self.frontier.finished():
+            return True
+
+        if self._poll_call is None or not self._poll_call.active():
+            from twisted.internet import reactor
+
+            self._poll_call = reactor.callLater(  # type: ignore
+                self.poll_interval, self._poll_later
+            )
+
+        return False
+
+    def _poll_later(self) -> None:
+        engine = self.crawler.engine  # type: ignore[union-attr]
+        # The spider may have been woken up by requests popped meanwhile.
+        if engine.spider_is_idle() and self._poll():
+            engine.close_spider(self.spider, "finished")
@@ -0,0 +1,588 @@
+"""Incremental parsing of sitemaps, mirroring scrapy.utils.sitemap.Sitemap"""
+
+import collections
+import collections.abc
+import datetime
+import functools
+import itertools
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import typing
+
+import lxml.etree
+import numpy
+
+from scapy_unit_tests.chunks import (
+    DEFAULT_CHUNK_SIZE,
+    buffer_chunks,
+    map_chunks,
+    maybe_gunzip,
+    read_chunks,
+)
+
+DEFAULT_BATCH_SIZE = 64 * 1024
+LASTMOD_CACHE_SIZE = 4096
+LOCAL_NAMES_CACHE_SIZE = 256
+SEEN_INDEX_BATCH_SIZE = 500
+# Fields of SitemapEntry, in the order of its mapping
+SITEMAP_ENTRY_FIELDS = (
+    "loc",
+    "lastmod",
+    "changefreq",
+    "priority",
+    "alternate",
+)
+# Tags of the entries, in any namespace
+ENTRY_TAGS = ("{*}url", "{*}sitemap")
+# Types of the columns of SitemapBatch
+LASTMOD_DTYPE = numpy.dtype("datetime64[s]")
+STRING_DTYPE = numpy.dtypes.StringDType()
+NULLABLE_STRING_DTYPE = numpy.dtypes.StringDType(na_object=None)
+
+Chunk = typing.Union[bytes, str]
+SitemapSource = typing.Union[
+    Chunk, os.PathLike, typing.BinaryIO, typing.Iterable[bytes]
+]
+Event = typing.Tuple[str, lxml.etree._Element]
+EntryT = typing.TypeVar("EntryT", bound=typing.Mapping)
+
+
+class StreamingSitemap:
+    """Sitemap parser yielding the same entries as Sitemap.__iter__, but
+    releasing each entry's element as soon as it was parsed.
+
+    The source may be the document itself, the path of a file (as a
+    os.PathLike, which is memory-mapped), a binary file or an iterable of
+    chunks, optionally gzipped. Unlike Sitemap, it can be iterated only once.
+    """
+
+    def __init__(
+        self, source: SitemapSource, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        self._chunks = iter_chunks(source, chunk_size)
+        self._parser = lxml.etree.XMLPullParser(
+            events=("end",),
+            recover=True,
+            remove_comments=True,
+            resolve_entities=False,
+        )
+        self._pending: typing.Deque[Event] = collections.deque()
+
+        self._root = self._read_root()
+        self.type = local_name(self._root.tag)
+
+    def __iter__(self) -> typing.Generator[dict, None, None]:
+        return self._iter_entries(element_to_entry)
+
+    def entries(self) -> typing.Generator["SitemapEntry", None, None]:
+        """Yields the entries as compact SitemapEntry objects, instead of
+        dicts."""
+        return self._iter_entries(SitemapEntry.from_element)
+
+    def _iter_entries(
+        self, convert: typing.Callable[[lxml.etree._Element], EntryT]
+    ) -> typing.Generator[EntryT, None, None]:
+        for event, elem in self._events():
+            if elem.getparent() is not self._root:
+                continue
+
+            entry = convert(elem)
+            release_element(elem)
+
+            if "loc" in entry:
+                yield entry
+
+    def _read_root(self) -> lxml.etree._Element:
+        for events in self._parse():
+            self._pending.extend(events)
+            if self._pending:
+                return self._pending[0][1].getroottree().getroot()
+
+        raise ValueError("The sitemap has no root element.")
+
+    def _events(self) -> typing.Generator[Event, None, None]:
+        while self._pending:
+            yield self._pending.popleft()
+
+        for events in self._parse():
+            yield from events
+
+    def _parse(self) -> typing.Generator[list[Event], None, None]:
+        for chunk in self._chunks:
+            self._parser.feed(chunk)
+            yield list(self._parser.read_events())
+
+        # On empty documents, this raises the same XMLSyntaxError as Sitemap.
+        self._parser.close()
+        yield list(self._parser.read_events())
+
+
+def local_name(tag: str) -> str:
+    """Returns a tag without its namespace, as Sitemap does."""
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+@functools.lru_cache(maxsize=LOCAL_NAMES_CACHE_SIZE)
+def cached_local_name(tag: str) -> str:
+    """Memoized local_name, for the tags of the children of the entries."""
+    return local_name(tag)
+
+
+def element_to_entry(elem: lxml.etree._Element) -> dict:
+    """Converts an <url> or <sitemap> element into Sitemap's dict format."""
+    entry: dict = {}
+    for child in elem.iterchildren():
+        name = local_name(child.tag)
+
+        if name == "link":
+            if "href" in child.attrib:
+                entry.setdefault("alternate", []).append(child.get("href"))
+        else:
+            entry[name] = child.text.strip() if child.text else ""
+
+    return entry
+
+
+class SitemapEntry(collections.abc.Mapping):
+    """Compact <url> or <sitemap> entry, with the priority parsed as a float
+    and the lastmod as a POSIX timestamp in seconds (None if missing or
+    invalid).
+
+    It is a read-only mapping of the present fields, so that it can be used
+    in place of the dicts of Sitemap, and converted into one by dict().
+    """
+
+    __slots__ = (
+        "loc",
+        "lastmod",
+        "changefreq",
+        "priority",
+        "alternate",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        loc: typing.Optional[str] = None,
+        lastmod: typing.Optional[int] = None,
+        changefreq: typing.Optional[str] = None,
+        priority: typing.Optional[float] = None,
+        alternate: typing.Optional[list[str]] = None,
+        extra: typing.Optional[dict[str, str]] = None,
+    ) -> None:
+        self.loc = loc
+        self.lastmod = lastmod
+        self.changefreq = changefreq
+        self.priority = priority
+        self.alternate = alternate
+        # The other children, as in the dicts of Sitemap
+        self.extra = extra
+
+    @classmethod
+    def from_element(cls, elem: lxml.etree._Element) -> "SitemapEntry":
+        entry = cls()
+        for child in elem.iterchildren():
+            name = local_name(child.tag)
+            text = child.text.strip() if child.text else ""
+
+            if name == "loc":
+                entry.loc = text
+            elif name == "lastmod":
+                lastmod = parse_lastmod(text)
+                entry.lastmod = None if lastmod is None else int(lastmod)
+            elif name == "changefreq":
+                # There are only a few distinct frequencies.
+                entry.changefreq = sys.intern(text)
+            elif name == "priority":
+                entry.priority = parse_priority(text)
+            elif name == "link":
+                if "href" in child.attrib:
+                    if entry.alternate is None:
+                        entry.alternate = []
+                    entry.alternate.append(child.get("href"))
+            else:
+                if entry.extra is None:
+                    entry.extra = {}
+                entry.extra[name] = text
+
+        return entry
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in SITEMAP_ENTRY_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+
+        raise KeyError(key)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for field in SITEMAP_ENTRY_FIELDS:
+            if getattr(self, field) is not None:
+                yield field
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"SitemapEntry({dict(self)!r})"
+
+
+def iter_sitemap_batches(
+    source: SitemapSource,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Generator["SitemapBatch", None, None]:
+    """Yields the <url> or <sitemap> entries of a sitemap source, as
+    StreamingSitemap accepts it, in columns, by batches of at most batch_size
+    entries.
+
+    Only the entry elements are reported by the parser, instead of all the
+    elements, and their children other than the SitemapEntry fields are
+    ignored.
+    """
+    columns = _SitemapColumns()
+    for elem in _iter_entry_elements(iter_chunks(source, chunk_size)):
+        columns.append(elem)
+        release_element(elem)
+
+        if columns.count >= batch_size:
+            yield columns.build()
+            columns = _SitemapColumns()
+
+    if columns.count:
+        yield columns.build()
+
+
+def _iter_entry_elements(
+    chunks: typing.Iterable[Chunk],
+) -> typing.Generator[lxml.etree._Element, None, None]:
+    parser = lxml.etree.XMLPullParser(
+        events=("end",),
+        tag=ENTRY_TAGS,
+        recover=True,
+        remove_comments=True,
+        resolve_entities=False,
+    )
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is None:
+            # On empty documents, this raises the same XMLSyntaxError as
+            # Sitemap.
+            parser.close()
+        else:
+            parser.feed(chunk)
+
+        for _, elem in parser.read_events():
+            # Only the children of the root are entries.
+            parent = elem.getparent()
+            if parent is not None and parent.getparent() is None:
+                yield elem
+
+
+class SitemapBatch(typing.NamedTuple):
+    """Entries of a sitemap in columns, as Arrow record batches: the lastmods
+    are NaT, the priorities NaN and the change frequencies None when missing
+    or invalid. The alternate links of all the entries are concatenated, the
+    ones of the i-th entry being between its offset and the next one."""
+
+    loc: numpy.ndarray
+    lastmod: numpy.ndarray
+    changefreq: numpy.ndarray
+    priority: numpy.ndarray
+    alternate: numpy.ndarray
+    alternate_offsets: numpy.ndarray
+
+    def to_entries(self) -> list[SitemapEntry]:
+        lastmods = self.lastmod.astype(numpy.int64).astype(object)
+        lastmods[numpy.isnat(self.lastmod)] = None
+        priorities = self.priority.astype(object)
+        priorities[numpy.isnan(self.priority)] = None
+        alternates = self.alternate.tolist()
+        offsets = self.alternate_offsets.tolist()
+
+        return [
+            SitemapEntry(
+                loc,
+                lastmod,
+                changefreq,
+                priority,
+                alternates[start:end] or None,
+            )
+            for loc, lastmod, changefreq, priority, start, end in zip(
+                self.loc.tolist(),
+                lastmods.tolist(),
+                self.changefreq.tolist(),
+                priorities.tolist(),
+                offsets,
+                offsets[1:],
+            )
+        ]
+
+
+class _SitemapColumns:
+    # Columns of a SitemapBatch being built
+    def __init__(self) -> None:
+        self.count = 0
+        self.locs: list[str] = []
+        self.lastmods: list[typing.Optional[int]] = []
+        self.changefreqs: list[typing.Optional[str]] = []
+        self.priorities: list[typing.Optional[float]] = []
+        self.alternates: list[str] = []
+        self.alternate_offsets = [0]
+
+    def append(self, elem: lxml.etree._Element) -> None:
+        loc = lastmod = changefreq = priority = None
+        alternates_count = len(self.alternates)
+        for child in elem.iterchildren():
+            name = cached_local_name(child.tag)
+
+            if name == "link":
+                href = child.get("href")
+                if href is not None:
+                    self.alternates.append(href)
+                continue
+
+            text = child.text.strip() if child.text else ""
+            if name == "loc":
+                loc = text
+            elif name == "lastmod":
+                lastmod = text
+            elif name == "changefreq":
+                changefreq = text
+            elif name == "priority":
+                priority = text
+
+        if loc is None:
+            # As the entries without loc are skipped, so are their links.
+            del self.alternates[alternates_count:]
+            return
+
+        parsed_lastmod = parse_lastmod(lastmod)
+        self.count += 1
+        self.locs.append(loc)
+        self.lastmods.append(
+            None if parsed_lastmod is None else int(parsed_lastmod)
+        )
+        self.changefreqs.append(changefreq)
+        self.priorities.append(
+            None if priority is None else parse_priority(priority)
+        )
+        self.alternate_offsets.append(len(self.alternates))
+
+    def build(self) -> SitemapBatch:
+        return SitemapBatch(
+            numpy.array(self.locs, dtype=STRING_DTYPE),
+            numpy.array(self.lastmods, dtype=LASTMOD_DTYPE),
+            numpy.array(self.changefreqs, dtype=NULLABLE_STRING_DTYPE),
+            numpy.array(self.priorities, dtype=numpy.float64),
+            numpy.array(self.alternates, dtype=STRING_DTYPE),
+            numpy.array(self.alternate_offsets, dtype=numpy.int64),
+        )
+
+
+def parse_priority(value: str) -> typing.Optional[float]:
+    """Returns a priority as a float, or None if it is invalid."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def release_element(elem: lxml.etree._Element) -> None:
+    """Frees an already parsed element and its preceding siblings."""
+    elem.clear(keep_tail=True)
+
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+
+def iter_chunks(
+    source: SitemapSource, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> typing.Generator[Chunk, None, None]:
+    """Yields the (decompressed) chunks of a sitemap source."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+
+    if isinstance(source, os.PathLike):
+        yield from map_chunks(source, chunk_size)
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        yield from buffer_chunks(source, chunk_size)
+        return
+
+    raw_chunks: typing.Iterable[bytes]
+    if hasattr(source, "read"):
+        raw_chunks = read_chunks(
+            typing.cast(typing.BinaryIO, source), chunk_size
+        )
+    else:
+        raw_chunks = typing.cast(typing.Iterable[bytes], source)
+
+    yield from maybe_gunzip(raw_chunks, chunk_size)
+
+
+@functools.lru_cache(maxsize=LASTMOD_CACHE_SIZE)
+def parse_lastmod(value: typing.Optional[str]) -> typing.Optional[float]:
+    """Returns a W3C datetime, the format of the lastmod of the sitemaps, as a
+    POSIX timestamp. The values without a timezone are considered in UTC, and
+    the missing or invalid ones are returned as None."""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        # YYYY and YYYY-MM, which datetime.fromisoformat does not accept
+        if len(value) in (4, 7):
+            date = datetime.datetime.strptime(
+                value, "%Y" if len(value) == 4 else "%Y-%m"
+            )
+        else:
+            date = datetime.datetime.fromisoformat(
+                value.replace("Z", "+00:00")
+            )
+    except ValueError:
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+
+    return date.timestamp()
+
+
+def entry_lastmod(entry: typing.Mapping) -> typing.Optional[float]:
+    """Returns the lastmod of a sitemap entry as a POSIX timestamp, whether it
+    is a dict of Sitemap or a SitemapEntry, whose lastmod is parsed."""
+    lastmod = entry.get("lastmod")
+
+    return lastmod if isinstance(lastmod, int) else parse_lastmod(lastmod)
+
+
+class SeenIndex:
+    """Persistent index mapping the URLs already crawled from sitemaps to
+    their last seen lastmod (as a timestamp, or None if it was missing),
+    stored in a SQLite database.
+
+    The index can be shared by threads. Its changes are saved by commit() and
+    close().
+    """
+
+    def __init__(self, filename: str = ":memory:") -> None:
+        self.filename = filename
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen"
+                " (url TEXT PRIMARY KEY, lastmod REAL) WITHOUT ROWID"
+            )
+            self._connection.commit()
+
+    def __enter__(self) -> "SeenIndex":
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM seen"
+            ).fetchone()[0]
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.get_many([url])
+
+    def get(self, url: str) -> typing.Optional[float]:
+        return self.get_many([url]).get(url)
+
+    def get_many(
+        self, urls: typing.Sequence[str]
+    ) -> dict[str, typing.Optional[float]]:
+        """Returns the last seen lastmod of the given URLs which are in the
+        index."""
+        found: dict[str, typing.Optional[float]] = {}
+        with self._lock:
+            for start in range(0, len(urls), SEEN_INDEX_BATCH_SIZE):
+                batch = urls[start : start + SEEN_INDEX_BATCH_SIZE]
+                found.update(
+                    self._connection.execute(
+                        (
+                            "SELECT url, lastmod FROM seen WHERE url IN"
+                            f" ({', '.join('?' * len(batch))})"
+                        ),
+                        batch,
+                    )
+                )
+
+        return found
+
+    def update(self, url: str, lastmod: typing.Optional[float]) -> None:
+        self.update_many([(url, lastmod)])
+
+    def update_many(
+        self, items: typing.Iterable[tuple[str, typing.Optional[float]]]
+    ) -> None:
+        """Records URLs with their lastmod, unless an older one than the
+        already recorded one."""
+        with self._lock:
+            self._connection.executemany(
+                (
+                    "INSERT INTO seen VALUES (?, ?) ON CONFLICT (url) DO"
+                    " UPDATE SET lastmod = excluded.lastmod WHERE seen.lastmod"
+                    " IS NULL OR excluded.lastmod > seen.lastmod"
+                ),
+                items,
+            )
+
+    def is_modified(self, url: str, lastmod: typing.Optional[float]) -> bool:
+        return self._is_modified(url, lastmod, self.get_many([url]))
+
+    def filter_modified(
+        self, entries: typing.Iterable[EntryT]
+    ) -> typing.Generator[EntryT, None, None]:
+        """Yields the sitemap entries whose URL is not in the index, or whose
+        lastmod advanced since it was recorded. The entries without a valid
+        lastmod are always yielded."""
+        iterator = iter(entries)
+        while batch := list(itertools.islice(iterator, SEEN_INDEX_BATCH_SIZE)):
+            seen = self.get_many([entry["loc"] for entry in batch])
+            for entry in batch:
+                if self._is_modified(entry["loc"], entry_lastmod(entry), seen):
+                    yield entry
+
+    def commit(self) -> None:
+        with self._lock:
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    @staticmethod
+    def _is_modified(
+        url: str,
+        lastmod: typing.Optional[float],
+        seen: dict[str, typing.Optional[float]],
+    ) -> bool:
+        if url not in seen:
+            return True
+
+        seen_lastmod = seen[url]
+
+        return (
+            lastmod is None or seen_lastmod is None or lastmod > seen_lastmod
+        )
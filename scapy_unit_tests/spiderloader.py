@@ -0,0 +1,130 @@
+"""Spider loaders, mirroring scrapy.spiderloader"""
+
+import importlib
+import traceback
+import typing
+import warnings
+from collections import defaultdict
+
+from scrapy import Spider
+from scrapy.interfaces import ISpiderLoader
+from scrapy.utils.spider import iter_spider_classes
+from zope.interface import implementer
+
+from scapy_unit_tests.misc import (
+    ScanCache,
+    SpiderCandidate,
+    find_spider_candidates,
+    scan_cache,
+)
+
+
+@implementer(ISpiderLoader)
+class LazySpiderLoader:
+    """SpiderLoader discovering the spiders by scanning the sources of the
+    SPIDER_MODULES, and importing the module of a spider only when it is
+    loaded.
+
+    The scanned sources are cached while their modification time and size
+    are unchanged. If the SPIDER_DISCOVERY_CACHE setting is set, the cache is
+    persisted to this file between the runs.
+    """
+
+    def __init__(self, settings: typing.Any) -> None:
+        self.spider_modules = settings.getlist("SPIDER_MODULES")
+        self.warn_only = settings.getbool("SPIDER_LOADER_WARN_ONLY")
+
+        cache_filename = settings.get("SPIDER_DISCOVERY_CACHE")
+        self.cache = (
+            ScanCache(cache_filename) if cache_filename else scan_cache
+        )
+
+        self._candidates: dict[str, SpiderCandidate] = {}
+        self._spiders: dict[str, type[Spider]] = {}
+        self._found: dict[str, list[SpiderCandidate]] = defaultdict(list)
+        self._discover_all_spiders()
+
+    @classmethod
+    def from_settings(cls, settings: typing.Any) -> "LazySpiderLoader":
+        return cls(settings)
+
+    def load(self, spider_name: str) -> type[Spider]:
+        """Returns the spider class for the given spider name, importing its
+        module if needed. If the spider name is not found, raises a
+        KeyError."""
+        spider = self._spiders.get(spider_name)
+        if spider is not None:
+            return spider
+
+        candidate = self._candidates.get(spider_name)
+        if candidate is not None:
+            module = importlib.import_module(candidate.module)
+            for spider in iter_spider_classes(module):
+                if (spider.__name__, spider.name) == (
+                    candidate.class_name,
+                    spider_name,
+                ):
+                    self._spiders[spider_name] = spider
+
+                    return spider
+
+        raise KeyError(f"Spider not found: {spider_name}")
+
+    def find_by_request(self, request: typing.Any) -> list[str]:
+        """Returns the names of the spiders which can handle the given
+        request. All the spider modules are imported."""
+        names = []
+        for name in self.list():
+            try:
+                spider = self.load(name)
+            except KeyError:
+                continue
+
+            if spider.handles_request(request):
+                names.append(name)
+
+        return names
+
+    def list(self) -> list[str]:
+        """Returns the names of all the spiders found in the project."""
+        return list(self._candidates.keys())
+
+    def _discover_all_spiders(self) -> None:
+        for name in self.spider_modules:
+            try:
+                for candidate in find_spider_candidates(name, self.cache):
+                    self._found[candidate.name].append(candidate)
+                    self._candidates[candidate.name] = candidate
+            except (ImportError, SyntaxError):
+                if self.warn_only:
+                    warnings.warn(
+                        (
+                            f"\n{traceback.format_exc()}Could not load spiders"
+                            f" from module '{name}'. See above traceback for"
+                            " details."
+                        ),
+                        category=RuntimeWarning,
+                    )
+                else:
+                    raise
+
+        self.cache.save()
+        self._check_name_duplicates()
+
+    def _check_name_duplicates(self) -> None:
+        dupes = [
+            f"  {candidate.class_name} named {name!r} (in {candidate.module})"
+            for name, candidates in self._found.items()
+            if len(candidates) > 1
+            for candidate in candidates
+        ]
+
+        if dupes:
+            dupes_string = "\n\n".join(dupes)
+            warnings.warn(
+                (
+                    "There are several spiders with the same name:\n\n"
+                    f"{dupes_string}\n\n  This can cause unexpected behavior."
+                ),
+                category=UserWarning,
+            )
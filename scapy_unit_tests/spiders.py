@@ -0,0 +1,238 @@
+"""Spiders, mirroring scrapy.spiders"""
+
+import logging
+import os
+import typing
+import urllib.parse
+
+from scrapy import signals
+from scrapy.http import Request, Response
+from scrapy.settings import SETTINGS_PRIORITIES
+from scrapy.spiders import SitemapSpider
+from scrapy.spiders.sitemap import iterloc
+from scrapy.utils.project import data_path
+from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
+from twisted.internet import threads
+
+from scapy_unit_tests.offloading import (
+    ParsedSitemap,
+    deferred_from_future,
+    get_parser_pool,
+)
+from scapy_unit_tests.sitemap import SeenIndex, entry_lastmod
+
+DEFAULT_SITEMAP_CONCURRENCY_PER_HOST = 8
+DEFAULT_SITEMAP_SEEN_INDEX = "sitemap_seen.sqlite3"
+SITEMAP_SLOT_PREFIX = "sitemap:"
+SITEMAP_SLOT_MIDDLEWARE = (
+    "scapy_unit_tests.downloadermiddlewares.SitemapSlotMiddleware"
+)
+# Close to the downloader, so that the slots are created right before it
+# looks them up
+SITEMAP_SLOT_MIDDLEWARE_ORDER = 950
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutSitemapSpider(SitemapSpider):
+    """SitemapSpider fetching the sitemaps in dedicated download slots, one
+    per host, and parsing them out of the reactor thread.
+
+    The sitemaps of a host are downloaded with at most
+    SITEMAP_CONCURRENCY_PER_HOST concurrent requests, independently of the
+    pages of this host, and before them thanks to their sitemap_priority. The
+    requests discovered in a sitemap are scheduled as soon as it is parsed.
+    Their slots are created by the SitemapSlotMiddleware, which the spider
+    adds to the DOWNLOADER_MIDDLEWARES.
+
+    With the "thread" SITEMAP_PARSING_MODE, the sitemaps are parsed in the
+    reactor thread pool, whose size is set by REACTOR_THREADPOOL_MAXSIZE.
+    With the "process" one, they are parsed in the pool of
+    PARSER_POOL_PROCESSES processes, so the parsing doesn't hold the GIL of
+    the reactor.
+    """
+
+    sitemap_priority = 1
+
+    @classmethod
+    def update_settings(cls, settings: typing.Any) -> None:
+        super().update_settings(settings)
+
+        middlewares = settings.getdict("DOWNLOADER_MIDDLEWARES")
+        if SITEMAP_SLOT_MIDDLEWARE not in middlewares:
+            middlewares[
+                SITEMAP_SLOT_MIDDLEWARE
+            ] = SITEMAP_SLOT_MIDDLEWARE_ORDER
+            settings.set(
+                "DOWNLOADER_MIDDLEWARES",
+                middlewares,
+                priority=max(
+                    settings.getpriority("DOWNLOADER_MIDDLEWARES") or 0,
+                    SETTINGS_PRIORITIES["spider"],
+                ),
+            )
+
+    def start_requests(self) -> typing.Iterable[Request]:
+        for url in self.sitemap_urls:
+            yield self._sitemap_request(url)
+
+    async def _parse_sitemap(
+        self, response: Response
+    ) -> typing.AsyncGenerator[Request, None]:
+        if response.url.endswith("/robots.txt"):
+            for url in sitemap_urls_from_robots(
+                response.text, base_url=response.url
+            ):
+                yield self._sitemap_request(url)
+            return
+
+        body = self._get_sitemap_body(response)
+        if body is None:
+            logger.warning(
+                "Ignoring invalid sitemap: %(response)s",
+                {"response": response},
+                extra={"spider": self},
+            )
+            return
+
+        requests: typing.Iterable[Request]
+        mode = self.settings.get("SITEMAP_PARSING_MODE", "thread")
+        if mode == "thread":
+            requests = await threads.deferToThread(
+                self._parse_sitemap_body, body
+            )
+        elif mode == "process":
+            pool = get_parser_pool(
+                self.settings.getint("PARSER_POOL_PROCESSES")
+            )
+            sitemap = await deferred_from_future(pool.parse_sitemap(body))
+            # Built lazily, as the scraper consumes them
+            requests = self._sitemap_requests(sitemap)
+        else:
+            raise ValueError(f"Invalid SITEMAP_PARSING_MODE: {mode!r}")
+
+        for request in requests:
+            yield request
+
+    def _parse_sitemap_body(self, body: bytes) -> list[Request]:
+        # Runs in the reactor thread pool
+        return list(self._sitemap_requests(Sitemap(body)))
+
+    def _sitemap_requests(
+        self, sitemap: typing.Union[Sitemap, ParsedSitemap]
+    ) -> typing.Generator[Request, None, None]:
+        locs = iterloc(
+            self.sitemap_filter(sitemap), self.sitemap_alternate_links
+        )
+
+        if sitemap.type == "sitemapindex":
+            for loc in locs:
+                if any(follow.search(loc) for follow in self._follow):
+                    yield self._sitemap_request(loc)
+        elif sitemap.type == "urlset":
+            for loc in locs:
+                for rule, callback in self._cbs:
+                    if rule.search(loc):
+                        yield Request(loc, callback=callback)
+                        break
+
+    def _sitemap_request(self, url: str) -> Request:
+        host = urllib.parse.urlsplit(url).hostname or ""
+
+        return Request(
+            url,
+            callback=self._parse_sitemap,
+            priority=self.sitemap_priority,
+            meta={"download_slot": SITEMAP_SLOT_PREFIX + host},
+        )
+
+
+class IncrementalSitemapSpider(SitemapSpider):
+    """SitemapSpider skipping the pages whose lastmod did not advance since
+    they were last crawled.
+
+    The lastmod of the crawled pages are kept in a SeenIndex, stored in the
+    SITEMAP_SEEN_INDEX file (relative to the project data directory). A page
+    is recorded once the crawl closes, if a successful response was received
+    for it and its callback didn't raise, so the failed requests are retried
+    by the next crawl. The child sitemaps of the sitemap indexes are always
+    fetched again, as their pages may not all have been recorded.
+    """
+
+    seen_index: SeenIndex
+    _pending_lastmods: dict[str, typing.Optional[float]]
+    _responded_lastmods: dict[str, typing.Optional[float]]
+
+    @classmethod
+    def from_crawler(
+        cls, crawler: typing.Any, *args: typing.Any, **kwargs: typing.Any
+    ) -> "IncrementalSitemapSpider":
+        spider = super().from_crawler(crawler, *args, **kwargs)
+
+        filename = data_path(
+            crawler.settings.get(
+                "SITEMAP_SEEN_INDEX", DEFAULT_SITEMAP_SEEN_INDEX
+            )
+        )
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        spider.seen_index = SeenIndex(filename)
+        spider._pending_lastmods = {}
+        spider._responded_lastmods = {}
+
+        crawler.signals.connect(
+            spider._record_response, signal=signals.response_received
+        )
+        crawler.signals.connect(
+            spider._forget_failed_response, signal=signals.spider_error
+        )
+        crawler.signals.connect(
+            spider._close_seen_index, signal=signals.spider_closed
+        )
+
+        return spider
+
+    def sitemap_filter(
+        self, entries: typing.Iterable[dict]
+    ) -> typing.Generator[dict, None, None]:
+        if getattr(entries, "type", None) == "sitemapindex":
+            yield from super().sitemap_filter(entries)
+            return
+
+        # The sitemap is already parsed, so its entries are kept to count
+        # the skipped ones.
+        entries = list(super().sitemap_filter(entries))
+
+        modified_count = 0
+        for entry in self.seen_index.filter_modified(entries):
+            modified_count += 1
+            self._pending_lastmods[entry["loc"]] = entry_lastmod(entry)
+            yield entry
+
+        self.crawler.stats.inc_value(
+            "sitemap/unmodified_count", len(entries) - modified_count
+        )
+
+    def _record_response(
+        self, response: Response, request: Request, spider: typing.Any
+    ) -> None:
+        if spider is not self or response.status >= 400:
+            return
+
+        url = request.meta.get("redirect_urls", [request.url])[0]
+        if url in self._pending_lastmods:
+            self._responded_lastmods[url] = self._pending_lastmods.pop(url)
+
+    def _forget_failed_response(
+        self, failure: typing.Any, response: Response, spider: typing.Any
+    ) -> None:
+        # Sent when the callback of the response raised
+        if spider is self:
+            url = response.meta.get("redirect_urls", [response.url])[0]
+            self._responded_lastmods.pop(url, None)
+
+    def _close_seen_index(self, spider: typing.Any) -> None:
+        if spider is self:
+            self.seen_index.update_many(self._responded_lastmods.items())
+            self.seen_index.close()
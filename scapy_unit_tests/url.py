@@ -0,0 +1,229 @@
+"""URL functions, mirroring scrapy.utils.url"""
+
+import functools
+import re
+import string
+import typing
+from urllib.parse import ParseResult, urlparse, urlunparse
+
+import numpy
+from scrapy.utils.url import _is_posix_path, _is_windows_path, strip_url
+
+STRIP_URL_CACHE_SIZE = 64 * 1024
+DEFAULT_PORTS = {("http", 80), ("https", 443), ("ftp", 21)}
+
+PATH_WINDOW = 16
+
+# Fields of the arrays returned by classify_paths
+PATH_KINDS_DTYPE = numpy.dtype(
+    [("posix", numpy.bool_), ("windows", numpy.bool_), ("uri", numpy.bool_)]
+)
+# The letters matched by the case-insensitive [a-z] of _is_windows_path,
+# including the non-ASCII ones whose case folding is an ASCII letter
+_DRIVE_LETTERS = numpy.array(
+    [
+        ord(letter)
+        for letter in string.ascii_letters + "\u0130\u0131\u017f\u212a"
+    ],
+    dtype=numpy.uint32,
+)
+# Code of all the non-ASCII characters, and whether the codes are the ones of
+# word characters
+_NON_ASCII = 128
+_ASCII_WORD_CODES = numpy.zeros(_NON_ASCII + 1, dtype=numpy.bool_)
+_ASCII_WORD_CODES[
+    [
+        ord(character)
+        for character in string.ascii_letters + string.digits + "_"
+    ]
+] = True
+# Same as add_http_if_no_scheme
+_URI_RE = re.compile(r"^\w+://", flags=re.I)
+
+
+@functools.lru_cache(maxsize=STRIP_URL_CACHE_SIZE)
+def cached_strip_url(
+    url: str,
+    strip_credentials: bool = True,
+    strip_default_port: bool = True,
+    origin_only: bool = False,
+    strip_fragment: bool = True,
+) -> str:
+    """Memoized strip_url, for the URLs which are stripped repeatedly."""
+    return strip_url(
+        url, strip_credentials, strip_default_port, origin_only, strip_fragment
+    )
+
+
+def strip_urls(
+    urls: typing.Iterable[str],
+    strip_credentials: bool = True,
+    strip_default_port: bool = True,
+    origin_only: bool = False,
+    strip_fragment: bool = True,
+) -> list[str]:
+    """Strips URLs with the same flags as strip_url, parsing each distinct URL
+    only once."""
+    stripped_urls: dict[str, str] = {}
+    results = []
+
+    for url in urls:
+        stripped = stripped_urls.get(url)
+        if stripped is None:
+            stripped = _strip_parsed_url(
+                urlparse(url),
+                strip_credentials,
+                strip_default_port,
+                origin_only,
+                strip_fragment,
+            )
+            stripped_urls[url] = stripped
+
+        results.append(stripped)
+
+    return results
+
+
+def _strip_parsed_url(
+    parsed_url: ParseResult,
+    strip_credentials: bool,
+    strip_default_port: bool,
+    origin_only: bool,
+    strip_fragment: bool,
+) -> str:
+    # Same logic as strip_url, but the costlier properties of ParseResult are
+    # read only if the netloc may contain credentials or a port.
+    netloc = parsed_url.netloc
+    if (
+        (strip_credentials or origin_only)
+        and "@" in netloc
+        and (parsed_url.username or parsed_url.password)
+    ):
+        netloc = netloc.split("@")[-1]
+    if strip_default_port and ":" in parsed_url.netloc:
+        port = parsed_url.port
+        if port and (parsed_url.scheme, port) in DEFAULT_PORTS:
+            netloc = netloc.replace(f":{port}", "")
+
+    return urlunparse(
+        (
+            parsed_url.scheme,
+            netloc,
+            "/" if origin_only else parsed_url.path,
+            "" if origin_only else parsed_url.params,
+            "" if origin_only else parsed_url.query,
+            "" if strip_fragment else parsed_url.fragment,
+        )
+    )
+
+
+def classify_paths(
+    strings: typing.Union[typing.Sequence[str], numpy.ndarray]
+) -> numpy.ndarray:
+    """Returns whether each string is a POSIX path, a Windows path or a URI,
+    as _is_posix_path, _is_windows_path and add_http_if_no_scheme check it,
+    in the posix, windows and uri boolean fields of an array.
+
+    The strings are classified together from the code points of their first
+    PATH_WINDOW characters, with the non-ASCII ones folded into a single
+    code. The few strings which can't be classified from them, like those
+    with a non-ASCII or a too long scheme, are classified one by one.
+    """
+    count = len(strings)
+    kinds = numpy.zeros(count, dtype=PATH_KINDS_DTYPE)
+    if not count:
+        return kinds
+
+    # Unlike len, numpy.strings.str_len ignores the trailing null characters.
+    lengths = numpy.fromiter(
+        map(
+            len,
+            strings.tolist()
+            if isinstance(strings, numpy.ndarray)
+            else strings,
+        ),
+        numpy.intp,
+        count,
+    )
+    points = (
+        numpy.asarray(strings, dtype=f"U{PATH_WINDOW}")
+        .view(numpy.uint32)
+        .reshape(count, PATH_WINDOW)
+    )
+    codes = numpy.minimum(points, _NON_ASCII).astype(numpy.uint8)
+    rows = numpy.arange(count)
+    first = points[:, 0]
+
+    # A POSIX path has a "/" followed by a character other than a newline,
+    # preceded by nothing, "~", ".", "..", or "." and a name without dots.
+    slash = _first_of(codes == ord("/"))
+    dots = codes == ord(".")
+    dots[:, 0] = False
+    second_dot = _first_of(dots)
+    following = codes[rows, numpy.minimum(slash + 1, PATH_WINDOW - 1)]
+    kinds["posix"] = (
+        (
+            (slash == 0)
+            | ((slash == 1) & (first == ord("~")))
+            | (
+                (first == ord("."))
+                & (((slash == 2) & (second_dot == 1)) | (second_dot > slash))
+            )
+        )
+        & (lengths > slash + 1)
+        & ((following != ord("\n")) | (slash + 1 >= PATH_WINDOW))
+    )
+    # The dots and the slash may be after the window.
+    undecided = (
+        (first == ord("."))
+        & (slash >= PATH_WINDOW - 1)
+        & (second_dot == PATH_WINDOW)
+        & (lengths > PATH_WINDOW)
+    )
+
+    kinds["windows"] = ((first == ord("\\")) & (codes[:, 1] == ord("\\"))) | (
+        (codes[:, 1] == ord(":"))
+        & (codes[:, 2] == ord("\\"))
+        & numpy.isin(first, _DRIVE_LETTERS)
+    )
+
+    # A URI starts with word characters followed by "://".
+    separator = _first_of(
+        (codes[:, :-2] == ord(":"))
+        & (codes[:, 1:-1] == ord("/"))
+        & (codes[:, 2:] == ord("/"))
+    )
+    non_word = _first_of(~_ASCII_WORD_CODES[codes])
+    non_word_code = codes[rows, non_word % PATH_WINDOW]
+    kinds["uri"] = (
+        (separator > 0)
+        & (separator < PATH_WINDOW - 2)
+        & (non_word == separator)
+    )
+    # The non-ASCII characters may be word ones, and the separator may be
+    # after the window.
+    undecided |= (non_word < separator) & (non_word_code == _NON_ASCII)
+    undecided |= (
+        (separator == PATH_WINDOW)
+        & (lengths > PATH_WINDOW - 2)
+        & ((non_word >= PATH_WINDOW - 2) | (non_word_code == _NON_ASCII))
+    )
+
+    for index in numpy.flatnonzero(undecided):
+        string_ = str(strings[index])
+        kinds[index] = (
+            _is_posix_path(string_),
+            _is_windows_path(string_),
+            _URI_RE.match(string_) is not None,
+        )
+
+    return kinds
+
+
+def _first_of(mask: numpy.ndarray) -> numpy.ndarray:
+    # Index of the first true column of each row, or PATH_WINDOW if none is
+    index = mask.argmax(axis=1)
+
+    return numpy.where(
+        mask[numpy.arange(len(mask)), index], index, PATH_WINDOW
+    )
@@ -0,0 +1,134 @@
+import typing
+
+import pytest
+from benchmarks.crawl import CrawlBenchmark
+from benchmarks.harness import (
+    BYTES_PER_MEGABYTE,
+    Benchmark,
+    Measurement,
+    load_baseline,
+    save_baseline,
+    slowdown,
+)
+from tabulate import tabulate
+
+RESULTS_KEY: pytest.StashKey[dict[str, Measurement]] = pytest.StashKey()
+BASELINE_KEY: pytest.StashKey[dict[str, Measurement]] = pytest.StashKey()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(
+    request: pytest.FixtureRequest,
+) -> typing.Generator[dict[str, Measurement], None, None]:
+    config = request.config
+    config.stash[BASELINE_KEY] = load_baseline(
+        config.getoption("benchmark_baseline")
+    )
+    results: dict[str, Measurement] = {}
+    config.stash[RESULTS_KEY] = results
+
+    yield results
+
+    if config.getoption("benchmark_save"):
+        save_baseline(config.getoption("benchmark_baseline"), results)
+
+
+@pytest.fixture
+def benchmark(
+    request: pytest.FixtureRequest, benchmark_results: dict[str, Measurement]
+) -> Benchmark:
+    return Benchmark(
+        f"{request.module.__name__.rsplit('.', 1)[-1]}::{request.node.name}",
+        request.config.stash[BASELINE_KEY],
+        benchmark_results,
+        request.config.getoption("benchmark_tolerance"),
+    )
+
+
+@pytest.fixture
+def crawl_benchmark(
+    request: pytest.FixtureRequest, benchmark_results: dict[str, Measurement]
+) -> CrawlBenchmark:
+    crawl_benchmark = CrawlBenchmark(
+        f"{request.module.__name__.rsplit('.', 1)[-1]}::{request.node.name}",
+        request.config.stash[BASELINE_KEY],
+        benchmark_results,
+        request.config.getoption("benchmark_tolerance"),
+    )
+    crawl_benchmark.executable = request.config.getoption("benchmark_python")
+
+    return crawl_benchmark
+
+
+def pytest_terminal_summary(
+    terminalreporter: typing.Any, config: pytest.Config
+) -> None:
+    results: dict[str, Measurement] = config.stash.get(RESULTS_KEY, {})
+    if not results:
+        return
+
+    baseline: dict[str, Measurement] = config.stash.get(BASELINE_KEY, {})
+    rows = []
+    for name, measurement in sorted(results.items()):
+        reference = baseline.get(name)
+        rows.append(
+            [
+                f"`{name}`",
+                f"{measurement.ops_per_second:.0f}",
+                f"{measurement.allocated_bytes_per_call:.0f}"
+                if measurement.allocated_bytes_per_call is not None
+                else "-",
+                f"{measurement.megabytes_per_second:.1f}"
+                if measurement.megabytes_per_second is not None
+                else "-",
+                f"{reference.ops_per_second:.0f}" if reference else "-",
+                f"{-slowdown(measurement, reference):+.1f}%"
+                if reference
+                else "-",
+            ]
+        )
+
+    terminalreporter.write_sep("=", "benchmarks")
+    terminalreporter.write_line(
+        tabulate(
+            rows,
+            [
+                "Benchmark",
+                "Ops/sec",
+                "Allocated bytes/call",
+                "MB/sec",
+                "Baseline ops/sec",
+                "Change",
+            ],
+            tablefmt="github",
+        )
+    )
+
+    crawl_rows = [
+        [
+            f"`{name}`",
+            f"{measurement.ops_per_second:.1f}",
+            f"{measurement.latency_p50 * 1000:.1f}",
+            f"{measurement.latency_p99 * 1000:.1f}",
+            f"{measurement.peak_rss_bytes / BYTES_PER_MEGABYTE:.1f}",
+        ]
+        for name, measurement in sorted(results.items())
+        if measurement.latency_p50 is not None
+        and measurement.latency_p99 is not None
+        and measurement.peak_rss_bytes is not None
+    ]
+    if crawl_rows:
+        terminalreporter.write_sep("=", "crawls")
+        terminalreporter.write_line(
+            tabulate(
+                crawl_rows,
+                [
+                    "Benchmark",
+                    "Pages/sec",
+                    "p50 latency (ms)",
+                    "p99 latency (ms)",
+                    "Peak RSS (MB)",
+                ],
+                tablefmt="github",
+            )
+        )
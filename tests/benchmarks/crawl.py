@@ -0,0 +1,136 @@
+"""Harness measuring the throughput, the latency and the memory usage of
+crawls of a local link graph"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+import typing
+
+from benchmarks.harness import Benchmark, Measurement
+
+CRAWL_ROUNDS = 3
+
+CRAWL_SCRIPT = """
+import json
+import resource
+import sys
+import time
+
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from test_crawler_start import WrapperSpider
+
+latencies = []
+engine_times = []
+
+
+class LinkGraphSpider(WrapperSpider):
+    name = "link_graph"
+    start_urls = [sys.argv[2]]
+
+    def parse(self, response):
+        latencies.append(time.perf_counter() - response.meta["received_at"])
+        super().parse(response)
+
+        for link in response.css("a::attr(href)").getall():
+            yield response.follow(link)
+
+
+def record_reception(response, request, spider):
+    request.meta["received_at"] = time.perf_counter()
+
+
+def record_engine_time():
+    engine_times.append(time.perf_counter())
+
+
+process = CrawlerProcess(
+    settings={
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        **json.loads(sys.argv[1]),
+    }
+)
+crawler = process.create_crawler(LinkGraphSpider)
+crawler.signals.connect(record_reception, signal=signals.response_received)
+crawler.signals.connect(record_engine_time, signal=signals.engine_started)
+crawler.signals.connect(record_engine_time, signal=signals.engine_stopped)
+process.crawl(crawler)
+process.start()
+
+print(
+    json.dumps(
+        {
+            "seconds": engine_times[1] - engine_times[0],
+            "latencies": latencies,
+            # In kilobytes on Linux
+            "peak_rss_bytes": (
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            ),
+        }
+    )
+)
+"""
+
+
+def percentile(values: typing.Sequence[float], q: float) -> float:
+    """Returns the nearest-rank q-percentile of the values."""
+    ordered_values = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered_values)), 1)
+
+    return ordered_values[rank - 1]
+
+
+def run_crawl(
+    url: str, settings: dict, executable: str = sys.executable
+) -> Measurement:
+    """Crawls the link graph starting at the URL in a new process, running
+    the given Python executable, and returns the crawled pages per second,
+    the delays from the responses' receptions to their callbacks, and the
+    peak RSS of the process."""
+    output = subprocess.check_output(
+        [executable, "-c", CRAWL_SCRIPT, json.dumps(settings), url],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    result = json.loads(output)
+    latencies = result["latencies"]
+
+    return Measurement(
+        len(latencies) / result["seconds"],
+        latency_p50=percentile(latencies, 50),
+        latency_p99=percentile(latencies, 99),
+        peak_rss_bytes=result["peak_rss_bytes"],
+    )
+
+
+class CrawlBenchmark(Benchmark):
+    """Callable crawling a link graph in several rounds, recording the
+    fastest one and failing the test when its pages per second are lower
+    than the baseline ones.
+
+    The crawls are run by the Python executable set in executable, which can
+    be the one of another environment, for example to compare Scrapy
+    versions.
+    """
+
+    executable = sys.executable
+
+    def __call__(  # type: ignore[override]
+        self,
+        url: str,
+        settings: typing.Optional[dict] = None,
+        rounds: int = CRAWL_ROUNDS,
+    ) -> Measurement:
+        measurements = [
+            run_crawl(url, settings or {}, self.executable)
+            for _ in range(rounds)
+        ]
+
+        return self.record(
+            max(
+                measurements,
+                key=lambda measurement: measurement.ops_per_second,
+            )
+        )
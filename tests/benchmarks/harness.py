@@ -0,0 +1,188 @@
+"""Harness measuring the throughput and the allocations of the tested APIs"""
+
+import gc
+import json
+import math
+import os
+import time
+import tracemalloc
+import typing
+from dataclasses import asdict, dataclass
+
+import pytest
+
+DEFAULT_BASELINE = os.path.join(".benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 25.0
+ROUNDS = 5
+MIN_ROUND_TIME = 0.05
+ALLOCATION_CALLS = 10
+BYTES_PER_MEGABYTE = 1000 * 1000
+
+
+@dataclass
+class Measurement:
+    ops_per_second: float
+    allocated_bytes_per_call: typing.Optional[float] = None
+    megabytes_per_second: typing.Optional[float] = None
+    # Set for the crawls, whose operations are the crawled pages
+    latency_p50: typing.Optional[float] = None
+    latency_p99: typing.Optional[float] = None
+    peak_rss_bytes: typing.Optional[int] = None
+
+
+class Benchmark:
+    """Callable measuring a function, recording the result and failing the
+    test when it is slower than its baseline.
+
+    If the number of bytes processed by each call is set in processed_bytes,
+    the data throughput is recorded too.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        baseline: dict[str, Measurement],
+        results: dict[str, Measurement],
+        tolerance: float = DEFAULT_TOLERANCE,
+    ) -> None:
+        self.name = name
+        self.baseline = baseline
+        self.results = results
+        self.tolerance = tolerance
+        self.processed_bytes: typing.Optional[int] = None
+
+    def __call__(
+        self,
+        function: typing.Callable,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> Measurement:
+        measurement = measure(lambda: function(*args, **kwargs))
+        if self.processed_bytes is not None:
+            measurement.megabytes_per_second = (
+                measurement.ops_per_second
+                * self.processed_bytes
+                / BYTES_PER_MEGABYTE
+            )
+
+        return self.record(measurement)
+
+    def record(self, measurement: Measurement) -> Measurement:
+        self.results[self.name] = measurement
+
+        reference = self.baseline.get(self.name)
+        if reference and is_regression(measurement, reference, self.tolerance):
+            pytest.fail(
+                f"{self.name} is {slowdown(measurement, reference):.1f}%"
+                f" slower than its baseline ({measurement.ops_per_second:.0f}"
+                f" vs. {reference.ops_per_second:.0f} ops/sec), exceeding the"
+                f" tolerance of {self.tolerance}%."
+            )
+
+        return measurement
+
+
+def measure(call: typing.Callable[[], typing.Any]) -> Measurement:
+    return Measurement(measure_throughput(call), measure_allocations(call))
+
+
+def measure_throughput(
+    call: typing.Callable[[], typing.Any],
+    rounds: int = ROUNDS,
+    min_round_time: float = MIN_ROUND_TIME,
+) -> float:
+    loops = calibrate_loops(call, min_round_time)
+
+    best_time = math.inf
+    for _ in range(rounds):
+        best_time = min(best_time, time_loops(call, loops))
+
+    return loops / best_time
+
+
+def calibrate_loops(
+    call: typing.Callable[[], typing.Any], min_round_time: float
+) -> int:
+    loops = 1
+    while time_loops(call, loops) < min_round_time:
+        loops *= 2
+
+    return loops
+
+
+def time_loops(call: typing.Callable[[], typing.Any], loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure_allocations(
+    call: typing.Callable[[], typing.Any], calls: int = ALLOCATION_CALLS
+) -> float:
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    try:
+        allocated = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+
+            allocated += peak - current
+
+        return allocated / calls
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def is_regression(
+    measurement: Measurement, reference: Measurement, tolerance: float
+) -> bool:
+    return slowdown(measurement, reference) > tolerance
+
+
+def slowdown(measurement: Measurement, reference: Measurement) -> float:
+    ratio = measurement.ops_per_second / reference.ops_per_second
+
+    return (1 - ratio) * 100
+
+
+def load_baseline(filename: str) -> dict[str, Measurement]:
+    if not os.path.isfile(filename):
+        return {}
+
+    with open(filename) as file:
+        raw_baseline = json.load(file)
+
+    return {
+        name: Measurement(**values) for name, values in raw_baseline.items()
+    }
+
+
+def save_baseline(filename: str, results: dict[str, Measurement]) -> None:
+    baseline = load_baseline(filename)
+    baseline.update(results)
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(filename, "w") as file:
+        json.dump(
+            {name: asdict(value) for name, value in sorted(baseline.items())},
+            file,
+            indent=4,
+        )
@@ -0,0 +1,46 @@
+"""Benchmarks for scapy_unit_tests.postprocessing.BufferedPlugin's write()"""
+
+import io
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.extensions.postprocessing import PostProcessingManager
+
+JSON_LINES = [
+    b'{"url": "https://example.com/%d", "title": "Example"}\n' % index
+    for index in range(10000)
+]
+
+
+def __export(plugins: list[str]) -> None:
+    manager = PostProcessingManager(
+        plugins, io.BytesIO(), feed_options={"gzip_compresslevel": 9}
+    )
+    for line in JSON_LINES:
+        manager.write(line)
+    manager.close()
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_gzip_export(benchmark: Benchmark) -> None:
+    """Benchmarks the export of JSON lines compressed one by one with GZIP."""
+    benchmark.processed_bytes = sum(map(len, JSON_LINES))
+    benchmark(__export, ["scrapy.extensions.postprocessing.GzipPlugin"])
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_buffered_gzip_export(benchmark: Benchmark) -> None:
+    """Benchmarks the export of JSON lines buffered before being compressed
+    with GZIP."""
+    benchmark.processed_bytes = sum(map(len, JSON_LINES))
+    benchmark(
+        __export,
+        [
+            "scapy_unit_tests.postprocessing.BufferedPlugin",
+            "scrapy.extensions.postprocessing.GzipPlugin",
+        ],
+    )
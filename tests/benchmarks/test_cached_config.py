@@ -0,0 +1,43 @@
+"""Benchmarks for scapy_unit_tests.conf.get_config, caching the merged
+configuration"""
+
+import tempfile
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.conf import get_config as uncached_get_config
+
+from scapy_unit_tests.conf import get_config
+
+CONFIG = "[settings]\ndefault = project.settings\n\n[deploy]\n" + "".join(
+    f"option_{index} = value_{index}\n" for index in range(50)
+)
+
+
+def __use_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.NamedTemporaryFile("w", delete=False) as temp:
+        temp.write(CONFIG)
+
+    monkeypatch.setattr("scrapy.utils.conf.get_sources", lambda _: [temp.name])
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_get_config(
+    benchmark: Benchmark, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Benchmarks the parsing of a configuration."""
+    __use_config(monkeypatch)
+    benchmark(uncached_get_config)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_cached_get_config(
+    benchmark: Benchmark, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Benchmarks the retrieval of an unchanged configuration."""
+    __use_config(monkeypatch)
+    benchmark(get_config)
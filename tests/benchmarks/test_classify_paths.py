@@ -0,0 +1,48 @@
+"""Benchmarks for scapy_unit_tests.url.classify_paths"""
+
+import itertools
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.url import _is_posix_path
+
+from scapy_unit_tests.url import classify_paths
+
+STRINGS_COUNT = 100_000
+STRINGS_TEMPLATES = [
+    "/home/iosifache/unit/test{}.py",
+    "~/exports/{}.jl",
+    "./relative/{}",
+    "C:\\Users\\iosifache\\{}.csv",
+    "s3://bucket/key/{}",
+    "https://www.example.com/page/{}",
+    "data/{}.csv",
+]
+STRINGS = [
+    template.format(index)
+    for index, template in zip(
+        range(STRINGS_COUNT), itertools.cycle(STRINGS_TEMPLATES)
+    )
+]
+
+
+def __is_posix_paths(strings: list[str]) -> list[bool]:
+    return [_is_posix_path(string) for string in strings]
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_posix_path_loop(benchmark: Benchmark) -> None:
+    """Benchmarks the recognition of the POSIX paths of a batch, one by
+    one."""
+    benchmark(__is_posix_paths, STRINGS)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_classified_paths(benchmark: Benchmark) -> None:
+    """Benchmarks the recognition of the POSIX paths, the Windows paths and
+    the URIs of a batch, together."""
+    benchmark(classify_paths, STRINGS)
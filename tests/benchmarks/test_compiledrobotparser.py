@@ -0,0 +1,46 @@
+"""Benchmarks for scapy_unit_tests.robotstxt.CompiledRobotParser.allowed,
+compared to scrapy.robotstxt.PythonRobotParser.allowed
+"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.robotstxt import PythonRobotParser
+
+from scapy_unit_tests.robotstxt import CompiledRobotParser
+
+RULES_COUNT = 5000
+CHECKED_URL = "https://example.com/catalog/item/4999?ref=home"
+
+
+def __generate_robotstxt(rules_count: int) -> str:
+    rules = [
+        f"Disallow: /section-{index}/private\nAllow: /section-{index}/"
+        for index in range(rules_count // 2)
+    ]
+
+    return "User-agent: *\n" + "\n".join(rules)
+
+
+LARGE_ROBOTSTXT = __generate_robotstxt(RULES_COUNT)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+def test_python_parser_with_many_rules(benchmark: Benchmark) -> None:
+    """Benchmarks PythonRobotParser's check of an URL against 5000 rules."""
+    robot = PythonRobotParser(LARGE_ROBOTSTXT, None)
+
+    benchmark(robot.allowed, CHECKED_URL, "Googlebot")
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+def test_compiled_parser_with_many_rules(benchmark: Benchmark) -> None:
+    """Benchmarks CompiledRobotParser's check of an URL against 5000 rules."""
+    robot = CompiledRobotParser(LARGE_ROBOTSTXT, None)
+
+    benchmark(robot.allowed, CHECKED_URL, "Googlebot")
@@ -0,0 +1,27 @@
+"""Benchmarks for scrapy.utils.conf.get_config"""
+
+import pathlib
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.conf import get_config
+from test_config_parser import TWO_KEYS_CONFIG
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+def test_valid_parsing_of_two_keys(
+    benchmark: Benchmark,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+) -> None:
+    """Benchmarks the loading of a configuration with two keys."""
+    config_file = tmp_path / "scrapy.cfg"
+    config_file.write_text(TWO_KEYS_CONFIG)
+    monkeypatch.setattr(
+        "scrapy.utils.conf.get_sources", lambda _: [str(config_file)]
+    )
+
+    benchmark(get_config)
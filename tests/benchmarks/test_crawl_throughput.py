@@ -0,0 +1,58 @@
+"""Benchmarks for the crawls of a local link graph by
+scrapy.crawler.CrawlerProcess, with several reactors and concurrencies"""
+
+import typing
+
+import pytest
+from benchmarks.crawl import CrawlBenchmark
+from local_server import LocalServer, link_graph_routes
+
+GRAPH_PAGES = 300
+LINKS_PER_PAGE = 10
+PAGE_SIZE = 20_000
+SERVER_LATENCY = 0.005
+ASYNCIO_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+
+
+@pytest.fixture(scope="module")
+def link_graph_server() -> typing.Generator[LocalServer, None, None]:
+    with LocalServer(
+        link_graph_routes(GRAPH_PAGES, LINKS_PER_PAGE, PAGE_SIZE),
+        SERVER_LATENCY,
+    ) as server:
+        yield server
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_default_reactor(
+    crawl_benchmark: CrawlBenchmark, link_graph_server: LocalServer
+) -> None:
+    """Benchmarks the crawl of 300 pages with the default settings."""
+    crawl_benchmark(link_graph_server.url("/pages/0"))
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_asyncio_reactor(
+    crawl_benchmark: CrawlBenchmark, link_graph_server: LocalServer
+) -> None:
+    """Benchmarks the crawl of 300 pages with the asyncio reactor."""
+    crawl_benchmark(
+        link_graph_server.url("/pages/0"), {"TWISTED_REACTOR": ASYNCIO_REACTOR}
+    )
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_high_concurrency(
+    crawl_benchmark: CrawlBenchmark, link_graph_server: LocalServer
+) -> None:
+    """Benchmarks the crawl of 300 pages with 64 concurrent requests."""
+    crawl_benchmark(
+        link_graph_server.url("/pages/0"),
+        {"CONCURRENT_REQUESTS": 64, "CONCURRENT_REQUESTS_PER_DOMAIN": 64},
+    )
@@ -0,0 +1,46 @@
+"""Benchmarks for scapy_unit_tests.response.extract_links"""
+
+import typing
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.http import HtmlResponse
+from test_extract_links import create_page_response
+
+from scapy_unit_tests.response import extract_links
+
+PAGE_NAME = "news_front_page.html"
+
+
+def __css_links(response: HtmlResponse) -> list[str]:
+    return [
+        response.urljoin(href)
+        for href in response.css("a::attr(href)").getall()
+    ]
+
+
+def __extract_page_links(
+    extract_links_function: typing.Callable[[HtmlResponse], list[str]]
+) -> list[str]:
+    # A new response is created each time, to bypass the per-response caches.
+    return extract_links_function(create_page_response(PAGE_NAME))
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_css_links(benchmark: Benchmark) -> None:
+    """Benchmarks the pages per second whose links are selected by CSS and
+    joined to the base URL."""
+    benchmark.processed_bytes = len(create_page_response(PAGE_NAME).body)
+    benchmark(__extract_page_links, __css_links)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_extracted_links(benchmark: Benchmark) -> None:
+    """Benchmarks the pages per second whose links are extracted in a single
+    pass over the body."""
+    benchmark.processed_bytes = len(create_page_response(PAGE_NAME).body)
+    benchmark(__extract_page_links, extract_links)
@@ -0,0 +1,61 @@
+"""Benchmarks for scrapy.utils.get_base_url"""
+
+import typing
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.http import HtmlResponse
+from scrapy.utils.response import get_base_url
+
+from scapy_unit_tests.response import fast_get_base_url
+
+LARGE_PAGE_BODY = (
+    b"<html><head><base href='https://www.canonical.com'/></head><body>"
+    + b"<p>Content</p>" * (10 * 1024 * 1024 // 14)
+    + b"</body></html>"
+)
+
+
+class FakeResponseWithBase:
+    text: str = "<base href='https://www.canonical.com'/><b>Content</b>"
+    url: str = "https://google.com"
+    encoding: str = "utf-8"
+
+
+def __get_base_url_of_large_page(
+    get_base_url_function: typing.Callable[[typing.Any], str]
+) -> str:
+    # A new response is created each time, to bypass the per-response caches.
+    response = HtmlResponse(
+        "https://google.com",
+        body=LARGE_PAGE_BODY,
+        headers={"Content-Type": "text/html; charset=utf-8"},
+    )
+
+    return get_base_url_function(response)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_fake
+@pytest.mark.offline
+def test_with_base(benchmark: Benchmark) -> None:
+    """Benchmarks the extraction of the base URL specified in the body."""
+    benchmark(get_base_url, FakeResponseWithBase())
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_large_page(benchmark: Benchmark) -> None:
+    """Benchmarks the extraction of the base URL of a 10 MB page."""
+    benchmark(__get_base_url_of_large_page, get_base_url)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_fast_large_page(benchmark: Benchmark) -> None:
+    """Benchmarks the extraction of the base URL of a 10 MB page, from the
+    head only."""
+    benchmark(__get_base_url_of_large_page, fast_get_base_url)
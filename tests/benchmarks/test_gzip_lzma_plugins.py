@@ -0,0 +1,33 @@
+"""Benchmarks for GzipPlugin and LZMAPlugin's write() from
+scrapy.extensions.postprocessing
+"""
+
+import io
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.extensions.postprocessing import GzipPlugin, LZMAPlugin
+
+JSON_LINE = b'{"url": "https://example.com/", "title": "Example"}\n'
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_gzip_write(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a JSON line with GZIP."""
+    plugin = GzipPlugin(io.BytesIO(), feed_options={"gzip_compresslevel": 9})
+
+    benchmark(plugin.write, JSON_LINE)
+    plugin.close()
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_lzma_write(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a JSON line with LZMA."""
+    plugin = LZMAPlugin(io.BytesIO(), feed_options={})
+
+    benchmark(plugin.write, JSON_LINE)
+    plugin.close()
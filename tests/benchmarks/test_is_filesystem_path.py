@@ -0,0 +1,21 @@
+"""Benchmarks for scrapy.utils.url._is_posix_path"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.url import _is_posix_path
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_valid_file(benchmark: Benchmark) -> None:
+    """Benchmarks the recognition of a valid path."""
+    benchmark(_is_posix_path, "/home/iosifache/unit/test.py")
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_windows_path(benchmark: Benchmark) -> None:
+    """Benchmarks the rejection of a Windows path."""
+    benchmark(_is_posix_path, "C:\\Users\\iosifache")
@@ -0,0 +1,54 @@
+"""Benchmarks for the startup of scapy_unit_tests.spiderloader.LazySpiderLoader
+"""
+
+import typing
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+from test_lazy_walk_modules import generated_spider_package, purge_modules
+
+from scapy_unit_tests.misc import ScanCache, scan_cache
+from scapy_unit_tests.spiderloader import LazySpiderLoader
+
+SPIDER_MODULES_COUNT = 500
+
+
+def __start(
+    loader_class: typing.Any, package: str, cache: typing.Optional[ScanCache]
+) -> None:
+    purge_modules(package)
+    if cache is not None:
+        cache.clear()
+
+    loader_class.from_settings(Settings({"SPIDER_MODULES": [package]}))
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_startup(benchmark: Benchmark) -> None:
+    """Benchmarks the startup of SpiderLoader with 500 spider modules."""
+    with generated_spider_package(SPIDER_MODULES_COUNT) as package:
+        benchmark(__start, SpiderLoader, package, None)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_lazy_startup(benchmark: Benchmark) -> None:
+    """Benchmarks the startup of LazySpiderLoader with 500 spider modules,
+    scanning all their sources."""
+    with generated_spider_package(SPIDER_MODULES_COUNT) as package:
+        benchmark(__start, LazySpiderLoader, package, scan_cache)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_cached_lazy_startup(benchmark: Benchmark) -> None:
+    """Benchmarks the startup of LazySpiderLoader with 500 spider modules
+    whose sources were already scanned."""
+    with generated_spider_package(SPIDER_MODULES_COUNT) as package:
+        benchmark(__start, LazySpiderLoader, package, None)
@@ -0,0 +1,48 @@
+"""Benchmarks for scapy_unit_tests.postprocessing.ParallelGzipPlugin's
+write()
+"""
+
+import io
+
+import pytest
+from benchmarks.harness import Benchmark
+
+from scapy_unit_tests.postprocessing import ParallelGzipPlugin
+
+JSON_LINES = b"".join(
+    b'{"url": "https://example.com/%d", "title": "Example"}\n' % index
+    for index in range(80000)
+)
+
+
+def __export(workers: int) -> None:
+    plugin = ParallelGzipPlugin(
+        io.BytesIO(),
+        feed_options={"gzip_compresslevel": 9, "gzip_workers": workers},
+    )
+    plugin.write(JSON_LINES)
+    plugin.close()
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_export_with_one_worker(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 4 MB export with a single thread."""
+    benchmark(__export, 1)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_export_with_two_workers(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 4 MB export with two threads."""
+    benchmark(__export, 2)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_export_with_four_workers(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 4 MB export with four threads."""
+    benchmark(__export, 4)
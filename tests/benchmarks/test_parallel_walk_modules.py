@@ -0,0 +1,40 @@
+"""Benchmarks for scapy_unit_tests.misc.walk_modules, importing the
+submodules concurrently"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from test_lazy_walk_modules import purge_modules
+from test_parallel_walk_modules import generated_package
+
+from scapy_unit_tests.misc import walk_modules
+
+# Spider module doing a slow top-level work, such as loading its selectors
+SLOW_MODULE = "import time\n\ntime.sleep(0.005)\n"
+SLOW_PACKAGE_FILES = {
+    f"package_{package}/module_{module}.py": SLOW_MODULE
+    for package in range(4)
+    for module in range(8)
+}
+
+
+def __walk(package: str, workers: int) -> None:
+    purge_modules(package)
+    walk_modules(package, workers)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_serial_walk(benchmark: Benchmark) -> None:
+    """Benchmarks the serial walk of 32 slow modules."""
+    with generated_package(SLOW_PACKAGE_FILES) as package:
+        benchmark(__walk, package, 1)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_parallel_walk(benchmark: Benchmark) -> None:
+    """Benchmarks the walk of 32 slow modules with 8 workers."""
+    with generated_package(SLOW_PACKAGE_FILES) as package:
+        benchmark(__walk, package, 8)
@@ -0,0 +1,49 @@
+"""Benchmarks for the uploads of scapy_unit_tests.pipelines.PooledFTPFilesStore
+"""
+
+import io
+
+import pytest
+from benchmarks.harness import Benchmark
+from local_ftp_server import PASSWORD, USERNAME, LocalFTPServer
+from scrapy.utils.ftp import ftp_store_file
+
+from scapy_unit_tests.ftp import FTPConnectionPool, pooled_ftp_store_file
+
+IMAGE = b"\xff" * 16 * 1024
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_upload(benchmark: Benchmark) -> None:
+    """Benchmarks the upload of an image with a new connection."""
+    with LocalFTPServer() as server:
+        benchmark.processed_bytes = len(IMAGE)
+        benchmark(
+            lambda: ftp_store_file(
+                path="/full/image.jpg",
+                file=io.BytesIO(IMAGE),
+                host="127.0.0.1",
+                port=server.port,
+                username=USERNAME,
+                password=PASSWORD,
+            )
+        )
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_pooled_upload(benchmark: Benchmark) -> None:
+    """Benchmarks the upload of an image with a pooled connection."""
+    with LocalFTPServer() as server:
+        pool = FTPConnectionPool("127.0.0.1", server.port, USERNAME, PASSWORD)
+
+        benchmark.processed_bytes = len(IMAGE)
+        benchmark(
+            lambda: pooled_ftp_store_file(
+                pool=pool, path="/full/image.jpg", file=io.BytesIO(IMAGE)
+            )
+        )
+        pool.clear()
@@ -0,0 +1,17 @@
+"""Benchmarks for scrapy.robotstxt.PythonRobotParser.allowed"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.robotstxt import PythonRobotParser
+from test_pythonrobotparser import DUMMY_ROBOTSTXT
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+def test_valid_robots(benchmark: Benchmark) -> None:
+    """Benchmarks the check of a disallowed user agent."""
+    robot = PythonRobotParser(DUMMY_ROBOTSTXT, None)
+
+    benchmark(robot.allowed, "/", "YandexBot")
@@ -0,0 +1,63 @@
+"""Benchmarks for the lookups in scapy_unit_tests.sitemap.SeenIndex"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import typing
+
+import pytest
+from benchmarks.harness import Benchmark
+
+from scapy_unit_tests.sitemap import SEEN_INDEX_BATCH_SIZE, SeenIndex
+
+INDEX_SIZE = 10_000_000
+URL_FORMAT = "https://www.example.com/pages/%08d.html"
+LASTMOD = "2009-02-06"
+
+
+@pytest.fixture(scope="module")
+def seen_index() -> typing.Generator[SeenIndex, None, None]:
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "seen.sqlite3")
+        SeenIndex(filename).close()
+
+        # Filled in SQLite, as the Python inserts would take minutes
+        connection = sqlite3.connect(filename)
+        connection.execute(
+            "WITH RECURSIVE numbers(number) AS (SELECT 0 UNION ALL SELECT"
+            f" number + 1 FROM numbers WHERE number < {INDEX_SIZE - 1})"
+            f" INSERT INTO seen SELECT printf('{URL_FORMAT}', number),"
+            " 1233878400.0 FROM numbers"
+        )
+        connection.commit()
+        connection.close()
+
+        with SeenIndex(filename) as index:
+            yield index
+
+
+def __random_entries(count: int) -> list[dict]:
+    return [
+        {"loc": URL_FORMAT % random.randrange(INDEX_SIZE), "lastmod": LASTMOD}
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_lookup(benchmark: Benchmark, seen_index: SeenIndex) -> None:
+    """Benchmarks the lookup of an URL in a 10M entries index."""
+    url = __random_entries(1)[0]["loc"]
+    benchmark(seen_index.get, url)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_batch_filtering(benchmark: Benchmark, seen_index: SeenIndex) -> None:
+    """Benchmarks the filtering of a batch of 500 sitemap entries with a 10M
+    entries index."""
+    entries = __random_entries(SEEN_INDEX_BATCH_SIZE)
+    benchmark(lambda: list(seen_index.filter_modified(entries)))
@@ -0,0 +1,62 @@
+"""Benchmarks for scapy_unit_tests.sitemap.iter_sitemap_batches, against
+the dicts of scapy_unit_tests.sitemap.StreamingSitemap"""
+
+import time
+import typing
+
+import pytest
+from benchmarks.harness import BYTES_PER_MEGABYTE, Benchmark, Measurement
+from generated_sitemap import generate_sitemap
+
+from scapy_unit_tests.sitemap import StreamingSitemap, iter_sitemap_batches
+
+# As a sitemap has at most 50k URLs, the set of 1M URLs is made of 20
+# sitemaps. They are identical, the throughput not depending on their URLs.
+SITEMAP_ENTRIES = 50_000
+SITEMAPS_COUNT = 20
+SITEMAP = generate_sitemap(SITEMAP_ENTRIES)
+
+
+def __count_dicts_rows(content: bytes) -> int:
+    return sum(1 for _ in StreamingSitemap(content))
+
+
+def __count_batches_rows(content: bytes) -> int:
+    return sum(len(batch.loc) for batch in iter_sitemap_batches(content))
+
+
+def __measure_rows(count_rows: typing.Callable[[bytes], int]) -> Measurement:
+    # The set is too large to be parsed in several rounds.
+    start = time.perf_counter()
+    rows = sum(count_rows(SITEMAP) for _ in range(SITEMAPS_COUNT))
+    seconds = time.perf_counter() - start
+
+    assert (
+        rows == SITEMAP_ENTRIES * SITEMAPS_COUNT
+    ), "The rows of the sitemaps were not all parsed."
+
+    return Measurement(
+        rows / seconds,
+        megabytes_per_second=(
+            len(SITEMAP) * SITEMAPS_COUNT / seconds / BYTES_PER_MEGABYTE
+        ),
+    )
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+def test_dicts_rows(benchmark: Benchmark) -> None:
+    """Benchmarks the rows per second of a set of 1M URLs parsed into dicts."""
+    benchmark.record(__measure_rows(__count_dicts_rows))
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+def test_batches_rows(benchmark: Benchmark) -> None:
+    """Benchmarks the rows per second of a set of 1M URLs parsed into column
+    batches."""
+    benchmark.record(__measure_rows(__count_batches_rows))
@@ -0,0 +1,41 @@
+"""Benchmarks for scapy_unit_tests.sitemap.SitemapEntry, against the dicts
+of scapy_unit_tests.sitemap.StreamingSitemap"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from generated_sitemap import generate_sitemap
+
+from scapy_unit_tests.sitemap import SitemapEntry, StreamingSitemap
+
+SITEMAP_ENTRIES = 5000
+SITEMAP = generate_sitemap(SITEMAP_ENTRIES)
+
+
+def __parse_dicts(content: bytes) -> list[dict]:
+    return list(StreamingSitemap(content))
+
+
+def __parse_entries(content: bytes) -> list[SitemapEntry]:
+    return list(StreamingSitemap(content).entries())
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+def test_parsed_dicts(benchmark: Benchmark) -> None:
+    """Benchmarks the parsing of a sitemap into a list of dicts, whose
+    allocations are mostly the retained dicts."""
+    benchmark.processed_bytes = len(SITEMAP)
+    benchmark(__parse_dicts, SITEMAP)
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+def test_parsed_entries(benchmark: Benchmark) -> None:
+    """Benchmarks the parsing of a sitemap into a list of compact entries,
+    whose allocations are mostly the retained entries."""
+    benchmark.processed_bytes = len(SITEMAP)
+    benchmark(__parse_entries, SITEMAP)
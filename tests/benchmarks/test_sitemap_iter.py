@@ -0,0 +1,20 @@
+"""Benchmarks for scrapy.utils.sitemap.Sitemap"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import SITEMAP_WITH_MULTIPLE_LINK
+
+
+def sitemap_wrapper(content: str) -> list[dict]:
+    return list(Sitemap(content))
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+def test_valid_sitemap_with_many_urls(benchmark: Benchmark) -> None:
+    """Benchmarks the parsing and the iteration of a sitemap with multiple
+    URLs."""
+    benchmark(sitemap_wrapper, SITEMAP_WITH_MULTIPLE_LINK)
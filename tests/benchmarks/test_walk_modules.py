@@ -0,0 +1,13 @@
+"""Benchmarks for scrapy.utils.misc.walk_modules"""
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.utils.misc import walk_modules
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_multiple_submodules(benchmark: Benchmark) -> None:
+    """Benchmarks the walk of a module containing two submodules."""
+    benchmark(walk_modules, "modules.two")
@@ -0,0 +1,66 @@
+"""Benchmarks comparing the throughput of the feed postprocessing plugins"""
+
+import io
+import typing
+
+import pytest
+from benchmarks.harness import Benchmark
+from scrapy.extensions.postprocessing import Bz2Plugin, GzipPlugin, LZMAPlugin
+
+from scapy_unit_tests.postprocessing import LZ4Plugin, ZstdPlugin
+
+JSON_LINES = b"".join(
+    b'{"url": "https://example.com/%d", "title": "Example"}\n' % index
+    for index in range(20000)
+)
+
+
+def __export(plugin_class: typing.Any, feed_options: dict) -> None:
+    plugin = plugin_class(io.BytesIO(), feed_options=feed_options)
+    plugin.write(JSON_LINES)
+    plugin.close()
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_gzip_export(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 1 MB export with GZIP."""
+    benchmark.processed_bytes = len(JSON_LINES)
+    benchmark(__export, GzipPlugin, {"gzip_compresslevel": 9})
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_bz2_export(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 1 MB export with BZ2."""
+    benchmark.processed_bytes = len(JSON_LINES)
+    benchmark(__export, Bz2Plugin, {})
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_lzma_export(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 1 MB export with LZMA."""
+    benchmark.processed_bytes = len(JSON_LINES)
+    benchmark(__export, LZMAPlugin, {})
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_zstd_export(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 1 MB export with Zstandard."""
+    benchmark.processed_bytes = len(JSON_LINES)
+    benchmark(__export, ZstdPlugin, {})
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+def test_lz4_export(benchmark: Benchmark) -> None:
+    """Benchmarks the compression of a 1 MB export with LZ4."""
+    benchmark.processed_bytes = len(JSON_LINES)
+    benchmark(__export, LZ4Plugin, {})
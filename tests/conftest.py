@@ -0,0 +1,82 @@
+import sys
+
+import pytest
+from benchmarks.harness import DEFAULT_BASELINE, DEFAULT_TOLERANCE
+from profiling import (
+    DEFAULT_PROFILES_DIRECTORY,
+    DEFAULT_SAMPLING_INTERVAL,
+    DEFAULT_TOP_FUNCTIONS,
+    PROFILERS,
+    ProfilingPlugin,
+)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-baseline",
+        default=DEFAULT_BASELINE,
+        help="JSON file with the baseline measurements of the benchmarks.",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="Save the measurements of this run into the baseline.",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=(
+            "Percentage by which a benchmark may be slower than the baseline."
+        ),
+    )
+    group.addoption(
+        "--benchmark-python",
+        default=sys.executable,
+        help=(
+            "Python executable running the crawls, such as the one of an"
+            " environment with another Scrapy version."
+        ),
+    )
+
+    group = parser.getgroup("profiling")
+    group.addoption(
+        "--profile",
+        choices=PROFILERS,
+        help=(
+            "Profile each test with cProfile or a sampling profiler, and"
+            " report the hot paths by mark."
+        ),
+    )
+    group.addoption(
+        "--profile-directory",
+        default=DEFAULT_PROFILES_DIRECTORY,
+        help="Directory of the hot paths tables and the collapsed stacks.",
+    )
+    group.addoption(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_TOP_FUNCTIONS,
+        help="Number of functions listed for each mark.",
+    )
+    group.addoption(
+        "--profile-interval",
+        type=float,
+        default=DEFAULT_SAMPLING_INTERVAL,
+        help="Seconds between the samples of the sampling profiler.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    profiler = config.getoption("profile")
+    if profiler:
+        config.pluginmanager.register(
+            ProfilingPlugin(
+                profiler,
+                config.getoption("profile_directory"),
+                config.getoption("profile_top"),
+                config.getoption("profile_interval"),
+            ),
+            "profiling",
+        )
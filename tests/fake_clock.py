@@ -0,0 +1,11 @@
+"""Fake clock standing in for time.monotonic"""
+
+
+class FakeClock:
+    """Clock returning the time set in its now attribute."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,18 @@
+"""Generated sitemaps, as large inputs of the sitemap tests and benchmarks"""
+
+
+def generate_sitemap(entries_count: int) -> bytes:
+    """Returns a sitemap of the given number of entries, with all their
+    children."""
+    entries = "\n".join(
+        f"<url><loc>https://example.com/page/{index}</loc>"
+        "<lastmod>2009-02-06</lastmod><changefreq>monthly</changefreq>"
+        "<priority>0.9</priority></url>"
+        for index in range(entries_count)
+    )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<urlset'
+        ' xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        f"{entries}\n</urlset>"
+    ).encode("utf-8")
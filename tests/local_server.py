@@ -0,0 +1,141 @@
+"""Local HTTP server standing in for the crawled websites"""
+
+import random
+import threading
+import time
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Maps a path to the served content type and body
+Routes = dict[str, tuple[str, bytes]]
+
+
+def link_graph_routes(
+    pages: int, links_per_page: int, page_size: int = 0, seed: int = 0
+) -> Routes:
+    """Returns the routes of a generated graph of HTML pages, served at
+    /pages/<index> and all reachable from /pages/0, each padded to at least
+    page_size bytes.
+
+    Each page links to the next one and to random others, drawn from a
+    generator seeded with seed, so the same graph is generated on each call.
+    """
+    generator = random.Random(seed)
+    routes: Routes = {}
+    for index in range(pages):
+        targets = [(index + 1) % pages] + [
+            generator.randrange(pages) for _ in range(links_per_page - 1)
+        ]
+        body = (
+            "<html><body>"
+            + "".join(
+                f"<a href='/pages/{target}'>Page {target}</a>"
+                for target in targets
+            )
+            + "</body></html>"
+        )
+        padding = page_size - len(body) - len("<!---->")
+        if padding > 0:
+            body += f"<!--{'x' * padding}-->"
+
+        routes[f"/pages/{index}"] = ("text/html", body.encode("utf-8"))
+
+    return routes
+
+
+class LocalServer:
+    """HTTP server running in a thread of the current process, serving static
+    routes (optionally after a delay) and logging the requested paths.
+
+    It listens on the loopback address host, so that several servers can
+    stand in for different hosts, on 127.0.0.2, 127.0.0.3 and so on.
+    """
+
+    def __init__(
+        self, routes: Routes, delay: float = 0, host: str = "127.0.0.1"
+    ) -> None:
+        self.routes = routes
+        self.delay = delay
+        self.requested_paths: list[str] = []
+        # Path, start and end time of each served request
+        self.intervals: list[tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, 0), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+
+    def __enter__(self) -> "LocalServer":
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def url(self, path: str) -> str:
+        host, port = self._server.server_address[:2]
+
+        return f"http://{host!s}:{port}{path}"
+
+    def count_requests(self, path: str) -> int:
+        with self._lock:
+            return self.requested_paths.count(path)
+
+    def max_concurrency(self, prefix: str = "/") -> int:
+        """Returns the highest number of requests served at the same time,
+        among the ones whose path starts with the prefix."""
+        with self._lock:
+            events = sorted(
+                event
+                for path, start, end in self.intervals
+                if path.startswith(prefix)
+                for event in ((start, 1), (end, -1))
+            )
+
+        concurrency = max_concurrency = 0
+        for _, delta in events:
+            concurrency += delta
+            max_concurrency = max(max_concurrency, concurrency)
+
+        return max_concurrency
+
+    def _log_interval(self, path: str, start: float) -> None:
+        with self._lock:
+            self.intervals.append((path, start, time.monotonic()))
+
+    def _log_request(self, path: str) -> typing.Optional[tuple[str, bytes]]:
+        with self._lock:
+            self.requested_paths.append(path)
+
+        return self.routes.get(path)
+
+    def _create_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                start = time.monotonic()
+                route = server._log_request(self.path)
+                time.sleep(server.delay)
+                if route is None:
+                    self.send_error(404)
+                    server._log_interval(self.path, start)
+                    return
+
+                content_type, body = route
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server._log_interval(self.path, start)
+
+            def log_message(self, *_: typing.Any) -> None:
+                pass
+
+        return Handler
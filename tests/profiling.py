@@ -0,0 +1,352 @@
+"""Pytest plugin profiling each test and reporting the hot paths by mark"""
+
+import collections
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import typing
+from dataclasses import dataclass, field
+
+import pytest
+from tabulate import tabulate
+
+PROFILERS = ("cprofile", "sampling")
+DEFAULT_PROFILES_DIRECTORY = ".profiles"
+DEFAULT_TOP_FUNCTIONS = 10
+DEFAULT_SAMPLING_INTERVAL = 0.001
+HOT_PATHS_FILENAME = "hot_paths.md"
+COLLAPSED_STACKS_EXTENSION = ".collapsed"
+MICROSECONDS_PER_SECOND = 1000 * 1000
+# Marks which don't group the tests into suites
+IGNORED_MARKS = frozenset(
+    (
+        "timeout",
+        "parametrize",
+        "usefixtures",
+        "filterwarnings",
+        "skip",
+        "skipif",
+        "xfail",
+    )
+)
+
+# File, first line and name, as in the stats of pstats
+Function = tuple[str, int, str]
+Stack = tuple[Function, ...]
+
+
+@dataclass
+class FunctionStats:
+    # The calls are only counted by cProfile.
+    calls: typing.Optional[int] = None
+    self_seconds: float = 0
+    total_seconds: float = 0
+
+
+@dataclass
+class Profile:
+    functions: dict[Function, FunctionStats] = field(default_factory=dict)
+    # Self times of the stacks, in seconds
+    stacks: typing.DefaultDict[Stack, float] = field(
+        default_factory=lambda: collections.defaultdict(float)
+    )
+
+    def update(self, other: "Profile") -> None:
+        for function, stats in other.functions.items():
+            aggregated = self.functions.setdefault(function, FunctionStats())
+            if stats.calls is not None:
+                aggregated.calls = (aggregated.calls or 0) + stats.calls
+            aggregated.self_seconds += stats.self_seconds
+            aggregated.total_seconds += stats.total_seconds
+
+        for stack, seconds in other.stacks.items():
+            self.stacks[stack] += seconds
+
+
+class CProfiler:
+    """Deterministic profiler, recording the calls of each function.
+
+    As cProfile only records the callers of the functions, the stacks are
+    the pairs of callers and callees, weighted by the time spent in the
+    latter when called by the former.
+    """
+
+    def __init__(self) -> None:
+        self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        self._profiler.disable()
+
+    def profile(self) -> Profile:
+        profile = Profile()
+        # The stats are not part of the typed API of pstats.
+        stats: typing.Any = pstats.Stats(self._profiler)
+        for function, (
+            _,
+            calls,
+            self_seconds,
+            total_seconds,
+            callers,
+        ) in stats.stats.items():
+            profile.functions[function] = FunctionStats(
+                calls, self_seconds, total_seconds
+            )
+            if not callers:
+                profile.stacks[(function,)] += self_seconds
+            for caller, (_, _, caller_self_seconds, _) in callers.items():
+                profile.stacks[(caller, function)] += caller_self_seconds
+
+        return profile
+
+
+class SamplingProfiler:
+    """Statistical profiler, sampling the stack of the profiled thread every
+    interval seconds from another thread.
+
+    The samples are taken when the profiled thread releases the GIL, so the
+    effective interval can be longer, up to sys.getswitchinterval(). Each
+    sample is thus weighted by the profiled time divided by the number of
+    samples.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_SAMPLING_INTERVAL,
+        root: typing.Optional[typing.Any] = None,
+    ) -> None:
+        self.interval = interval
+        # Code of the function at the root of the stacks, below which the
+        # frames are ignored
+        self.root = root
+        self._samples: typing.Counter[Stack] = collections.Counter()
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._start_time = 0.0
+        self._seconds = 0.0
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._start_time = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._seconds = time.perf_counter() - self._start_time
+
+    def profile(self) -> Profile:
+        profile = Profile()
+        samples_count = sum(self._samples.values())
+        if not samples_count:
+            return profile
+
+        sample_seconds = self._seconds / samples_count
+        for stack, count in self._samples.items():
+            seconds = count * sample_seconds
+            profile.stacks[stack] += seconds
+
+            # The recursive functions are counted once per sample.
+            for function in set(stack):
+                stats = profile.functions.setdefault(function, FunctionStats())
+                stats.total_seconds += seconds
+            profile.functions[stack[-1]].self_seconds += seconds
+
+        return profile
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_filename, code.co_firstlineno, code.co_name)
+                )
+                if code is self.root:
+                    break
+                frame = frame.f_back
+
+            if stack:
+                self._samples[tuple(reversed(stack))] += 1
+
+
+class ProfilingPlugin:
+    """Plugin running the call of each test under a profiler, and
+    aggregating the profiles of the tests by their marks.
+
+    Once the session is finished, the functions taking the most time of each
+    mark are listed in the Markdown tables of HOT_PATHS_FILENAME, and the
+    stacks of each mark are written in the collapsed format of flamegraph.pl
+    in <mark>.collapsed, with their self times in microseconds. Only the
+    test process is profiled, not the processes started by the tests.
+    """
+
+    def __init__(
+        self,
+        profiler: str,
+        directory: str = DEFAULT_PROFILES_DIRECTORY,
+        top: int = DEFAULT_TOP_FUNCTIONS,
+        interval: float = DEFAULT_SAMPLING_INTERVAL,
+    ) -> None:
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler!r}")
+
+        self.profiler = profiler
+        self.directory = directory
+        self.top = top
+        self.interval = interval
+        self.profiles: dict[str, Profile] = collections.defaultdict(Profile)
+        self.tests_counts: typing.Counter[str] = collections.Counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(
+        self, item: pytest.Item
+    ) -> typing.Generator[None, None, None]:
+        profiler: typing.Union[CProfiler, SamplingProfiler]
+        if self.profiler == "cprofile":
+            profiler = CProfiler()
+        else:
+            function = getattr(item, "obj", None)
+            profiler = SamplingProfiler(
+                self.interval, getattr(function, "__code__", None)
+            )
+
+        profiler.start()
+        yield
+        profiler.stop()
+
+        profile = profiler.profile()
+        for mark in get_marks(item):
+            self.profiles[mark].update(profile)
+            self.tests_counts[mark] += 1
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if not self.profiles:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(
+            os.path.join(self.directory, HOT_PATHS_FILENAME), "w"
+        ) as file:
+            file.write(self.create_hot_paths_tables())
+
+        for mark, profile in self.profiles.items():
+            with open(
+                os.path.join(
+                    self.directory, f"{mark}{COLLAPSED_STACKS_EXTENSION}"
+                ),
+                "w",
+            ) as file:
+                file.writelines(collapse_stacks(profile.stacks))
+
+    def pytest_terminal_summary(self, terminalreporter: typing.Any) -> None:
+        if not self.profiles:
+            return
+
+        rows = []
+        for mark, profile in sorted(self.profiles.items()):
+            hottest = get_hot_functions(profile, 1)
+            rows.append(
+                [
+                    f"`{mark}`",
+                    self.tests_counts[mark],
+                    f"{sum(profile.stacks.values()):.3f}",
+                    f"`{format_function(hottest[0][0])}`" if hottest else "-",
+                ]
+            )
+
+        terminalreporter.write_sep("=", "profiles")
+        terminalreporter.write_line(
+            tabulate(
+                rows,
+                ["Mark", "Tests", "Profiled time (s)", "Hottest function"],
+                tablefmt="github",
+            )
+        )
+        terminalreporter.write_line(
+            f"The hot paths of each mark are in {self.directory}."
+        )
+
+    def create_hot_paths_tables(self) -> str:
+        sections = []
+        for mark, profile in sorted(self.profiles.items()):
+            table = tabulate(
+                [
+                    [
+                        f"`{format_function(function)}`",
+                        "-" if stats.calls is None else stats.calls,
+                        f"{stats.self_seconds:.6f}",
+                        f"{stats.total_seconds:.6f}",
+                    ]
+                    for function, stats in get_hot_functions(profile, self.top)
+                ],
+                ["Function", "Calls", "Self time (s)", "Total time (s)"],
+                tablefmt="github",
+            )
+            sections.append(
+                f"## `{mark}` ({self.tests_counts[mark]} tests)\n\n{table}\n"
+            )
+
+        return "\n".join(sections)
+
+
+def get_marks(item: pytest.Item) -> list[str]:
+    """Returns the names of the marks of a test grouping it into suites,
+    without duplicates."""
+    return list(
+        dict.fromkeys(
+            mark.name
+            for mark in item.iter_markers()
+            if mark.name not in IGNORED_MARKS
+        )
+    )
+
+
+def get_hot_functions(
+    profile: Profile, count: int
+) -> list[tuple[Function, FunctionStats]]:
+    """Returns the functions taking the most time by themselves."""
+    return sorted(
+        profile.functions.items(),
+        key=lambda item: item[1].self_seconds,
+        reverse=True,
+    )[:count]
+
+
+def collapse_stacks(stacks: typing.Mapping[Stack, float]) -> list[str]:
+    """Returns the lines of the stacks in the collapsed format, with their
+    times in microseconds."""
+    collapsed_stacks: typing.Counter[str] = collections.Counter()
+    for stack, seconds in stacks.items():
+        collapsed_stacks[
+            ";".join(format_function(function) for function in stack)
+        ] += round(seconds * MICROSECONDS_PER_SECOND)
+
+    return [
+        f"{stack} {microseconds}\n"
+        for stack, microseconds in sorted(collapsed_stacks.items())
+        if microseconds
+    ]
+
+
+def format_function(function: Function) -> str:
+    """Returns the name of a function and its location, relative to the
+    import paths."""
+    filename, line, name = function
+    # The built-in functions have no location in pstats.
+    if filename == "~":
+        return name.replace(";", ",")
+
+    for path in sorted(filter(None, sys.path), key=len, reverse=True):
+        if filename.startswith(path + os.sep):
+            filename = filename[len(path) + 1 :]
+            break
+
+    return f"{name} ({filename}:{line})".replace(";", ",")
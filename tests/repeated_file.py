@@ -0,0 +1,22 @@
+"""Files repeating a block, as large inputs of the memory tests"""
+
+SMALL_FILE_SIZE = 16 * 1024 * 1024
+LARGE_FILE_SIZE = 64 * 1024 * 1024
+# Allowed growth of the peak RSS between the small and the large file, much
+# less than the growth of their size
+FILE_SIZE_MEMORY_MARGIN = (LARGE_FILE_SIZE - SMALL_FILE_SIZE) // 4
+
+
+def write_repeated_file(
+    filename: str, size: int, header: bytes, block: bytes, footer: bytes = b""
+) -> int:
+    """Writes a file of about size bytes, repeating a block, and returns the
+    number of blocks."""
+    blocks_count = size // len(block)
+    with open(filename, "wb") as file:
+        file.write(header)
+        for _ in range(blocks_count):
+            file.write(block)
+        file.write(footer)
+
+    return blocks_count
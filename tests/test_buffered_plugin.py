@@ -0,0 +1,167 @@
+"""Unit tests for scapy_unit_tests.postprocessing.BufferedPlugin's write()
+
+Methods type: Returning an integer
+"""
+
+import io
+import tempfile
+import typing
+
+import pytest
+from fake_clock import FakeClock
+from scrapy.extensions.postprocessing import PostProcessingManager
+from test_gzip_lzma_plugins import ungzip, unlzma
+
+from scapy_unit_tests.postprocessing import BufferedPlugin
+
+JSON_LINES = [
+    b'{"url": "https://example.com/%d", "title": "Example"}\n' % index
+    for index in range(1000)
+]
+
+
+class RecordingFile(io.BytesIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[bytes] = []
+        self.was_closed = False
+
+    def write(self, data: typing.Any) -> int:
+        self.writes.append(bytes(data))
+
+        return super().write(data)
+
+    def close(self) -> None:
+        self.was_closed = True
+
+
+def __export(filename: str, plugins: list[str], chunks: list[bytes]) -> None:
+    with open(filename, "wb") as file:
+        manager = PostProcessingManager(
+            plugins,
+            file,
+            feed_options={"buffer_size": 4096, "gzip_mtime": 0},
+        )
+        for chunk in chunks:
+            manager.write(chunk)
+        manager.close()
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_chained_content() -> None:
+    """Tests if the content written through the buffer and a compressor is
+    the one written through the compressor alone."""
+    for compressor, decompress in (
+        ("scrapy.extensions.postprocessing.GzipPlugin", ungzip),
+        ("scrapy.extensions.postprocessing.LZMAPlugin", unlzma),
+    ):
+        with tempfile.NamedTemporaryFile(
+            "wb", delete=False
+        ) as buffered_temp, tempfile.NamedTemporaryFile(
+            "wb", delete=False
+        ) as temp:
+            __export(
+                buffered_temp.name,
+                ["scapy_unit_tests.postprocessing.BufferedPlugin", compressor],
+                JSON_LINES,
+            )
+            __export(temp.name, [compressor], JSON_LINES)
+
+            assert decompress(buffered_temp.name) == b"".join(
+                JSON_LINES
+            ), f"The buffered data compressed by {compressor} is altered."
+            assert decompress(buffered_temp.name) == decompress(
+                temp.name
+            ), f"The buffer changes the data compressed by {compressor}."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_return_values() -> None:
+    """Tests if the length of each chunk is returned, even if it is only
+    buffered."""
+    plugin = BufferedPlugin(RecordingFile(), feed_options={})
+
+    return_codes = [plugin.write(chunk) for chunk in (b"", b"data", b"")]
+    assert return_codes == [0, 4, 0], "The written sizes are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_coalesced_writes() -> None:
+    """Tests if the chunks are written to the next plugin in writes of at
+    least the buffer's size."""
+    file = RecordingFile()
+    plugin = BufferedPlugin(file, feed_options={"buffer_size": 4096})
+    for chunk in JSON_LINES:
+        plugin.write(chunk)
+
+    assert file.writes, "Nothing was written before closing."
+    assert all(
+        len(write) >= 4096 for write in file.writes
+    ), "Some writes are smaller than the buffer."
+    assert len(file.writes) < len(JSON_LINES) / 50, "The writes are not few."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_close_flushes() -> None:
+    """Tests if closing the plugin writes the buffered data and closes the
+    next plugin."""
+    file = RecordingFile()
+    plugin = BufferedPlugin(file, feed_options={})
+    for chunk in JSON_LINES[:10]:
+        plugin.write(chunk)
+
+    assert not file.writes, "The data was written before filling the buffer."
+
+    plugin.close()
+    assert file.getvalue() == b"".join(
+        JSON_LINES[:10]
+    ), "The buffered data was not written on close."
+    assert file.was_closed, "The next plugin was not closed."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_flush_interval() -> None:
+    """Tests if the buffered data is written once it waited for the flush
+    interval."""
+    clock = FakeClock()
+    file = RecordingFile()
+    plugin = BufferedPlugin(file, feed_options={"buffer_flush_interval": 1})
+    plugin.clock = clock
+
+    plugin.write(b"first")
+    clock.now = 0.5
+    plugin.write(b"second")
+    assert not file.writes, "The data was written before the interval."
+
+    clock.now = 1
+    plugin.write(b"third")
+    assert file.writes == [
+        b"firstsecondthird"
+    ], "The data was not written after the interval."
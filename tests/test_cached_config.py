@@ -0,0 +1,185 @@
+"""Unit tests for scapy_unit_tests.conf.get_config, caching the merged
+configuration
+
+Method type: Processing files
+"""
+
+import os
+import tempfile
+from configparser import ParsingError
+
+import pytest
+from test_config_parser import (
+    ERRONEOUS_CONFIG,
+    ONE_KEY_CONFIG,
+    TWO_KEYS_CONFIG,
+)
+
+from scapy_unit_tests.conf import ConfigCache, config_cache, get_config
+
+
+def __write_config(content: str) -> str:
+    with tempfile.NamedTemporaryFile("w", delete=False) as temp:
+        temp.write(content)
+
+    return temp.name
+
+
+def __use_sources(monkeypatch: pytest.MonkeyPatch, sources: list[str]) -> None:
+    monkeypatch.setattr("scrapy.utils.conf.get_sources", lambda _: sources)
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if an empty configuration is loaded and cached."""
+    __use_sources(monkeypatch, [__write_config("")])
+
+    config = get_config()
+    assert config.sections() == [], "The empty configuration was misloaded."
+    assert get_config() is config, "The empty configuration was not cached."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_1
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_parsing_of_one_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if a valid configuration with one key is loaded and cached."""
+    __use_sources(monkeypatch, [__write_config(ONE_KEY_CONFIG)])
+
+    config = get_config()
+    assert (
+        config["simple"]["key"] == "value"
+    ), "A value from the configuration was wrongly loaded."
+    assert get_config() is config, "The configuration was not cached."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_parsing_of_two_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if a valid configuration with two keys is loaded and cached."""
+    __use_sources(monkeypatch, [__write_config(TWO_KEYS_CONFIG)])
+
+    config = get_config()
+    assert (
+        config["simple"]["key"] == "value"
+        and config["simple"]["new_key"] == "new_value"
+    ), "A value from the configuration was wrongly loaded."
+    assert get_config() is config, "The configuration was not cached."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_existence
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_no_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if the configuration is loaded again when a missing source file
+    is created."""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "scrapy.cfg")
+    __use_sources(monkeypatch, [path])
+
+    assert (
+        get_config().sections() == []
+    ), "The inexistent configuration was misrepresented."
+
+    with open(path, "w") as file:
+        file.write(ONE_KEY_CONFIG)
+    assert (
+        get_config()["simple"]["key"] == "value"
+    ), "The created configuration was not loaded."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_file_with_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if an error is raised, and nothing cached, when parsing an
+    invalid configuration."""
+    sources = [__write_config(ERRONEOUS_CONFIG)]
+    __use_sources(monkeypatch, sources)
+    cached_configs = len(config_cache)
+
+    try:
+        get_config()
+    except ParsingError:
+        pass
+    else:
+        assert False, (
+            "No exception was raised when parsing a configuration file"
+            " containing errors."
+        )
+    assert (
+        len(config_cache) == cached_configs
+    ), "The invalid configuration was cached."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_stale_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if the configuration is loaded again when a source file is
+    modified."""
+    path = __write_config(ONE_KEY_CONFIG)
+    __use_sources(monkeypatch, [path])
+    cache = ConfigCache()
+    config = cache.get()
+
+    with open(path, "w") as file:
+        file.write(TWO_KEYS_CONFIG)
+
+    new_config = cache.get()
+    assert new_config is not config, "The stale configuration was reused."
+    assert (
+        new_config["simple"]["new_key"] == "new_value"
+    ), "The modified configuration was not loaded."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_monkey
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_invalidation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests if an invalidated configuration is loaded again, even if its
+    source file looks unchanged."""
+    path = __write_config(ONE_KEY_CONFIG)
+    __use_sources(monkeypatch, [path])
+    cache = ConfigCache()
+    config = cache.get()
+    stat = os.stat(path)
+
+    # Same size, and same modification time
+    with open(path, "w") as file:
+        file.write(ONE_KEY_CONFIG.replace("value", "VALUE"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.get() is config, "The unchanged signature was not reused."
+
+    cache.invalidate()
+    assert (
+        cache.get()["simple"]["key"] == "VALUE"
+    ), "The invalidated configuration was not loaded again."
@@ -0,0 +1,109 @@
+"""Unit tests for scapy_unit_tests.url.classify_paths
+
+Method type: Checking if a string has a correct format
+N/A criteria:
+- Inverse relationship: Not the case as the initial strings can't be
+    extracted from the resulted booleans
+- Error: No exception is documented for this method.
+"""
+
+import numpy
+import pytest
+from scrapy.utils.url import _is_posix_path
+
+from scapy_unit_tests.url import PATH_WINDOW, classify_paths
+
+# Paths of the unit tests of _is_posix_path
+POSIX_TESTED_PATHS = [
+    "/home/iosifache/unit/test.py",
+    "/.",
+    "~/.",
+    "./.",
+    "../.",
+    "C:\\Users\\iosifache",
+    "",
+]
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_posix_paths() -> None:
+    """Tests if the POSIX paths are recognized as _is_posix_path does."""
+    kinds = classify_paths(POSIX_TESTED_PATHS)
+
+    assert kinds["posix"].tolist() == [
+        _is_posix_path(path) for path in POSIX_TESTED_PATHS
+    ], "The POSIX paths are recognized differently than _is_posix_path."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_path_kinds() -> None:
+    """Tests if the POSIX paths, the Windows paths and the URIs are
+    recognized each as a single kind."""
+    kinds = classify_paths(
+        ["/home/iosifache", "C:\\Users\\iosifache", "s3://bucket/key", "key"]
+    )
+
+    assert kinds.tolist() == [
+        (True, False, False),
+        (False, True, False),
+        (False, False, True),
+        (False, False, False),
+    ], "The kinds of the strings are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_long_prefixes() -> None:
+    """Tests if the strings whose kind is determined by characters after the
+    first ones are recognized."""
+    name = "a" * PATH_WINDOW
+    kinds = classify_paths(
+        [f".{name}/", f".{name}/{name}", f"{name}://bucket", f"é{name}://"]
+    )
+
+    assert kinds.tolist() == [
+        (False, False, False),
+        (True, False, False),
+        (False, False, True),
+        (False, False, True),
+    ], "The kinds of the strings with long prefixes are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_array() -> None:
+    """Tests if an array of strings is classified as a list of them."""
+    assert (
+        classify_paths(numpy.array(POSIX_TESTED_PATHS)).tolist()
+        == classify_paths(POSIX_TESTED_PATHS).tolist()
+    ), "The array is classified differently than the list."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_no_strings() -> None:
+    """Tests if no strings are classified as an empty array."""
+    assert not classify_paths([]).size, "The returned array is not empty."
@@ -0,0 +1,172 @@
+"""Unit tests for scapy_unit_tests.robotstxt.CompiledRobotParser.allowed
+
+Method type: Simplifying the usage of other functionality (from
+    urllib.robotparser.RobotFileParser)
+N/A criteria:
+- Inverse relationship: No method is exposed to return the intial robots.txt.
+"""
+
+import itertools
+
+import pytest
+from scrapy.robotstxt import PythonRobotParser, RobotParser
+from test_pythonrobotparser import DUMMY_ROBOTSTXT
+
+from scapy_unit_tests.robotstxt import CompiledRobotParser
+
+OVERLAPPING_RULES_ROBOTSTXT = """
+# Comments and unknown fields are ignored.
+User-agent: Googlebot
+User-agent: bingbot/2.0
+Allow: /private/public
+Disallow: /private
+Disallow: /search?q=
+Crawl-delay: 10
+
+User-agent: *
+Disallow: /tmp/
+Allow: /tmp/shared
+Disallow: /caf%C3%A9
+Disallow: /*.pdf
+
+User-agent: *
+Disallow: /
+"""
+WILDCARD_ROBOTSTXT = """
+User-agent: Googlebot
+Disallow: *
+
+User-agent: *
+Disallow: /*
+Allow: *
+"""
+
+CHECKED_URLS = [
+    "/",
+    "",
+    "/private",
+    "/private/public/index.html",
+    "/private/secret",
+    "/search?q=scrapy",
+    "/search",
+    "/tmp/",
+    "/tmp/shared/file",
+    "/café/menu",
+    "/caf%C3%A9/menu",
+    "/*.pdf",
+    "/document.pdf",
+    "https://example.com/private/public?x=1#top",
+]
+
+CHECKED_USER_AGENTS = [
+    "Googlebot",
+    "googlebot/2.1",
+    "Mozilla/5.0 (compatible; bingbot/2.0)",
+    "bingbot/2.0",
+    "YandexBot",
+    "",
+]
+
+
+def __answers(robot: RobotParser) -> list[bool]:
+    return [
+        robot.allowed(url, user_agent)
+        for url, user_agent in itertools.product(
+            CHECKED_URLS, CHECKED_USER_AGENTS
+        )
+    ]
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_robots() -> None:
+    """Tests if a valid file is parsed correctly."""
+    robot = CompiledRobotParser(DUMMY_ROBOTSTXT, None)
+
+    assert robot, "No parser was created."
+    assert robot.allowed(
+        "/", "Googlebot"
+    ), "Googlebot is not allowed to crawl."
+    assert not robot.allowed(
+        "/", "YandexBot"
+    ), "YandexBot is allowed to crawl."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_file() -> None:
+    """Tests if no error is raised when giving an empty file."""
+    robot = CompiledRobotParser("", None)
+
+    assert robot, "No parser was created."
+    assert robot.allowed(
+        "/", "Googlebot"
+    ), "Googlebot is not allowed to crawl."
+    assert robot.allowed(
+        "/", "YandexBot"
+    ), "YandexBot is not allowed to crawl."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_no_robotstxt_at_all() -> None:
+    """Tests if an error is raised when giving a None."""
+    try:
+        CompiledRobotParser(None, None)
+    except TypeError:
+        pass
+    else:
+        assert False, "No error is raised when parsing a None."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_same_answers_as_python_parser() -> None:
+    """Tests if the answers are the same as PythonRobotParser's ones, for
+    overlapping rules and multiple user agents."""
+    for robotstxt in [DUMMY_ROBOTSTXT, OVERLAPPING_RULES_ROBOTSTXT, ""]:
+        expected_answers = __answers(PythonRobotParser(robotstxt, None))
+        answers = __answers(CompiledRobotParser(robotstxt, None))
+
+        assert (
+            answers == expected_answers
+        ), "The answers are different from PythonRobotParser's ones."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_wildcard_paths() -> None:
+    """Tests if the rules whose path is a wildcard are matched literally, as
+    PythonRobotParser does."""
+    robot = CompiledRobotParser(WILDCARD_ROBOTSTXT, None)
+
+    assert __answers(robot) == __answers(
+        PythonRobotParser(WILDCARD_ROBOTSTXT, None)
+    ), "The answers are different from PythonRobotParser's ones."
+    assert robot.allowed("/private", "Googlebot") and not robot.allowed(
+        "/*.pdf", "YandexBot"
+    ), "A wildcard path was not matched literally."
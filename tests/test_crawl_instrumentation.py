@@ -0,0 +1,379 @@
+"""Unit tests for scapy_unit_tests.metrics.Histogram and its usage by
+scapy_unit_tests.extensions.CrawlInstrumentation
+
+Method type: Taking time to process
+N/A criteria:
+- Inverse relationship: The histograms cannot be reverted to the observed
+    values.
+"""
+
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import typing
+
+import pytest
+from local_server import LocalServer
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.test import get_crawler
+
+from scapy_unit_tests.extensions import (
+    STATS_PREFIX,
+    CrawlInstrumentation,
+    get_callback_name,
+)
+from scapy_unit_tests.metrics import (
+    Histogram,
+    HistogramFamily,
+    format_prometheus,
+)
+
+PAGES = 200
+LINKS_PER_PAGE = 50
+OVERHEAD_BUDGET = 0.25
+OVERHEAD_RUNS = 2
+ASYNC_CALLBACK_SECONDS = 0.002
+ASYNC_CALLBACK_WAIT = 0.02
+
+CRAWL_SCRIPT = """
+import asyncio
+import json
+import sys
+import time
+
+from scrapy import Request, Spider, signals
+from scrapy.crawler import CrawlerProcess
+
+
+class PagesSpider(Spider):
+    name = "pages"
+
+    def start_requests(self):
+        # The generator callbacks of this script can't be set explicitly,
+        # as Scrapy reads their source, which is not available.
+        callbacks = [None]
+        if self.settings.getbool("ASYNC_CALLBACKS"):
+            callbacks = [self.parse_coroutine, self.parse_async_generator]
+
+        for page in range(int(sys.argv[3])):
+            yield Request(
+                f"{sys.argv[2]}/pages/{page}",
+                callback=callbacks[page % len(callbacks)],
+            )
+
+    def parse(self, response):
+        for link in response.css("a::attr(href)").getall():
+            yield {"link": link}
+
+    async def parse_coroutine(self, response):
+        await self.run_and_wait()
+
+        return [{"url": response.url}]
+
+    async def parse_async_generator(self, response):
+        await self.run_and_wait()
+        yield {"url": response.url}
+        await self.run_and_wait()
+
+    async def run_and_wait(self):
+        # Runs for ASYNC_CALLBACK_SECONDS, then waits for ASYNC_CALLBACK_WAIT
+        start = time.perf_counter()
+        while time.perf_counter() - start < self.settings.getfloat(
+            "ASYNC_CALLBACK_SECONDS"
+        ):
+            pass
+        await asyncio.sleep(self.settings.getfloat("ASYNC_CALLBACK_WAIT"))
+
+
+def record_cpu_time():
+    cpu_times.append(time.process_time())
+
+
+process = CrawlerProcess(
+    settings={
+        "EXTENSIONS": {"scapy_unit_tests.extensions.CrawlInstrumentation": 0},
+        "TWISTED_REACTOR": (
+            "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+        ),
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        **json.loads(sys.argv[1]),
+    }
+)
+crawler = process.create_crawler(PagesSpider)
+cpu_times = []
+crawler.signals.connect(record_cpu_time, signal=signals.engine_started)
+crawler.signals.connect(record_cpu_time, signal=signals.engine_stopped)
+process.crawl(crawler)
+process.start()
+
+print(
+    json.dumps(
+        {
+            "stats": crawler.stats.get_stats(),
+            "cpu_time": cpu_times[1] - cpu_times[0],
+        },
+        default=str,
+    )
+)
+"""
+
+
+def __create_server(delay: float = 0) -> LocalServer:
+    page = (
+        "<html><body>"
+        + "".join(
+            f"<a href='/links/{index}'>Link</a>"
+            for index in range(LINKS_PER_PAGE)
+        )
+        + "</body></html>"
+    ).encode("utf-8")
+
+    return LocalServer(
+        {f"/pages/{index}": ("text/html", page) for index in range(PAGES)},
+        delay,
+    )
+
+
+def __crawl_in_subprocess(server: LocalServer, settings: dict) -> dict:
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            CRAWL_SCRIPT,
+            json.dumps(settings),
+            server.url(""),
+            str(PAGES),
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    return json.loads(output)
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_histogram_buckets() -> None:
+    """Tests if the observed values are counted in the buckets whose upper
+    bound they don't exceed."""
+    histogram = Histogram([0.5, 1, 10])
+    for value in (0.25, 0.5, 0.75, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1], "A value was misplaced."
+    assert (
+        histogram.count == 5 and histogram.sum == 56.5 and histogram.max == 50
+    ), "The count, sum or maximum are wrong."
+    assert (
+        histogram.quantile(0.5) == 1 and histogram.quantile(1) == 50
+    ), "The quantiles are not the bounds of their buckets."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_histogram() -> None:
+    """Tests if an empty histogram is summarized by its count only."""
+    assert Histogram([1]).as_dict() == {
+        "count": 0
+    }, "An empty histogram has other statistics."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_prometheus_format() -> None:
+    """Tests if the histograms are exported with cumulative buckets and
+    escaped labels."""
+    family = HistogramFamily("scrapy_test_seconds", "Test.", [0.1, 1])
+    family.labels(callback='parse_"item"').observe(0.5)
+    family.labels(callback='parse_"item"').observe(2)
+
+    assert format_prometheus([family]).splitlines() == [
+        "# HELP scrapy_test_seconds Test.",
+        "# TYPE scrapy_test_seconds histogram",
+        'scrapy_test_seconds_bucket{callback="parse_\\"item\\"",le="0.1"} 0',
+        'scrapy_test_seconds_bucket{callback="parse_\\"item\\"",le="1"} 1',
+        'scrapy_test_seconds_bucket{callback="parse_\\"item\\"",le="+Inf"} 2',
+        'scrapy_test_seconds_sum{callback="parse_\\"item\\""} 2.5',
+        'scrapy_test_seconds_count{callback="parse_\\"item\\""} 2',
+    ], "The histogram was not exported in the Prometheus format."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.5)
+def test_disabled_extension() -> None:
+    """Tests if the extension is not configured unless enabled."""
+    try:
+        CrawlInstrumentation(get_crawler())
+    except NotConfigured:
+        pass
+    else:
+        assert False, "The extension was configured without being enabled."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_existence
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(20)
+def test_populated_metrics() -> None:
+    """Tests if a crawl records all its metrics in the stats and in the
+    Prometheus dump."""
+    with __create_server(
+        delay=0.01
+    ) as server, tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "metrics.prom")
+        stats = __crawl_in_subprocess(
+            server,
+            {
+                "INSTRUMENTATION_ENABLED": True,
+                "INSTRUMENTATION_LAG_INTERVAL": 0.01,
+                "INSTRUMENTATION_PROMETHEUS_FILE": filename,
+                # Queues the requests exceeding the concurrency of the slot
+                "CONCURRENT_REQUESTS_PER_DOMAIN": 2,
+            },
+        )["stats"]
+        with open(filename, encoding="utf-8") as file:
+            prometheus_lines = file.read().splitlines()
+
+    assert (
+        stats[STATS_PREFIX + "scrapy_loop_lag_seconds"]["count"] > 0
+    ), "The loop lag was not measured."
+    assert (
+        stats[STATS_PREFIX + "scrapy_downloader_queue_depth"]["max"] > 0
+    ), "No queued request was seen in the downloader."
+    assert (
+        stats[STATS_PREFIX + "scrapy_spider_callback_seconds/parse"]["count"]
+        == PAGES
+    ), "The callback was not timed once per page."
+    assert (
+        stats[
+            STATS_PREFIX
+            + "scrapy_downloader_middleware_seconds/process_request"
+            + "/UserAgentMiddleware"
+        ]["count"]
+        == PAGES
+    ), "The middleware was not timed once per request."
+    assert (
+        'scrapy_spider_callback_seconds_count{callback="parse"} %d' % PAGES
+        in prometheus_lines
+    ), "The Prometheus dump misses the callback histogram."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(20)
+def test_async_callbacks() -> None:
+    """Tests if the coroutine and asynchronous generator callbacks are timed
+    while they run, without the time they wait for."""
+    with __create_server() as server:
+        stats = __crawl_in_subprocess(
+            server,
+            {
+                "INSTRUMENTATION_ENABLED": True,
+                "ASYNC_CALLBACKS": True,
+                "ASYNC_CALLBACK_SECONDS": ASYNC_CALLBACK_SECONDS,
+                "ASYNC_CALLBACK_WAIT": ASYNC_CALLBACK_WAIT,
+            },
+        )["stats"]
+
+    # The asynchronous generator runs and waits twice.
+    for callback, runs in (
+        ("parse_coroutine", 1),
+        ("parse_async_generator", 2),
+    ):
+        histogram = stats[
+            STATS_PREFIX + f"scrapy_spider_callback_seconds/{callback}"
+        ]
+        assert (
+            histogram["count"] == PAGES // 2
+        ), f"{callback} was not timed once per page."
+        assert (
+            histogram["sum"]
+            >= histogram["count"] * runs * ASYNC_CALLBACK_SECONDS
+        ), f"The time spent running {callback} was not measured."
+        assert (
+            histogram["sum"] < histogram["count"] * runs * ASYNC_CALLBACK_WAIT
+        ), f"The time {callback} waited for was measured."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(40)
+def test_instrumentation_overhead() -> None:
+    """Tests if the instrumentation increases the CPU time of a crawl by less
+    than 25%."""
+    cpu_times: dict[bool, list[float]] = {False: [], True: []}
+    with __create_server() as server:
+        for _ in range(OVERHEAD_RUNS):
+            for enabled in cpu_times:
+                cpu_times[enabled].append(
+                    __crawl_in_subprocess(
+                        server, {"INSTRUMENTATION_ENABLED": enabled}
+                    )["cpu_time"]
+                )
+
+    # The fastest runs are the least disturbed ones.
+    assert min(cpu_times[True]) < min(cpu_times[False]) * (
+        1 + OVERHEAD_BUDGET
+    ), "The instrumentation overhead is above the budget."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_callback_names() -> None:
+    """Tests if the partial functions and callable objects are labelled by
+    what they call, apart from the default parse callback."""
+
+    class ItemsCallback:
+        def __call__(self, response: typing.Any) -> None:
+            pass
+
+    def parse_item(response: typing.Any, kind: str) -> None:
+        pass
+
+    for callback, name in [
+        (None, "parse"),
+        (parse_item, "parse_item"),
+        (functools.partial(parse_item, kind="page"), "parse_item"),
+        (
+            functools.partial(functools.partial(parse_item), kind="page"),
+            "parse_item",
+        ),
+        (ItemsCallback(), "ItemsCallback"),
+    ]:
+        assert (
+            get_callback_name(callback) == name
+        ), f"{callback!r} was not labelled {name}."
@@ -0,0 +1,199 @@
+"""Unit tests for scapy_unit_tests.response.extract_links
+
+Method type: Using members from other classes (Response)
+N/A criteria:
+- Inverse relationship: No method is exposed to return the initial response
+    from its links.
+- Error: No exception is documented for this method.
+"""
+
+import os
+
+import pytest
+from scrapy.http import HtmlResponse
+
+from scapy_unit_tests.response import extract_links
+
+PAGES_DIRECTORY = os.path.join(os.path.dirname(__file__), "pages")
+PAGES_URL = "https://www.example.com/section/"
+
+
+def create_page_response(name: str) -> HtmlResponse:
+    """Returns a response whose body is the saved page with the given
+    name."""
+    with open(os.path.join(PAGES_DIRECTORY, name), "rb") as file:
+        body = file.read()
+
+    return HtmlResponse(
+        PAGES_URL + name, body=body, headers={"Content-Type": "text/html"}
+    )
+
+
+def __css_links(response: HtmlResponse) -> list[str]:
+    return [
+        response.urljoin(href)
+        for href in response.css("a::attr(href)").getall()
+    ]
+
+
+def __create_response(body: bytes) -> HtmlResponse:
+    return HtmlResponse(
+        "https://google.com/directory/page.html",
+        body=body,
+        headers={"Content-Type": "text/html; charset=utf-8"},
+    )
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(2)
+def test_saved_pages() -> None:
+    """Tests if the links of the saved pages are the ones selected by CSS."""
+    for name in sorted(os.listdir(PAGES_DIRECTORY)):
+        # The responses are distinct, so that no decoded body is shared.
+        assert extract_links(create_page_response(name)) == __css_links(
+            create_page_response(name)
+        ), f"The links of {name} are not the ones selected by CSS."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_body() -> None:
+    """Tests if a response without body has no link."""
+    assert extract_links(__create_response(b"")) == [], "Links were found."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_unparsed_anchors() -> None:
+    """Tests if the anchors in comments, scripts and styles are ignored."""
+    body = (
+        b"<!-- <a href='/comment'> --><script>'<a href=\"/script\">'</script>"
+        b"<style>/* <a href='/style'> */</style><a href='/kept'>Link</a>"
+    )
+
+    assert extract_links(__create_response(body)) == [
+        "https://google.com/kept"
+    ], "An unparsed anchor was extracted."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_attributes() -> None:
+    """Tests if the first href of the anchors is extracted, whatever its
+    case and quoting, and with its entities replaced."""
+    body = (
+        b"<a title='href=\"/title\"' HREF=/first href='/second'>"
+        b"<a\nhref=\"?a=1&amp;b=&#50;&eacute;\"><abbr href='/abbr'><a>"
+    )
+
+    assert extract_links(__create_response(body)) == __css_links(
+        __create_response(body)
+    ), "The attributes were parsed differently."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_markup_in_attributes() -> None:
+    """Tests if the markup in the attribute values of the other tags, end
+    tags and processing instructions is not scanned for anchors."""
+    body = (
+        b'<img alt="<a href=/alt>"><div data-html="<a href=\'/data\'>">'
+        b"<p title='<a href=\"/p\">' class=x></div title='<a href=/end>'>"
+        b"<?php echo '<a href=/php'; ?><a href='/kept'>"
+        b"<span x=y'<a href=/unquoted>'><a href=/after>"
+        b"<b title='<a href=/unterminated>"
+    )
+
+    assert extract_links(__create_response(body)) == __css_links(
+        __create_response(body)
+    ), "The markup in an attribute value was scanned differently."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_invalid_references() -> None:
+    """Tests if the links end at the numeric references which are malformed
+    or don't refer to XML characters."""
+    for reference in (
+        b"&#0;",
+        b"&#x0;",
+        b"&#1;",
+        b"&#x1F;",
+        b"&#xD800;",
+        b"&#xFFFE;",
+        b"&#1114112;",
+        b"&#x;",
+        b"&#;",
+        b"&#a",
+        b"&#",
+    ):
+        body = b"<a href='/before" + reference + b"after?q=&#50;&amp;'>"
+
+        assert extract_links(__create_response(body)) == __css_links(
+            __create_response(body)
+        ), f"The link with {reference!r} was replaced differently."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_relative_links() -> None:
+    """Tests if the relative links are resolved against the base URL, as
+    urljoin does."""
+    body = (
+        b"<head><base href='/base/./directory//'></head>"
+        b"<a href='page'><a href='../../up/'><a href='./a/../b?q#f'>"
+        b"<a href='//cdn.example.com/x'><a href='mailto:a@example.com'>"
+    )
+
+    assert extract_links(__create_response(body)) == [
+        "https://google.com/base/directory/page",
+        "https://google.com/up/",
+        "https://google.com/base/directory/b?q#f",
+        "https://cdn.example.com/x",
+        "mailto:a@example.com",
+    ], "A relative link was badly resolved."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_decoded_body() -> None:
+    """Tests if the bodies whose encoding is not a superset of ASCII are
+    decoded before being scanned."""
+    body = "<a href='/ページ'>Page</a>".encode("utf-16")
+    headers = {"Content-Type": "text/html; charset=utf-16"}
+
+    assert extract_links(
+        HtmlResponse("https://google.com", body=body, headers=headers)
+    ) == ["https://google.com/ページ"], "The body was badly decoded."
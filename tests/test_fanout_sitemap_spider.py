@@ -0,0 +1,240 @@
+"""Unit tests for scapy_unit_tests.spiders.FanOutSitemapSpider
+
+Method type: Taking time to process
+N/A criteria:
+- Inverse relationship: The crawled pages cannot be reverted to the
+    sitemaps.
+"""
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from local_server import LocalServer, Routes
+
+CHILD_SITEMAPS = 12
+URLS_PER_SITEMAP = 5
+
+CRAWL_SCRIPT = """
+import json
+import sys
+import threading
+
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+
+from scapy_unit_tests.spiders import FanOutSitemapSpider
+
+parsed_urls = []
+parsing_threads = set()
+
+
+class IndexSpider(FanOutSitemapSpider):
+    name = "index"
+    sitemap_urls = [sys.argv[2]]
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if crawler.settings.getbool("COLLECT_IDLE_SLOTS"):
+            crawler.signals.connect(
+                spider.collect_idle_slots, signal=signals.request_scheduled
+            )
+
+        return spider
+
+    def collect_idle_slots(self, request, spider):
+        # As the downloader does with the slots idle for 60 seconds
+        self.crawler.engine.downloader._slot_gc(age=-60)
+
+    def parse(self, response):
+        parsed_urls.append(response.url)
+
+    def _parse_sitemap_body(self, body):
+        parsing_threads.add(threading.current_thread().name)
+
+        return super()._parse_sitemap_body(body)
+
+
+process = CrawlerProcess(
+    settings={
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        **json.loads(sys.argv[1]),
+    }
+)
+process.crawl(IndexSpider)
+process.start()
+
+print(
+    json.dumps(
+        {
+            "parsed_urls": parsed_urls,
+            "parsing_threads": sorted(parsing_threads),
+            "reactor_thread": threading.current_thread().name,
+        }
+    )
+)
+"""
+
+
+def create_sitemap_index_server(delay: float = 0) -> LocalServer:
+    """Creates a server of a sitemap index, whose first child sitemap is
+    gzipped, and of the pages listed by the child sitemaps."""
+    server = LocalServer({}, delay)
+    routes: Routes = {}
+
+    children = []
+    for index in range(CHILD_SITEMAPS):
+        path = f"/sitemaps/sitemap_{index}.xml" + (".gz" if index == 0 else "")
+        children.append(f"<sitemap><loc>{server.url(path)}</loc></sitemap>")
+
+        urls = []
+        for page in range(URLS_PER_SITEMAP):
+            page_path = f"/pages/{index}/{page}"
+            urls.append(f"<url><loc>{server.url(page_path)}</loc></url>")
+            routes[page_path] = ("text/html", b"<html></html>")
+
+        sitemap = (
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(urls)
+            + "</urlset>"
+        ).encode("utf-8")
+        routes[path] = (
+            ("application/x-gzip", gzip.compress(sitemap))
+            if index == 0
+            else ("application/xml", sitemap)
+        )
+
+    routes["/sitemap_index.xml"] = (
+        "application/xml",
+        (
+            "<sitemapindex"
+            ' xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(children)
+            + "</sitemapindex>"
+        ).encode("utf-8"),
+    )
+    server.routes = routes
+
+    return server
+
+
+def crawl_in_subprocess(server: LocalServer, settings: dict) -> dict:
+    """Crawls the sitemap index of a server, and returns the parsed URLs and
+    the threads which parsed the sitemaps."""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            CRAWL_SCRIPT,
+            json.dumps(settings),
+            server.url("/sitemap_index.xml"),
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    return json.loads(output)
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_all_urls_discovered() -> None:
+    """Tests if the pages of all the child sitemaps, including a gzipped one,
+    are crawled once."""
+    with create_sitemap_index_server() as server:
+        result = crawl_in_subprocess(server, {})
+
+        assert len(result["parsed_urls"]) == len(
+            set(result["parsed_urls"])
+        ), "A page was crawled more than once."
+        assert (
+            len(result["parsed_urls"]) == CHILD_SITEMAPS * URLS_PER_SITEMAP
+        ), "Not all the pages were crawled."
+        assert all(
+            server.count_requests(path) == 1
+            for path in server.routes
+            if path.startswith("/sitemaps/")
+        ), "A child sitemap was not requested exactly once."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_per_host_concurrency() -> None:
+    """Tests if the child sitemaps of a host are fetched with the configured
+    concurrency, independently of the pages' one."""
+    with create_sitemap_index_server(delay=0.02) as server:
+        crawl_in_subprocess(
+            server,
+            {
+                "SITEMAP_CONCURRENCY_PER_HOST": 3,
+                "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+            },
+        )
+
+        assert (
+            server.max_concurrency("/sitemaps/") == 3
+        ), "The child sitemaps were not fetched with the set concurrency."
+        assert (
+            server.max_concurrency("/pages/") == 1
+        ), "The pages were not fetched with their own concurrency."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_concurrency_of_collected_slots() -> None:
+    """Tests if the child sitemaps keep their concurrency when their slot is
+    collected by the downloader while they wait in the scheduler."""
+    with create_sitemap_index_server(delay=0.02) as server:
+        crawl_in_subprocess(
+            server,
+            {
+                "SITEMAP_CONCURRENCY_PER_HOST": 3,
+                "CONCURRENT_REQUESTS_PER_DOMAIN": 1,
+                "COLLECT_IDLE_SLOTS": True,
+            },
+        )
+
+        assert (
+            server.max_concurrency("/sitemaps/") == 3
+        ), "The child sitemaps were fetched with the pages' concurrency."
+        assert (
+            server.max_concurrency("/pages/") == 1
+        ), "The pages were not fetched with their own concurrency."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_parsing_off_reactor_thread() -> None:
+    """Tests if the sitemaps are parsed by the thread pool, and not by the
+    reactor thread."""
+    with create_sitemap_index_server() as server:
+        result = crawl_in_subprocess(server, {"REACTOR_THREADPOOL_MAXSIZE": 4})
+
+        assert result["parsing_threads"], "No sitemap was parsed."
+        assert (
+            result["reactor_thread"] not in result["parsing_threads"]
+        ), "A sitemap was parsed by the reactor thread."
@@ -0,0 +1,177 @@
+"""Unit tests for scapy_unit_tests.response.fast_get_base_url
+
+Method type: Using members from other classes (Response)
+N/A criteria:
+- Inverse relationship: No method is exposed to return the initial response
+    from the base URL.
+- Error: No exception is documented for this method.
+"""
+
+import pytest
+from scrapy.http import HtmlResponse
+from scrapy.utils.response import get_base_url
+
+from scapy_unit_tests.response import BASE_URL_SCAN_LIMIT, fast_get_base_url
+
+UTF8_HEADERS = {"Content-Type": "text/html; charset=utf-8"}
+
+
+def __create_response(body: bytes) -> HtmlResponse:
+    return HtmlResponse("https://google.com", body=body, headers=UTF8_HEADERS)
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_fake_responses() -> None:
+    """Tests if the base URLs of the fake responses are the ones returned by
+    get_base_url."""
+
+    class FakeResponseWithoutBase:
+        text: str = "<b>Content</b>"
+        url: str = "https://google.com"
+        encoding: str = "utf-8"
+
+    class FakeResponseWithBase(FakeResponseWithoutBase):
+        text: str = "<base href='https://www.canonical.com'/><b>Content</b>"
+
+    class FakeResponseWithComments(FakeResponseWithoutBase):
+        text: str = (
+            "<!-- <base href='https://www.canonical.com'/> --><b>Content</b>"
+        )
+
+    class FakeResponseWithEmptyContent(FakeResponseWithoutBase):
+        text: str = ""
+
+    for response_class in (
+        FakeResponseWithoutBase,
+        FakeResponseWithBase,
+        FakeResponseWithComments,
+        FakeResponseWithEmptyContent,
+    ):
+        assert fast_get_base_url(response_class()) == get_base_url(
+            response_class()
+        ), f"The base URL of {response_class.__name__} is invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_base_in_head() -> None:
+    """Tests if the base URL is found in the head of a response, without
+    decoding its body."""
+    response = __create_response(
+        b"<html><head><base href='/canonical/'></head><body>"
+        + b"<p>Content</p>" * 1024
+    )
+
+    url = fast_get_base_url(response)
+    assert (
+        url == "https://google.com/canonical/"
+    ), "The returned base URL is invalid."
+    assert response._cached_ubody is None, "The body was decoded."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_base_after_head() -> None:
+    """Tests if a <base> after the end of the head is ignored."""
+    response = __create_response(
+        b"<html><HEAD></HEAD ><body><base href='/canonical/'></body></html>"
+    )
+
+    url = fast_get_base_url(response)
+    assert (
+        url == "https://google.com"
+    ), "The <base> after the head was not ignored."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_base_after_scan_limit() -> None:
+    """Tests if a <base> after the scanned prefix is ignored."""
+    response = __create_response(
+        b" " * BASE_URL_SCAN_LIMIT + b"<base href='/canonical/'>"
+    )
+
+    url = fast_get_base_url(response)
+    assert (
+        url == "https://google.com"
+    ), "The <base> after the scanned prefix was not ignored."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_multibyte_characters() -> None:
+    """Tests if the scanned prefix is counted in characters, as in
+    get_base_url, when the text before the <base> takes several bytes per
+    character."""
+    base = "<base href='/canonical/'>"
+    for text, expected_url in [
+        # Past the limit in bytes, but not in characters
+        ("é" * (BASE_URL_SCAN_LIMIT - len(base)) + base, "/canonical/"),
+        ("é" * BASE_URL_SCAN_LIMIT + base, ""),
+    ]:
+        response = __create_response(text.encode("utf-8"))
+
+        assert (
+            fast_get_base_url(response)
+            == get_base_url(response)
+            == "https://google.com" + expected_url
+        ), "The scanned prefix is not the one of get_base_url."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_declared_encoding() -> None:
+    """Tests if the base URL is decoded with the encoding declared in the
+    body."""
+    response = HtmlResponse(
+        "https://google.com",
+        body="<meta charset='cp1251'><base href='/новости/'>".encode("cp1251"),
+    )
+
+    url = fast_get_base_url(response)
+    assert url == get_base_url(response), "The base URL was badly decoded."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_cache_per_response() -> None:
+    """Tests if the base URL is cached per response object."""
+    first_response = __create_response(b"<base href='/first/'>")
+    second_response = first_response.replace(body=b"<base href='/second/'>")
+
+    fast_get_base_url(first_response)
+    first_response._body = b""
+
+    assert (
+        fast_get_base_url(first_response) == "https://google.com/first/"
+    ), "The base URL was not cached."
+    assert (
+        fast_get_base_url(second_response) == "https://google.com/second/"
+    ), "The base URL was shared between responses."
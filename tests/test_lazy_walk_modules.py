@@ -0,0 +1,359 @@
+"""Unit tests for scapy_unit_tests.misc.walk_module_files and the lazy spider
+discovery of scapy_unit_tests.spiderloader.LazySpiderLoader
+
+Method type: Returning a list
+N/A criteria:
+- Inverse relationship: The modules are only discovered.
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+import typing
+import uuid
+
+import pytest
+from scrapy.settings import Settings
+from scrapy.utils.misc import walk_modules
+
+from scapy_unit_tests.misc import (
+    ScanCache,
+    find_spider_candidates,
+    walk_module_files,
+)
+from scapy_unit_tests.spiderloader import LazySpiderLoader
+
+SPIDER_MODULE_TEMPLATE = """from scrapy import Spider
+
+
+class Spider{index}(Spider):
+    name = "spider_{index}"
+"""
+
+LATIN_1_SPIDER_MODULE = """from scrapy import Spider
+
+
+class CafeSpider(Spider):
+    name = "caf\xe9"
+""".encode(
+    "latin-1"
+)
+
+
+@contextlib.contextmanager
+def generated_spider_package(count: int) -> typing.Iterator[str]:
+    """Creates an importable package with a spider in each of its count
+    submodules, and yields its name."""
+    with __package(
+        {
+            f"spider_{index}": SPIDER_MODULE_TEMPLATE.format(
+                index=index
+            ).encode("utf-8")
+            for index in range(count)
+        }
+    ) as package:
+        yield package
+
+
+@contextlib.contextmanager
+def __package(sources: dict[str, bytes]) -> typing.Iterator[str]:
+    package = f"spiders_{uuid.uuid4().hex}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        package_directory = os.path.join(directory, package)
+        os.mkdir(package_directory)
+        open(os.path.join(package_directory, "__init__.py"), "w").close()
+        for name, source in sources.items():
+            with open(
+                os.path.join(package_directory, f"{name}.py"), "wb"
+            ) as file:
+                file.write(source)
+
+        sys.path.insert(0, directory)
+        importlib.invalidate_caches()
+        try:
+            yield package
+        finally:
+            sys.path.remove(directory)
+            purge_modules(package)
+
+
+def purge_modules(package: str) -> None:
+    """Forgets the imported modules of a package."""
+    for name in list(sys.modules):
+        if name == package or name.startswith(package + "."):
+            del sys.modules[name]
+
+
+def __imported_modules(package: str) -> list[str]:
+    return [name for name in sys.modules if name.startswith(package + ".")]
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_1
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_one_submodule() -> None:
+    """Tests if the files of a module containing one submodule are walked as
+    walk_modules does."""
+    assert [module.name for module in walk_module_files("modules.one")] == [
+        module.__name__ for module in walk_modules("modules.one")
+    ], "The walked modules differ from the ones of walk_modules."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_multiple_submodules() -> None:
+    """Tests if the files of a module containing two submodules are walked as
+    walk_modules does."""
+    files = walk_module_files("modules.two")
+
+    assert [module.name for module in files] == [
+        module.__name__ for module in walk_modules("modules.two")
+    ], "The walked modules differ from the ones of walk_modules."
+    for module in files[1:]:
+        assert module.origin and os.path.isfile(
+            module.origin
+        ), "The source file of a submodule was not returned."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_no_import() -> None:
+    """Tests if the modules are walked and their spiders found without being
+    imported."""
+    with generated_spider_package(10) as package:
+        files = walk_module_files(package)
+        candidates = find_spider_candidates(package, ScanCache())
+
+        assert len(files) == 11, "Not all the modules were walked."
+        assert len(candidates) == 10, "Not all the spiders were found."
+        assert package not in sys.modules and not __imported_modules(
+            package
+        ), "A module was imported."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_invalid_module() -> None:
+    """Tests if an error is raised when walking an invalid module."""
+    try:
+        walk_module_files("doublethink")
+    except ModuleNotFoundError:
+        pass
+    else:
+        assert False, "No error was raised when walking an invalid module."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_local_module() -> None:
+    """Tests if an error is raised when walking a local module."""
+    try:
+        walk_module_files(".crimethought")
+    except TypeError:
+        pass
+    else:
+        assert False, "No error was raised when walking a local module."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(5)
+def test_lazy_load() -> None:
+    """Tests if the spiders of a 500 modules package are listed without
+    importing them, and if loading one imports only its module."""
+    with generated_spider_package(500) as package:
+        loader = LazySpiderLoader.from_settings(
+            Settings({"SPIDER_MODULES": [package]})
+        )
+
+        assert len(loader.list()) == 500, "Not all the spiders were listed."
+        assert not __imported_modules(package), "A module was imported."
+
+        spider = loader.load("spider_42")
+        assert (
+            spider.__name__ == "Spider42" and spider.name == "spider_42"
+        ), "The wrong spider was loaded."
+        assert __imported_modules(package) == [
+            f"{package}.spider_42"
+        ], "Other modules than the spider's one were imported."
+
+
+@pytest.mark.principle_existence
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_unknown_spider() -> None:
+    """Tests if an error is raised when loading an unknown spider."""
+    with generated_spider_package(1) as package:
+        loader = LazySpiderLoader.from_settings(
+            Settings({"SPIDER_MODULES": [package]})
+        )
+
+        try:
+            loader.load("spider_1")
+        except KeyError:
+            pass
+        else:
+            assert False, "No error was raised for an unknown spider."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_cache_invalidation() -> None:
+    """Tests if a cached scan is reused until its file is modified."""
+    cache = ScanCache()
+
+    with generated_spider_package(1) as package:
+        origin = walk_module_files(package + ".spider_0")[0].origin
+        assert origin, "The source file of the module was not found."
+        classes = cache.scan(origin)
+
+        assert cache.scan(origin) is classes, "The cached scan was not reused."
+
+        with open(origin, "a") as file:
+            file.write("\n\nclass Other(Spider0):\n    name = 'other'\n")
+        assert [info.name for info in cache.scan(origin)] == [
+            "Spider0",
+            "Other",
+        ], "The modified file was not scanned again."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(2)
+def test_persisted_cache() -> None:
+    """Tests if the cache set with SPIDER_DISCOVERY_CACHE is saved and loaded
+    again."""
+    with generated_spider_package(
+        20
+    ) as package, tempfile.TemporaryDirectory() as directory:
+        settings = Settings(
+            {
+                "SPIDER_MODULES": [package],
+                "SPIDER_DISCOVERY_CACHE": os.path.join(directory, "scan.json"),
+            }
+        )
+        first_loader = LazySpiderLoader.from_settings(settings)
+        second_loader = LazySpiderLoader.from_settings(settings)
+
+        assert (
+            len(second_loader.cache) == 21
+        ), "The persisted cache was not loaded."
+        assert (
+            second_loader.list() == first_loader.list()
+        ), "The spiders found with the persisted cache differ."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_undecodable_module() -> None:
+    """Tests if a module which is not valid UTF-8 is reported as an import
+    error by importing it, without stopping the discovery of the others."""
+    with __package(
+        {
+            "latin_1": LATIN_1_SPIDER_MODULE,
+            "spider_0": SPIDER_MODULE_TEMPLATE.format(index=0).encode(),
+        }
+    ) as package:
+        try:
+            find_spider_candidates(package, ScanCache())
+        except SyntaxError:
+            pass
+        else:
+            assert False, "No error was raised for the undecodable module."
+
+        with pytest.warns(RuntimeWarning):
+            loader = LazySpiderLoader.from_settings(
+                Settings(
+                    {
+                        "SPIDER_MODULES": [package + ".spider_0", package],
+                        "SPIDER_LOADER_WARN_ONLY": True,
+                    }
+                )
+            )
+        assert loader.list() == [
+            "spider_0"
+        ], "The spiders of the other modules were not found."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_declared_encoding() -> None:
+    """Tests if a module declaring its encoding is scanned without being
+    imported."""
+    with __package(
+        {"latin_1": b"# -*- coding: latin-1 -*-\n" + LATIN_1_SPIDER_MODULE}
+    ) as package:
+        candidates = find_spider_candidates(package, ScanCache())
+
+        assert [candidate.name for candidate in candidates] == [
+            "caf\xe9"
+        ], "The spider of the module was not found."
+        assert not __imported_modules(package), "The module was imported."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_same_class_names() -> None:
+    """Tests if classes with the same name in different modules are told
+    apart."""
+    with __package(
+        {
+            "first": (
+                b"from scrapy import Spider\n\n\n"
+                b"class Base(Spider):\n    name = 'first'\n"
+            ),
+            "second": b"class Base:\n    name = 'helper'\n",
+        }
+    ) as package:
+        candidates = find_spider_candidates(package, ScanCache())
+
+        assert [
+            (candidate.name, candidate.module) for candidate in candidates
+        ] == [
+            ("first", package + ".first")
+        ], "The spider was hidden by a class with the same name."
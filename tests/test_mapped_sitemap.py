@@ -0,0 +1,199 @@
+"""Unit tests for scapy_unit_tests.chunks.map_chunks, as used by
+scapy_unit_tests.sitemap.StreamingSitemap and
+scapy_unit_tests.sitemap.iter_sitemap_batches for the paths of files
+
+Method type: Processing streams of bytes
+N/A criteria:
+- Inverse relationship: No method is exposed to return the initial sitemap
+    tree.
+"""
+
+import gzip
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from lxml.etree import XMLSyntaxError
+from repeated_file import (
+    FILE_SIZE_MEMORY_MARGIN,
+    LARGE_FILE_SIZE,
+    SMALL_FILE_SIZE,
+    write_repeated_file,
+)
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import (
+    EMPTY_URLSET_SITEMAP,
+    SITEMAP_WITH_MULTIPLE_LINK,
+    SITEMAP_WITH_ONE_LINK,
+)
+
+from scapy_unit_tests.sitemap import StreamingSitemap, iter_sitemap_batches
+
+# Mostly comments, which are quickly skipped by the parser
+LARGE_SITEMAP_BLOCK = (
+    b"<url><loc>https://example.com/page</loc></url>\n"
+    + (b"<!--" + b"x" * 1000 + b"-->\n") * 1000
+)
+
+MEMORY_MEASUREMENT_SCRIPT = """
+import pathlib
+import sys
+
+from scapy_unit_tests.sitemap import StreamingSitemap
+
+
+def get_peak_memory():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+
+before = get_peak_memory()
+count = sum(1 for _ in StreamingSitemap(pathlib.Path(sys.argv[1])))
+after = get_peak_memory()
+
+print(count, after - before)
+"""
+
+
+def __write_sitemap(directory: str, content: str, compressed: bool) -> str:
+    path = os.path.join(directory, "sitemap.xml.gz" if compressed else "x.xml")
+    data = content.encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(gzip.compress(data) if compressed else data)
+
+    return path
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_sitemap_files() -> None:
+    """Tests if the files of sitemaps are streamed like Sitemap iterates
+    their content."""
+    with tempfile.TemporaryDirectory() as directory:
+        for content in [
+            EMPTY_URLSET_SITEMAP,
+            SITEMAP_WITH_ONE_LINK,
+            SITEMAP_WITH_MULTIPLE_LINK,
+        ]:
+            path = pathlib.Path(__write_sitemap(directory, content, False))
+
+            assert list(StreamingSitemap(path, chunk_size=16)) == list(
+                Sitemap(content)
+            ), "The elements streamed from the file are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_gzipped_sitemap_file() -> None:
+    """Tests if the file of a gzipped sitemap is detected and streamed like
+    Sitemap iterates its content."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(
+            __write_sitemap(directory, SITEMAP_WITH_MULTIPLE_LINK, True)
+        )
+
+        assert list(StreamingSitemap(path, chunk_size=16)) == list(
+            Sitemap(SITEMAP_WITH_MULTIPLE_LINK)
+        ), "The elements streamed from the gzipped file are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_batched_sitemap_file() -> None:
+    """Tests if the file of a sitemap is parsed into the same batches as its
+    content."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(
+            __write_sitemap(directory, SITEMAP_WITH_MULTIPLE_LINK, True)
+        )
+        (batch,) = iter_sitemap_batches(path)
+        (expected_batch,) = iter_sitemap_batches(SITEMAP_WITH_MULTIPLE_LINK)
+
+    assert (
+        batch.to_entries() == expected_batch.to_entries()
+    ), "The batch parsed from the file is invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_file() -> None:
+    """Tests if an error is raised when giving an empty file, which can't be
+    mapped."""
+    with tempfile.NamedTemporaryFile(suffix=".xml") as empty_file:
+        try:
+            StreamingSitemap(pathlib.Path(empty_file.name))
+        except XMLSyntaxError:
+            pass
+        else:
+            assert False, "No error is raised when giving an empty file."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(30)
+def test_bounded_memory() -> None:
+    """Tests if the peak memory taken by streaming a sitemap file doesn't
+    grow with its size, its mapped pages not staying in the resident
+    memory."""
+    memories = []
+    for size in [SMALL_FILE_SIZE, LARGE_FILE_SIZE]:
+        with tempfile.NamedTemporaryFile(suffix=".xml") as large_file:
+            entries_count = write_repeated_file(
+                large_file.name,
+                size,
+                (
+                    b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset'
+                    b' xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                ),
+                LARGE_SITEMAP_BLOCK,
+                b"</urlset>",
+            )
+            output = subprocess.check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    MEMORY_MEASUREMENT_SCRIPT,
+                    large_file.name,
+                ],
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            )
+        count, memory = map(int, output.split())
+        memories.append(memory)
+
+        assert (
+            count == entries_count
+        ), "Not all the entries of the large sitemap were returned."
+
+    assert (
+        memories[1] - memories[0] < FILE_SIZE_MEMORY_MARGIN
+    ), "The memory taken by the mapped file grows with its size."
@@ -0,0 +1,326 @@
+"""Unit tests for scapy_unit_tests.offloading.ParserPool and its usage by
+scapy_unit_tests.spiders.FanOutSitemapSpider and
+scapy_unit_tests.downloadermiddlewares.OffloadedRobotsTxtMiddleware
+
+Method type: Taking time to process
+N/A criteria:
+- Inverse relationship: The parsed objects cannot be reverted to the parsed
+    documents.
+"""
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from lxml.etree import XMLSyntaxError
+from scrapy.robotstxt import PythonRobotParser, RobotParser
+from scrapy.utils.sitemap import Sitemap
+from scrapy.utils.test import get_crawler
+from test_compiledrobotparser import (
+    CHECKED_URLS,
+    CHECKED_USER_AGENTS,
+    OVERLAPPING_RULES_ROBOTSTXT,
+)
+from test_fanout_sitemap_spider import (
+    CHILD_SITEMAPS,
+    URLS_PER_SITEMAP,
+    crawl_in_subprocess,
+    create_sitemap_index_server,
+)
+from test_sitemap_iter import SITEMAP_WITH_MULTIPLE_LINK
+
+from scapy_unit_tests.downloadermiddlewares import OffloadedRobotsTxtMiddleware
+from scapy_unit_tests.offloading import ParserPool
+from scapy_unit_tests.robotstxt import CompiledRobotParser
+
+COMPILED_ROBOT_PARSER = "scapy_unit_tests.robotstxt.CompiledRobotParser"
+DEFAULT_MIDDLEWARE = (
+    "scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware"
+)
+OFFLOADED_MIDDLEWARE = (
+    "scapy_unit_tests.downloadermiddlewares.OffloadedRobotsTxtMiddleware"
+)
+LARGE_SITEMAP_URLS = 100_000
+LATENCY_BUDGET = 0.25
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap>
+<loc>http://www.example.com/sitemap1.xml.gz</loc>
+<lastmod>2004-10-01T18:23:17+00:00</lastmod>
+</sitemap>
+<sitemap><loc>http://www.example.com/sitemap2.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+ROBOTSTXT = """
+User-agent: *
+Disallow: /pages/0/
+"""
+
+LATENCY_SCRIPT = """
+import json
+import sys
+import time
+
+from scrapy.utils.sitemap import Sitemap
+from scrapy.utils.test import get_crawler
+from twisted.internet import defer, reactor, task
+
+from scapy_unit_tests.offloading import ParserPool, deferred_from_future
+
+TICK = 0.005
+
+sitemap = (
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    + "".join(
+        f"<url><loc>https://www.example.com/pages/{index}.html</loc>"
+        "<lastmod>2009-02-06</lastmod></url>"
+        for index in range(int(sys.argv[1]))
+    )
+    + "</urlset>"
+).encode("utf-8")
+lags = []
+last_tick = time.monotonic()
+
+
+def tick():
+    global last_tick
+
+    now = time.monotonic()
+    lags.append(now - last_tick - TICK)
+    last_tick = now
+
+
+@defer.inlineCallbacks
+def measure_lag(parse):
+    yield task.deferLater(reactor, 0.05, lambda: None)
+    start = len(lags)
+    entries = yield parse()
+    yield task.deferLater(reactor, 0.05, lambda: None)
+
+    return max(lags[start:]), entries
+
+
+@defer.inlineCallbacks
+def measure():
+    pool = ParserPool(1)
+    # Waits for the worker to be spawned.
+    yield deferred_from_future(pool.parse_sitemap(b"<urlset/>"))
+
+    inline_lag, inline_entries = yield measure_lag(
+        lambda: task.deferLater(reactor, 0, lambda: list(Sitemap(sitemap)))
+    )
+    offloaded_lag, offloaded_sitemap = yield measure_lag(
+        lambda: deferred_from_future(pool.parse_sitemap(sitemap))
+    )
+    pool.shutdown()
+
+    print(
+        json.dumps(
+            {
+                "inline_lag": inline_lag,
+                "offloaded_lag": offloaded_lag,
+                "identical": inline_entries == offloaded_sitemap.entries,
+            }
+        )
+    )
+    reactor.stop()
+
+
+task.LoopingCall(tick).start(TICK)
+reactor.callWhenRunning(measure)
+reactor.run()
+"""
+
+
+def __answers(robot: RobotParser) -> list[bool]:
+    return [
+        robot.allowed(url, user_agent)
+        for url, user_agent in itertools.product(
+            CHECKED_URLS, CHECKED_USER_AGENTS
+        )
+    ]
+
+
+def __assert_identical_sitemap(pool: ParserPool, sitemap: str) -> None:
+    body = sitemap.encode("utf-8")
+    expected_sitemap = Sitemap(body)
+    parsed_sitemap = pool.parse_sitemap(body).result()
+
+    assert (
+        parsed_sitemap.type == expected_sitemap.type
+    ), "The offloaded sitemap has another type."
+    assert list(parsed_sitemap) == list(
+        expected_sitemap
+    ), "The offloaded sitemap has other entries."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_identical_sitemaps() -> None:
+    """Tests if the sitemaps parsed in the pool are identical to the ones
+    parsed in the process."""
+    pool = ParserPool(1)
+    try:
+        __assert_identical_sitemap(pool, SITEMAP_WITH_MULTIPLE_LINK)
+        __assert_identical_sitemap(pool, SITEMAP_INDEX)
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_sitemap_error() -> None:
+    """Tests if the error raised by an invalid sitemap is raised again by the
+    future."""
+    pool = ParserPool(1)
+    try:
+        pool.parse_sitemap(b"").result()
+    except XMLSyntaxError:
+        pass
+    else:
+        assert False, "No error was raised for an empty sitemap."
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_identical_robots() -> None:
+    """Tests if the robots.txt parsers built in the pool answer as the ones
+    built in the process."""
+    body = OVERLAPPING_RULES_ROBOTSTXT.encode("utf-8")
+    pool = ParserPool(2)
+    try:
+        for parser_class in (PythonRobotParser, CompiledRobotParser):
+            parser = pool.parse_robots(parser_class, body).result()
+
+            assert (
+                type(parser) is parser_class
+            ), "The offloaded parser has another type."
+            assert __answers(parser) == __answers(
+                parser_class(body, None)
+            ), f"The offloaded {parser_class.__name__} answered differently."
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_existence
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_unpicklable_parser() -> None:
+    """Tests if only the robots.txt parsers which can be pickled are
+    offloaded."""
+    default_middleware = OffloadedRobotsTxtMiddleware(
+        get_crawler(settings_dict={"ROBOTSTXT_OBEY": True})
+    )
+    compiled_middleware = OffloadedRobotsTxtMiddleware(
+        get_crawler(
+            settings_dict={
+                "ROBOTSTXT_OBEY": True,
+                "ROBOTSTXT_PARSER": COMPILED_ROBOT_PARSER,
+            }
+        )
+    )
+
+    assert (
+        not default_middleware.offloaded
+    ), "The default parser, which can't be pickled, was offloaded."
+    assert (
+        compiled_middleware.offloaded
+    ), "CompiledRobotParser was not offloaded."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(30)
+def test_bounded_reactor_latency() -> None:
+    """Tests if the reactor keeps running its calls while a large sitemap is
+    parsed in the pool, and not while it is parsed in the reactor thread."""
+    result = json.loads(
+        subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                LATENCY_SCRIPT,
+                str(LARGE_SITEMAP_URLS),
+            ],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+    )
+
+    assert result["identical"], "The large sitemaps were parsed differently."
+    assert (
+        result["inline_lag"] > LATENCY_BUDGET
+    ), "The sitemap is too small to block the reactor when parsed inline."
+    assert (
+        result["offloaded_lag"] < LATENCY_BUDGET
+    ), "The reactor was blocked while the sitemap was parsed in the pool."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.robotstxt_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(20)
+def test_offloaded_crawl() -> None:
+    """Tests if a crawl parsing its sitemaps and robots.txt files in the pool
+    crawls the allowed pages only."""
+    with create_sitemap_index_server() as server:
+        server.routes["/robots.txt"] = (
+            "text/plain",
+            ROBOTSTXT.encode("utf-8"),
+        )
+        result = crawl_in_subprocess(
+            server,
+            {
+                "SITEMAP_PARSING_MODE": "process",
+                "PARSER_POOL_PROCESSES": 2,
+                "ROBOTSTXT_OBEY": True,
+                "ROBOTSTXT_PARSER": COMPILED_ROBOT_PARSER,
+                "DOWNLOADER_MIDDLEWARES": {
+                    DEFAULT_MIDDLEWARE: None,
+                    OFFLOADED_MIDDLEWARE: 100,
+                },
+            },
+        )
+
+        assert not result[
+            "parsing_threads"
+        ], "A sitemap was parsed in the crawler process."
+        assert (
+            len(result["parsed_urls"])
+            == (CHILD_SITEMAPS - 1) * URLS_PER_SITEMAP
+        ), "Not all the allowed pages were crawled."
+        assert not any(
+            "/pages/0/" in url for url in result["parsed_urls"]
+        ), "A disallowed page was crawled."
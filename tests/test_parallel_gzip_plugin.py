@@ -0,0 +1,153 @@
+"""Unit tests for scapy_unit_tests.postprocessing.ParallelGzipPlugin's write()
+
+Methods type: Returning an integer
+"""
+
+import tempfile
+import zlib
+
+import pytest
+from test_gzip_lzma_plugins import gzip_wrapper, ungzip
+
+from scapy_unit_tests.postprocessing import ParallelGzipPlugin
+
+JSON_LINES = b"".join(
+    b'{"url": "https://example.com/%d", "title": "Example"}\n' % index
+    for index in range(10000)
+)
+
+
+def parallel_gzip_wrapper(
+    filename: str, chunks: list[bytes], block_size: int = 1024
+) -> list[int]:
+    with open(filename, "wb") as file:
+        plugin = ParallelGzipPlugin(
+            file,
+            feed_options={
+                "gzip_compresslevel": 9,
+                "gzip_mtime": 0,
+                "gzip_block_size": block_size,
+                "gzip_workers": 4,
+            },
+        )
+        return_codes = [plugin.write(chunk) for chunk in chunks]
+        plugin.close()
+
+        return return_codes
+
+
+def __count_members(filename: str) -> int:
+    with open(filename, "rb") as file:
+        content = file.read()
+
+    members = 0
+    while content:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decompressor.decompress(content)
+        content = decompressor.unused_data
+        members += 1
+
+    return members
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_content() -> None:
+    """Tests if the content is written correctly into the GZIP file."""
+    data = b"data"
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_codes = parallel_gzip_wrapper(temp.name, [data])
+        assert return_codes == [len(data)], "The written size is invalid."
+
+        uncompressed_content = ungzip(temp.name)
+        assert (
+            data == uncompressed_content
+        ), "The written data is different from the original one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_ordering
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_multiple_members() -> None:
+    """Tests if the content of many chunks is split into several GZIP members,
+    read back in the original order."""
+    chunks = JSON_LINES.splitlines(keepends=True)
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        parallel_gzip_wrapper(temp.name, chunks, block_size=16 * 1024)
+
+        uncompressed_content = ungzip(temp.name)
+        assert (
+            JSON_LINES == uncompressed_content
+        ), "The written data is different from the original one."
+        assert __count_members(temp.name) == -(
+            -len(JSON_LINES) // (16 * 1024)
+        ), "The data was not split into a member per block."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.5)
+def test_same_content_as_gzip_plugin() -> None:
+    """Tests if the written data is read back as the one written by
+    GzipPlugin."""
+    with tempfile.NamedTemporaryFile(
+        "wb", delete=False
+    ) as parallel_temp, tempfile.NamedTemporaryFile(
+        "wb", delete=False
+    ) as temp:
+        parallel_gzip_wrapper(parallel_temp.name, [JSON_LINES])
+        gzip_wrapper(temp.name, JSON_LINES)
+
+        assert ungzip(parallel_temp.name) == ungzip(
+            temp.name
+        ), "The written data differs from the one of GzipPlugin."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_zero_length() -> None:
+    """Tests if length 0 is returned and a valid GZIP file is written when
+    passing an empty input."""
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_codes = parallel_gzip_wrapper(temp.name, [b""])
+        assert return_codes == [0], "The size is non-0, despite no content."
+        assert __count_members(temp.name) == 1, "No GZIP member was written."
+        assert ungzip(temp.name) == b"", "The GZIP file is not empty."
+
+
+@pytest.mark.principle_existence
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_inexistent_file() -> None:
+    """Tests if an generic exception is raised when passing an inexistent
+    file.
+    """
+    try:
+        parallel_gzip_wrapper("/path/to/no/file", [b"exception"])
+    except Exception:
+        pass
+    else:
+        assert (
+            False
+        ), "No exception was raised when processing an inexistent file."
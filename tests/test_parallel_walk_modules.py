@@ -0,0 +1,189 @@
+"""Unit tests for scapy_unit_tests.misc.walk_modules, importing the
+submodules concurrently
+
+Method type: Returning a list
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+import time
+import typing
+import uuid
+
+import pytest
+from scrapy.utils.misc import walk_modules as serial_walk_modules
+from test_lazy_walk_modules import purge_modules
+
+from scapy_unit_tests.misc import walk_modules
+
+WORKERS = 4
+SLOW_MODULE = "import time\n\ntime.sleep(0.05)\n"
+
+
+@contextlib.contextmanager
+def generated_package(files: dict[str, str]) -> typing.Iterator[str]:
+    """Creates an importable package with the given files, keyed on their
+    paths relative to the package, and yields its name. The subdirectories
+    are created as packages."""
+    package = f"package_{uuid.uuid4().hex}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        for relative_path, content in files.items():
+            path = os.path.join(directory, package, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            package_directory = os.path.join(directory, package)
+            for part in ["", *os.path.dirname(relative_path).split("/")]:
+                package_directory = os.path.join(package_directory, part)
+                open(
+                    os.path.join(package_directory, "__init__.py"), "a"
+                ).close()
+            with open(path, "w") as file:
+                file.write(content)
+
+        sys.path.insert(0, directory)
+        importlib.invalidate_caches()
+        try:
+            yield package
+        finally:
+            sys.path.remove(directory)
+            purge_modules(package)
+
+
+def __module_names(modules: list[typing.Any]) -> list[str]:
+    return [module.__name__ for module in modules]
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_1
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_one_submodule() -> None:
+    """Tests if a module containing one submodule is walked as in the serial
+    mode."""
+    assert walk_modules("modules.one", WORKERS) == serial_walk_modules(
+        "modules.one"
+    ), "The walked modules differ from the serial ones."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_multiple_submodules() -> None:
+    """Tests if a module containing two submodules is walked as in the serial
+    mode."""
+    assert walk_modules("modules.two", WORKERS) == serial_walk_modules(
+        "modules.two"
+    ), "The walked modules differ from the serial ones."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_ordering
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_nested_packages_ordering() -> None:
+    """Tests if the modules of nested packages are returned in the order of
+    the serial mode."""
+    files = {
+        f"{first}/{second}/module_{index}.py": ""
+        for first in ("b", "a")
+        for second in ("d", "c")
+        for index in range(3)
+    }
+    files["e.py"] = files["a/module.py"] = ""
+
+    with generated_package(files) as package:
+        modules = walk_modules(package, WORKERS)
+        purge_modules(package)
+
+        assert __module_names(modules) == __module_names(
+            serial_walk_modules(package)
+        ), "The modules are not returned in the serial order."
+        assert len(modules) == 21, "Not all the modules were walked."
+
+
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_concurrent_imports() -> None:
+    """Tests if the slow imports of sibling modules overlap."""
+    files = {f"module_{index}.py": SLOW_MODULE for index in range(8)}
+
+    with generated_package(files) as package:
+        start = time.perf_counter()
+        walk_modules(package, 8)
+
+        assert (
+            time.perf_counter() - start < 8 * 0.05 / 2
+        ), "The modules were not imported concurrently."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_invalid_module() -> None:
+    """Tests if an error is raised when walking an invalid module."""
+    try:
+        walk_modules("doublethink", WORKERS)
+    except ModuleNotFoundError:
+        pass
+    else:
+        assert False, "No error was raised when walking an invalid module."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_local_module() -> None:
+    """Tests if an error is raised when walking a local module."""
+    try:
+        walk_modules(".crimethought", WORKERS)
+    except TypeError:
+        pass
+    else:
+        assert False, "No error was raised when walking a local module."
+
+
+@pytest.mark.principle_error
+@pytest.mark.principle_ordering
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_first_error() -> None:
+    """Tests if the raised error is the one of the first failing module in the
+    walk order, as in the serial mode."""
+    files = {
+        "a/slow.py": SLOW_MODULE + "raise KeyError('first')\n",
+        "b.py": "raise ValueError('second')\n",
+    }
+
+    with generated_package(files) as package:
+        for walk in (serial_walk_modules, lambda path: walk_modules(path, 4)):
+            try:
+                walk(package)
+            except KeyError:
+                pass
+            else:
+                assert False, "The error of the first module was not raised."
+            finally:
+                purge_modules(package)
@@ -0,0 +1,259 @@
+"""Unit tests for scapy_unit_tests.robotstxt.robot_parser_from_path
+
+Method type: Simplifying the usage of other functionality (from
+    urllib.robotparser.RobotFileParser)
+N/A criteria:
+- Inverse relationship: No method is exposed to return the intial robots.txt.
+"""
+
+import gzip
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+import typing
+
+import pytest
+from repeated_file import (
+    FILE_SIZE_MEMORY_MARGIN,
+    LARGE_FILE_SIZE,
+    SMALL_FILE_SIZE,
+    write_repeated_file,
+)
+from scrapy.robotstxt import ProtegoRobotParser, PythonRobotParser, RobotParser
+from test_compiledrobotparser import (
+    CHECKED_URLS,
+    CHECKED_USER_AGENTS,
+    OVERLAPPING_RULES_ROBOTSTXT,
+)
+from test_pythonrobotparser import DUMMY_ROBOTSTXT
+
+from scapy_unit_tests.robotstxt import (
+    CompiledRobotParser,
+    robot_parser_from_path,
+)
+
+# Mostly comments, which are skipped by RobotFileParser
+LARGE_ROBOTSTXT_BLOCK = b"# " + b"x" * 1000 + b"\n"
+
+MEMORY_MEASUREMENT_SCRIPT = """
+import sys
+
+from scapy_unit_tests.robotstxt import robot_parser_from_path
+
+
+def get_peak_memory():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+
+before = get_peak_memory()
+robot = robot_parser_from_path(sys.argv[1])
+after = get_peak_memory()
+
+print(int(robot.allowed("/private", "Googlebot")), after - before)
+"""
+
+IMPORTED_MODULES_SCRIPT = """
+import sys
+
+import scapy_unit_tests.robotstxt
+
+print("numpy" in sys.modules)
+"""
+
+
+class CountingCompiledRobotParser(CompiledRobotParser):
+    def __init__(self, robotstxt_body: typing.Any, spider: typing.Any) -> None:
+        super().__init__(robotstxt_body, spider)
+        self.allowed_count = 0
+
+    def allowed(self, url: typing.Any, user_agent: typing.Any) -> bool:
+        self.allowed_count += 1
+        return super().allowed(url, user_agent)
+
+
+class CountingPythonRobotParser(PythonRobotParser):
+    def __init__(self, robotstxt_body: typing.Any, spider: typing.Any) -> None:
+        super().__init__(robotstxt_body, spider)
+        self.allowed_count = 0
+
+    def allowed(self, url: typing.Any, user_agent: typing.Any) -> bool:
+        self.allowed_count += 1
+        return super().allowed(url, user_agent)
+
+
+def __answers(robot: RobotParser) -> list[bool]:
+    return [
+        robot.allowed(url, user_agent)
+        for url, user_agent in itertools.product(
+            CHECKED_URLS, CHECKED_USER_AGENTS
+        )
+    ]
+
+
+def __write_robotstxt(directory: str, content: bytes, compressed: bool) -> str:
+    path = os.path.join(directory, "robots.txt.gz" if compressed else "x.txt")
+    with open(path, "wb") as file:
+        file.write(gzip.compress(content) if compressed else content)
+
+    return path
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_robotstxt_files() -> None:
+    """Tests if the files of robots.txt are parsed as their content, gzipped
+    or not."""
+    with tempfile.TemporaryDirectory() as directory:
+        for robotstxt in [DUMMY_ROBOTSTXT, OVERLAPPING_RULES_ROBOTSTXT, ""]:
+            for compressed in [False, True]:
+                path = __write_robotstxt(
+                    directory, robotstxt.encode("utf-8"), compressed
+                )
+
+                assert __answers(robot_parser_from_path(path)) == __answers(
+                    PythonRobotParser(robotstxt, None)
+                ), "The answers are different from the content's ones."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_parser_classes() -> None:
+    """Tests if the files are parsed as their content by the other parser
+    classes."""
+    content = OVERLAPPING_RULES_ROBOTSTXT.encode("utf-8")
+    with tempfile.TemporaryDirectory() as directory:
+        path = __write_robotstxt(directory, content, True)
+
+        for parser_class in [CompiledRobotParser, ProtegoRobotParser]:
+            robot = robot_parser_from_path(path, None, parser_class)
+
+            assert isinstance(
+                robot, parser_class
+            ), "The parser is not of the given class."
+            assert __answers(robot) == __answers(
+                parser_class(content, None)
+            ), f"The answers of {parser_class.__name__} are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_parser_subclasses() -> None:
+    """Tests if the parser subclasses are initialized by their constructor,
+    and answer as the content."""
+    content = OVERLAPPING_RULES_ROBOTSTXT.encode("utf-8")
+    with tempfile.TemporaryDirectory() as directory:
+        path = __write_robotstxt(directory, content, False)
+
+        for parser_class in [
+            CountingCompiledRobotParser,
+            CountingPythonRobotParser,
+        ]:
+            robot: typing.Any = robot_parser_from_path(
+                path, None, parser_class
+            )
+
+            assert (
+                robot.allowed_count == 0
+            ), f"{parser_class.__name__} was not initialized."
+            assert not robot.allowed(
+                "/private", "Googlebot"
+            ), f"The rules of {parser_class.__name__} were not parsed."
+            assert (
+                robot.allowed_count == 1
+            ), f"The subclass of {parser_class.__name__} was not called."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_numpy_not_imported() -> None:
+    """Tests if importing the robots.txt parsers doesn't import NumPy, which
+    only the sitemap batches need."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORTED_MODULES_SCRIPT],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    assert output.strip() == b"False", "NumPy was imported."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_undecodable_file() -> None:
+    """Tests if a file which is not in UTF-8 is treated as an empty one."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = __write_robotstxt(
+            directory, b"User-agent: *\nDisallow: /\n\xff", False
+        )
+        robot = robot_parser_from_path(path)
+
+    assert robot.allowed(
+        "/", "Googlebot"
+    ), "Googlebot is not allowed to crawl."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(30)
+def test_bounded_memory() -> None:
+    """Tests if the peak memory taken by parsing a robots.txt file doesn't
+    grow with its size, its mapped pages not staying in the resident
+    memory."""
+    memories = []
+    for size in [SMALL_FILE_SIZE, LARGE_FILE_SIZE]:
+        with tempfile.NamedTemporaryFile(suffix=".txt") as large_file:
+            write_repeated_file(
+                large_file.name,
+                size,
+                b"User-agent: *\nDisallow: /private\n",
+                LARGE_ROBOTSTXT_BLOCK * 1000,
+            )
+            output = subprocess.check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    MEMORY_MEASUREMENT_SCRIPT,
+                    large_file.name,
+                ],
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            )
+        allowed, memory = map(int, output.split())
+        memories.append(memory)
+
+        assert not allowed, "The rules of the large file were not parsed."
+
+    assert (
+        memories[1] - memories[0] < FILE_SIZE_MEMORY_MARGIN
+    ), "The memory taken by the mapped file grows with its size."
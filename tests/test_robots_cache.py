@@ -0,0 +1,372 @@
+"""Unit tests for scapy_unit_tests.robotstxt.RobotsCache and its usage by
+scapy_unit_tests.downloadermiddlewares.CachedRobotsTxtMiddleware
+
+Method type: Caching objects
+N/A criteria:
+- Inverse relationship: The cache stores the objects as they are.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+from fake_clock import FakeClock
+from local_server import LocalServer
+from scrapy import Spider
+from scrapy.http import TextResponse
+from scrapy.robotstxt import PythonRobotParser
+from scrapy.utils.test import get_crawler
+from test_pythonrobotparser import DUMMY_ROBOTSTXT
+from twisted.internet.defer import Deferred
+
+from scapy_unit_tests.downloadermiddlewares import CachedRobotsTxtMiddleware
+from scapy_unit_tests.robotstxt import RobotsCache
+
+ROBOTSTXT = """
+User-agent: *
+Disallow: /private
+"""
+
+HTML_PAGE = b"<html><body><a href='/private'>Private</a></body></html>"
+
+CRAWL_SCRIPT = """
+import json
+import sys
+
+from scrapy import Spider
+from scrapy.crawler import CrawlerProcess
+from twisted.internet import defer, reactor
+
+from scapy_unit_tests.robotstxt import robots_cache
+
+CACHED_MIDDLEWARE = (
+    "scapy_unit_tests.downloadermiddlewares.CachedRobotsTxtMiddleware"
+)
+
+
+class FirstSpider(Spider):
+    name = "first"
+    start_urls = sys.argv[2:]
+
+    def parse(self, response):
+        pass
+
+
+class SecondSpider(FirstSpider):
+    name = "second"
+
+
+process = CrawlerProcess(
+    settings={
+        "ROBOTSTXT_OBEY": True,
+        "DOWNLOADER_MIDDLEWARES": {
+            "scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware": None,
+            CACHED_MIDDLEWARE: 100,
+        },
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+    }
+)
+crawlers = [
+    process.create_crawler(FirstSpider),
+    process.create_crawler(SecondSpider),
+]
+
+if sys.argv[1] == "sequential":
+    @defer.inlineCallbacks
+    def crawl():
+        for crawler in crawlers:
+            yield process.crawl(crawler)
+        reactor.stop()
+
+    crawl()
+    process.start(stop_after_crawl=False)
+else:
+    for crawler in crawlers:
+        process.crawl(crawler)
+    process.start()
+
+print(
+    json.dumps(
+        {
+            "hits": robots_cache.hits,
+            "misses": robots_cache.misses,
+            "stats": [crawler.stats.get_stats() for crawler in crawlers],
+        },
+        default=str,
+    )
+)
+"""
+
+
+def __create_parser() -> PythonRobotParser:
+    return PythonRobotParser(DUMMY_ROBOTSTXT, None)
+
+
+def __crawl_in_subprocess(mode: str, server: LocalServer) -> dict:
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            CRAWL_SCRIPT,
+            mode,
+            server.url("/"),
+            server.url("/private"),
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    return json.loads(output)
+
+
+def __create_middleware(
+    cache: RobotsCache, settings: dict
+) -> CachedRobotsTxtMiddleware:
+    middleware_class = type(
+        "IsolatedRobotsTxtMiddleware",
+        (CachedRobotsTxtMiddleware,),
+        {"cache": cache},
+    )
+
+    return middleware_class(
+        get_crawler(Spider, {"ROBOTSTXT_OBEY": True, **settings})
+    )
+
+
+def __create_server() -> LocalServer:
+    return LocalServer(
+        {
+            "/robots.txt": ("text/plain", ROBOTSTXT.encode("utf-8")),
+            "/": ("text/html", HTML_PAGE),
+            "/private": ("text/html", HTML_PAGE),
+        }
+    )
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_hit_and_miss() -> None:
+    """Tests if a stored parser is returned and the lookups are counted."""
+    cache = RobotsCache()
+    parser = __create_parser()
+
+    assert cache.get(("example.com", "Scrapy")) is None, "A parser was found."
+    cache.set(("example.com", "Scrapy"), parser)
+
+    assert (
+        cache.get(("example.com", "Scrapy")) is parser
+    ), "The stored parser was not returned."
+    assert (
+        cache.get(("example.com", "Googlebot")) is None
+    ), "A parser was returned for another user agent."
+    assert (
+        cache.hits == 1 and cache.misses == 2
+    ), "The hits and the misses were not counted correctly."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_ordering
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_eviction_order() -> None:
+    """Tests if the least recently used parser is evicted first."""
+    cache = RobotsCache(maxsize=2)
+    cache.set("first.com", __create_parser())
+    cache.set("second.com", __create_parser())
+    cache.get("first.com")
+    cache.set("third.com", __create_parser())
+
+    assert cache.keys() == [
+        "first.com",
+        "third.com",
+    ], "The least recently used parser was not evicted."
+    assert (
+        cache.get("second.com") is None
+    ), "An evicted parser was still returned."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_zero_size() -> None:
+    """Tests if nothing is stored in a cache with no room."""
+    cache = RobotsCache(maxsize=0)
+    cache.set("example.com", __create_parser())
+
+    assert len(cache) == 0, "A parser was stored despite the zero size."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.technique_fake
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_ttl_expiry() -> None:
+    """Tests if a parser is no longer returned after its TTL."""
+    clock = FakeClock()
+    cache = RobotsCache(ttl=60, clock=clock)
+    cache.set("example.com", __create_parser())
+
+    clock.now = 59
+    assert cache.get("example.com"), "The parser expired before its TTL."
+
+    clock.now = 60
+    assert not cache.get("example.com"), "The parser did not expire."
+    assert len(cache) == 0, "The expired parser is still stored."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_ordering
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_configured_once() -> None:
+    """Tests if the size and the TTL of a cache are only set by its first
+    configuration."""
+    cache = RobotsCache()
+
+    assert cache.configure(10, 60), "The first configuration was rejected."
+    assert not cache.configure(20), "A different size was accepted."
+    assert cache.configure(10), "The size in use was rejected."
+    assert cache.configure(), "An empty configuration was rejected."
+    assert (
+        cache.maxsize == 10 and cache.ttl == 60
+    ), "A later configuration changed the cache."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_settings_of_first_crawler(caplog: pytest.LogCaptureFixture) -> None:
+    """Tests if the cache shared by several crawlers is configured by the
+    first one, with a warning for the different settings of the next ones."""
+    # The crawlers also log their settings once Scrapy's logging is set up.
+    caplog.set_level(logging.WARNING, "scapy_unit_tests.downloadermiddlewares")
+    cache = RobotsCache()
+    __create_middleware(cache, {"ROBOTSTXT_CACHE_SIZE": 10})
+    __create_middleware(cache, {})
+    assert not caplog.records, "A crawler without settings was warned."
+
+    __create_middleware(
+        cache, {"ROBOTSTXT_CACHE_SIZE": 20, "ROBOTSTXT_CACHE_TTL": 60}
+    )
+    assert (
+        cache.maxsize == 10 and cache.ttl != 60
+    ), "A later crawler changed the cache."
+    assert (
+        "ROBOTSTXT_CACHE_SIZE=20" in caplog.text
+    ), "The ignored settings were not warned about."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_cached_parser_without_spider() -> None:
+    """Tests if the cached parser doesn't reference the spider of the crawler
+    which downloaded it, unlike the parser used by this crawler."""
+    cache = RobotsCache()
+    middleware = __create_middleware(cache, {})
+    spider = Spider("first")
+    middleware.crawler.spider = spider
+
+    middleware._parsers["example.com"] = Deferred()
+    middleware._parse_robots(
+        TextResponse(
+            "http://example.com/robots.txt",
+            body=DUMMY_ROBOTSTXT.encode("utf-8"),
+        ),
+        "example.com",
+        spider,
+    )
+    cached_parser = cache.get(middleware._cache_key("example.com"))
+
+    assert (
+        middleware._parsers["example.com"].spider is spider
+    ), "The parser of the crawler lost its spider."
+    assert cached_parser is not None, "The parser was not cached."
+    assert cached_parser.spider is None, "The cached parser kept the spider."
+    assert cached_parser.allowed(
+        "http://example.com/", "Scrapy"
+    ) == middleware._parsers["example.com"].allowed(
+        "http://example.com/", "Scrapy"
+    ), "The cached parser gives other answers."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_reuse_across_sequential_spiders() -> None:
+    """Tests if a second spider of a CrawlerProcess reuses the robots.txt
+    parsed for the first one."""
+    with __create_server() as server:
+        result = __crawl_in_subprocess("sequential", server)
+
+        assert (
+            server.count_requests("/robots.txt") == 1
+        ), "The robots.txt was requested more than once."
+        assert (
+            server.count_requests("/") == 2
+        ), "The allowed page was not crawled by both spiders."
+        assert (
+            server.count_requests("/private") == 0
+        ), "The disallowed page was crawled."
+
+    first_stats, second_stats = result["stats"]
+    assert (
+        first_stats.get("robotstxt/cache_miss_count") == 1
+        and second_stats.get("robotstxt/cache_hit_count") == 1
+    ), "The cache usage was not reported in the stats."
+    assert (
+        result["hits"] == 1 and result["misses"] == 1
+    ), "The cache lookups were not counted correctly."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.robotstxt_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_reuse_across_concurrent_spiders() -> None:
+    """Tests if concurrent spiders of a CrawlerProcess share the download of
+    the robots.txt."""
+    with __create_server() as server:
+        __crawl_in_subprocess("concurrent", server)
+
+        assert (
+            server.count_requests("/robots.txt") == 1
+        ), "The robots.txt was requested more than once."
+        assert (
+            server.count_requests("/private") == 0
+        ), "The disallowed page was crawled."
@@ -0,0 +1,304 @@
+"""Unit tests for scapy_unit_tests.sitemap.SeenIndex and its usage by
+scapy_unit_tests.spiders.IncrementalSitemapSpider
+
+Method type: Caching objects
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from local_server import LocalServer
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import SITEMAP_WITH_MULTIPLE_LINK
+
+from scapy_unit_tests.sitemap import SeenIndex, parse_lastmod
+
+# Google's search page is listed twice, without and with a lastmod.
+UNDATED_ENTRIES = 1
+
+CRAWL_SCRIPT = """
+import json
+import sys
+
+from scrapy.crawler import CrawlerProcess
+
+from scapy_unit_tests.spiders import IncrementalSitemapSpider
+
+
+class PagesSpider(IncrementalSitemapSpider):
+    name = "pages"
+    sitemap_urls = [sys.argv[2]]
+
+    def parse(self, response):
+        if response.url.endswith("/failing"):
+            raise ValueError("Failing page")
+
+
+process = CrawlerProcess(
+    settings={
+        "SITEMAP_SEEN_INDEX": sys.argv[1],
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+    }
+)
+crawler = process.create_crawler(PagesSpider)
+process.crawl(crawler)
+process.start()
+
+print(json.dumps(crawler.stats.get_stats(), default=str))
+"""
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>{url}/dated</loc><lastmod>{lastmod}</lastmod></url>
+<url><loc>{url}/timed</loc><lastmod>2006-11-21T16:00:13+00:00</lastmod></url>
+<url><loc>{url}/undated</loc></url>
+<url><loc>{url}/missing</loc><lastmod>2006-10-23</lastmod></url>
+</urlset>"""
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>{url}/child.xml</loc><lastmod>2009-02-06</lastmod></sitemap>
+</sitemapindex>"""
+
+CHILD_SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>{url}/dated</loc><lastmod>2009-02-06</lastmod></url>
+<url><loc>{url}/failing</loc><lastmod>2009-02-06</lastmod></url>
+</urlset>"""
+
+
+def __entries(sitemap: str) -> list[dict]:
+    return list(Sitemap(sitemap.encode("utf-8")))
+
+
+def __record(index: SeenIndex, entries: list[dict]) -> None:
+    index.update_many(
+        (entry["loc"], parse_lastmod(entry.get("lastmod")))
+        for entry in entries
+    )
+
+
+def __crawl_in_subprocess(filename: str, server: LocalServer) -> dict:
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            CRAWL_SCRIPT,
+            filename,
+            server.url("/sitemap.xml"),
+        ],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    return json.loads(output)
+
+
+def __serve_sitemap(server: LocalServer, lastmod: str) -> None:
+    server.routes["/sitemap.xml"] = (
+        "application/xml",
+        SITEMAP.format(url=server.url(""), lastmod=lastmod).encode("utf-8"),
+    )
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_mixed_date_formats() -> None:
+    """Tests if the W3C datetime formats of the lastmod are parsed to the same
+    timestamps."""
+    assert (
+        parse_lastmod("2006-11-21")
+        == parse_lastmod("2006-11-21T00:00Z")
+        == parse_lastmod("2006-11-21T02:00:00.000+02:00")
+    ), "Equivalent dates were parsed differently."
+    assert (
+        parse_lastmod("2006") == parse_lastmod("2006-01") == 1136073600
+    ), "A partial date was not parsed."
+    assert parse_lastmod("2006-11-21T16:00:13+00:00") == parse_lastmod(
+        "2006-11-21T16:00:13"
+    ), "A time without timezone was not considered in UTC."
+    assert (
+        parse_lastmod("last week") is None and parse_lastmod(None) is None
+    ), "An invalid lastmod was not parsed as None."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_first_crawl() -> None:
+    """Tests if all the entries are kept when the index is empty."""
+    entries = __entries(SITEMAP_WITH_MULTIPLE_LINK)
+
+    with SeenIndex() as index:
+        assert (
+            list(index.filter_modified(entries)) == entries
+        ), "An entry was skipped by an empty index."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_unmodified_entries() -> None:
+    """Tests if the entries whose lastmod did not advance are skipped, and the
+    undated ones kept."""
+    entries = __entries(SITEMAP_WITH_MULTIPLE_LINK)
+
+    with SeenIndex() as index:
+        __record(index, entries)
+        modified_entries = list(index.filter_modified(entries))
+
+        assert len(index) == 4, "The URLs were not all recorded once."
+        assert (
+            len(modified_entries) == UNDATED_ENTRIES
+            and "lastmod" not in modified_entries[0]
+        ), "Another entry than the undated one was kept."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_ordering
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_advanced_lastmod() -> None:
+    """Tests if an entry is kept when its lastmod advances, but not when it
+    goes back."""
+    entries = __entries(SITEMAP_WITH_MULTIPLE_LINK)
+
+    with SeenIndex() as index:
+        __record(index, entries)
+
+        advanced_entries = __entries(
+            SITEMAP_WITH_MULTIPLE_LINK.replace(
+                "2006-11-21T16:00:13+00:00", "2006-11-21T16:00:14+00:00"
+            ).replace("2009-02-06", "2009-02-05")
+        )
+        assert [
+            entry["loc"]
+            for entry in index.filter_modified(advanced_entries)
+            if "lastmod" in entry
+        ] == [
+            "https://www.zoho.com/writer/collaborative-writing.html"
+        ], "The entries were not filtered on their advanced lastmod."
+
+        __record(index, advanced_entries)
+        assert index.get("http://www.google.com/") == parse_lastmod(
+            "2009-02-06"
+        ), "An older lastmod replaced the recorded one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.5)
+def test_persistence() -> None:
+    """Tests if the recorded URLs are found again after reopening the
+    index."""
+    entries = __entries(SITEMAP_WITH_MULTIPLE_LINK)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "seen.sqlite3")
+        with SeenIndex(filename) as index:
+            __record(index, entries)
+
+        with SeenIndex(filename) as index:
+            assert (
+                len(list(index.filter_modified(entries))) == UNDATED_ENTRIES
+            ), "The recorded URLs were lost."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(15)
+def test_incremental_crawl() -> None:
+    """Tests if a second crawl requests only the undated, failed and modified
+    pages."""
+    with LocalServer(
+        {
+            path: ("text/html", b"<html></html>")
+            for path in ("/dated", "/timed", "/undated")
+        }
+    ) as server, tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "seen.sqlite3")
+
+        __serve_sitemap(server, "2009-02-06")
+        __crawl_in_subprocess(filename, server)
+        __crawl_in_subprocess(filename, server)
+        assert [
+            server.count_requests(path)
+            for path in ("/dated", "/timed", "/undated", "/missing")
+        ] == [1, 1, 2, 2], "The unmodified pages were requested again."
+
+        __serve_sitemap(server, "2009-02-07")
+        stats = __crawl_in_subprocess(filename, server)
+        assert (
+            server.count_requests("/dated") == 2
+        ), "The modified page was not requested again."
+        assert (
+            stats.get("sitemap/unmodified_count") == 1
+        ), "The skipped entries were not counted in the stats."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(15)
+def test_failing_page_of_child_sitemap() -> None:
+    """Tests if a second crawl fetches the unmodified child sitemaps again,
+    and requests their pages whose callback failed."""
+    with LocalServer(
+        {
+            path: ("text/html", b"<html></html>")
+            for path in ("/dated", "/failing")
+        }
+    ) as server, tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "seen.sqlite3")
+        for path, sitemap in [
+            ("/sitemap.xml", SITEMAP_INDEX),
+            ("/child.xml", CHILD_SITEMAP),
+        ]:
+            server.routes[path] = (
+                "application/xml",
+                sitemap.format(url=server.url("")).encode("utf-8"),
+            )
+
+        __crawl_in_subprocess(filename, server)
+        __crawl_in_subprocess(filename, server)
+
+        assert (
+            server.count_requests("/child.xml") == 2
+        ), "The unmodified child sitemap was not fetched again."
+        assert (
+            server.count_requests("/failing") == 2
+        ), "The failing page was not requested again."
+        assert (
+            server.count_requests("/dated") == 1
+        ), "The unmodified page was requested again."
@@ -0,0 +1,308 @@
+"""Unit tests for scapy_unit_tests.crawler.ShardedCrawlerProcess and its
+frontier, scapy_unit_tests.frontier.Frontier
+
+Method type: Taking time to process
+N/A criteria:
+- Inverse relationship: The crawled pages cannot be reverted to the crawl
+    which fetched them.
+"""
+
+import datetime
+import json
+import os
+import subprocess
+import sys
+import typing
+
+import pytest
+from local_server import LocalServer, Routes
+
+from scapy_unit_tests.crawler import merge_stats
+from scapy_unit_tests.frontier import Frontier, PushedRequest
+
+HOSTS = ("127.0.0.1", "127.0.0.2", "127.0.0.3")
+PAGES_PER_HOST = 30
+SCALING_DELAY = 0.1
+SCALING_FACTOR = 1.5
+
+CRAWL_SCRIPT = """
+import json
+import sys
+
+from scrapy import Request, Spider
+
+from scapy_unit_tests.crawler import ShardedCrawlerProcess
+
+
+class HostsSpider(Spider):
+    name = "hosts"
+
+    def start_requests(self):
+        # Filtered, so that the start page is crawled once as the others
+        yield Request(sys.argv[2])
+
+    def parse(self, response):
+        self.crawler.stats.inc_value(f"pages/{response.url.split('/')[2]}")
+        for href in response.css("a::attr(href)").getall():
+            yield response.follow(href)
+
+
+process = ShardedCrawlerProcess(
+    {
+        "LOG_ENABLED": False,
+        "TELNETCONSOLE_ENABLED": False,
+        **json.loads(sys.argv[1]),
+    },
+    shards=int(sys.argv[3]),
+)
+process.crawl(HostsSpider)
+process.start()
+
+# From the opening of the first spider to the closing of the last one
+seconds = (
+    process.stats["finish_time"] - process.stats["start_time"]
+).total_seconds()
+print(
+    json.dumps(
+        {
+            "pages_per_second": (
+                process.stats["response_received_count"] / seconds
+            ),
+            "stats": process.stats,
+            "shard_stats": process.shard_stats,
+        },
+        default=str,
+    )
+)
+"""
+
+
+def __host_routes(servers: list[LocalServer], index: int) -> Routes:
+    # The first page links to all the pages of its host, which link back to
+    # it, and each page links to the same page of the next host, so that the
+    # pages are discovered by several shards.
+    next_server = servers[(index + 1) % len(servers)]
+    routes: Routes = {}
+    for page in range(PAGES_PER_HOST):
+        targets = range(PAGES_PER_HOST) if page == 0 else [0]
+        body = (
+            "<html><body>"
+            + "".join(
+                f"<a href='/pages/{target}'>Page {target}</a>"
+                for target in targets
+            )
+            + f"<a href='{next_server.url(f'/pages/{page}')}'>Other</a>"
+            + "</body></html>"
+        )
+        routes[f"/pages/{page}"] = ("text/html", body.encode("utf-8"))
+
+    return routes
+
+
+def __crawl_hosts(
+    shards: int, settings: dict, delay: float = 0
+) -> tuple[list[LocalServer], dict]:
+    servers = [LocalServer({}, delay, host) for host in HOSTS]
+    for index, server in enumerate(servers):
+        server.routes.update(__host_routes(servers, index))
+
+    for server in servers:
+        server.__enter__()
+    try:
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                CRAWL_SCRIPT,
+                json.dumps(settings),
+                servers[0].url("/pages/0"),
+                str(shards),
+            ],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+    finally:
+        for server in servers:
+            server.__exit__()
+
+    return servers, json.loads(output)
+
+
+def __pushed(host: str, fingerprint: typing.Optional[bytes]) -> PushedRequest:
+    return (host, fingerprint, {"url": f"http://{host}/"})
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_frontier_routing() -> None:
+    """Tests if the frontier deduplicates the requests and routes the ones of
+    a host to a single shard."""
+    frontier = Frontier(2)
+    frontier.push(
+        [
+            __pushed("a.com", b"1"),
+            __pushed("b.com", b"2"),
+            __pushed("a.com", b"1"),
+            __pushed("a.com", None),
+            __pushed("a.com", None),
+        ]
+    )
+
+    assert frontier.shards_by_host == {
+        "a.com": 0,
+        "b.com": 1,
+    }, "The hosts were not spread over the shards."
+    assert (
+        len(frontier.pop(0, 10)) == 3 and len(frontier.pop(1, 10)) == 1
+    ), "The requests were badly deduplicated or routed."
+    assert frontier.filtered_count == 1, "The filtered requests are not 1."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_ordering
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_frontier_termination() -> None:
+    """Tests if the crawl is finished only once all the shards are idle or
+    closed, with empty queues."""
+    frontier = Frontier(3)
+    frontier.close_shard(2)
+    frontier.pop(0, 1, idle=True)
+    assert not frontier.finished(), "A shard in progress was ignored."
+
+    frontier.push([__pushed("a.com", b"1")])
+    frontier.pop(1, 1, idle=True)
+    assert not frontier.finished(), "A queued request was ignored."
+
+    assert frontier.pop(0, 1, idle=True), "The queued request was lost."
+    assert not frontier.finished(), "The popped request was ignored."
+
+    frontier.pop(0, 1, idle=True)
+    assert frontier.finished(), "The idle shards were not finished."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_closed_shard() -> None:
+    """Tests if the requests queued for a shard stopping early are routed to
+    the open shards, and still deduplicated."""
+    frontier = Frontier(3)
+    frontier.push(
+        [
+            __pushed("a.com", b"1"),
+            __pushed("b.com", b"2"),
+            __pushed("c.com", b"3"),
+            __pushed("a.com", None),
+        ]
+    )
+    frontier.close_shard(0)
+
+    assert (
+        frontier.shards_by_host["a.com"] != 0
+    ), "The host of the closed shard was not assigned again."
+    assert (
+        len(frontier.pop(1, 10)) + len(frontier.pop(2, 10)) == 4
+    ), "The requests of the closed shard were lost."
+
+    frontier.push([__pushed("a.com", b"1")])
+    assert frontier.filtered_count == 1, "The routed request was not seen."
+
+    frontier.push([__pushed("b.com", b"4")])
+    frontier.close_shard(1)
+    frontier.close_shard(2)
+    assert frontier.finished(), "The requests of the closed shards were kept."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_merged_stats() -> None:
+    """Tests if the counts of the shards stats are summed, and their maxima
+    and times are bounded."""
+    start_time = datetime.datetime(2022, 1, 1)
+    finish_time = datetime.datetime(2022, 1, 2)
+
+    assert merge_stats(
+        [
+            {
+                "item_scraped_count": 2,
+                "request_depth_max": 4,
+                "start_time": finish_time,
+                "finish_time": start_time,
+                "finish_reason": "finished",
+            },
+            {
+                "item_scraped_count": 3,
+                "request_depth_max": 2,
+                "start_time": start_time,
+                "finish_time": finish_time,
+                "finish_reason": "shutdown",
+            },
+        ]
+    ) == {
+        "item_scraped_count": 5,
+        "request_depth_max": 4,
+        "start_time": start_time,
+        "finish_time": finish_time,
+        "finish_reason": "finished",
+    }, "The stats were badly merged."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(20)
+def test_sharded_crawl() -> None:
+    """Tests if a crawl sharded over three processes fetches every page
+    exactly once, each host from a single shard."""
+    servers, result = __crawl_hosts(3, {})
+
+    for server in servers:
+        assert sorted(server.requested_paths) == sorted(
+            server.routes
+        ), f"The pages of {server.url('')} were not all fetched once."
+    assert (
+        result["stats"]["response_received_count"]
+        == len(HOSTS) * PAGES_PER_HOST
+    ), "The merged stats don't count all the responses."
+
+    for server in servers:
+        host = server.url("").split("/")[2]
+        assert (
+            sum(f"pages/{host}" in stats for stats in result["shard_stats"])
+            == 1
+        ), f"{host} was crawled by several shards."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.crawlers_testing
+@pytest.mark.offline
+@pytest.mark.timeout(40)
+def test_throughput_scaling() -> None:
+    """Tests if the throughput of a crawl limited by the concurrency of each
+    process is multiplied when it is sharded over three processes."""
+    settings = {"CONCURRENT_REQUESTS": 2}
+    _, single_result = __crawl_hosts(1, settings, SCALING_DELAY)
+    _, sharded_result = __crawl_hosts(3, settings, SCALING_DELAY)
+
+    assert (
+        sharded_result["pages_per_second"]
+        > single_result["pages_per_second"] * SCALING_FACTOR
+    ), "The sharded crawl is not faster than the single process one."
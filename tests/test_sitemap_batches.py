@@ -0,0 +1,169 @@
+"""Unit tests for scapy_unit_tests.sitemap.iter_sitemap_batches
+
+Method type: Processing streams of bytes
+N/A criteria:
+- Inverse relationship: No method is exposed to return the initial sitemap
+    tree.
+"""
+
+import io
+
+import numpy
+import pytest
+from lxml.etree import XMLSyntaxError
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import (
+    EMPTY_URLSET_SITEMAP,
+    SITEMAP_WITH_MULTIPLE_LINK,
+    SITEMAP_WITH_ONE_LINK,
+)
+
+from scapy_unit_tests.sitemap import (
+    SitemapBatch,
+    iter_sitemap_batches,
+    parse_lastmod,
+)
+
+
+def __batches_rows(batches: list[SitemapBatch]) -> list[dict]:
+    return [dict(entry) for batch in batches for entry in batch.to_entries()]
+
+
+def __sitemap_rows(sitemap: str) -> list[dict]:
+    # The dicts of Sitemap, with the values parsed by SitemapEntry
+    rows = []
+    for entry in Sitemap(sitemap):
+        if "lastmod" in entry:
+            entry["lastmod"] = int(parse_lastmod(entry["lastmod"]) or 0)
+        if "priority" in entry:
+            entry["priority"] = float(entry["priority"])
+        rows.append(entry)
+
+    return rows
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_urlset() -> None:
+    """Tests if an empty sitemap is parsed into no batches."""
+    assert not list(
+        iter_sitemap_batches(EMPTY_URLSET_SITEMAP)
+    ), "Batches were returned despite the empty sitemap."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_1
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_sitemap_with_single_url() -> None:
+    """Tests if the batches of a sitemap with one URL hold the entry iterated
+    by Sitemap."""
+    assert __batches_rows(
+        list(iter_sitemap_batches(SITEMAP_WITH_ONE_LINK))
+    ) == __sitemap_rows(
+        SITEMAP_WITH_ONE_LINK
+    ), "The batched entry is different from the iterated one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_sitemap_with_many_urls() -> None:
+    """Tests if the batches of a sitemap with multiple URLs hold the entries
+    iterated by Sitemap, whatever the batch size."""
+    expected_rows = __sitemap_rows(SITEMAP_WITH_MULTIPLE_LINK)
+
+    for batch_size in range(1, len(expected_rows) + 2):
+        assert (
+            __batches_rows(
+                list(
+                    iter_sitemap_batches(
+                        SITEMAP_WITH_MULTIPLE_LINK, batch_size
+                    )
+                )
+            )
+            == expected_rows
+        ), f"The batches of {batch_size} entries are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_batch_size() -> None:
+    """Tests if the batches have at most the given number of entries."""
+    batches = list(iter_sitemap_batches(SITEMAP_WITH_MULTIPLE_LINK, 2))
+
+    assert [len(batch.loc) for batch in batches] == [
+        2,
+        2,
+        1,
+    ], "The batches don't have the given number of entries."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_missing_values() -> None:
+    """Tests if the missing values are null in the columns."""
+    (batch,) = iter_sitemap_batches(SITEMAP_WITH_MULTIPLE_LINK)
+
+    assert numpy.isnat(batch.lastmod).tolist() == [
+        False,
+        True,
+        False,
+        False,
+        False,
+    ], "The missing lastmods are not NaT."
+    assert numpy.isnan(batch.priority).tolist() == [
+        False,
+        True,
+        True,
+        False,
+        True,
+    ], "The missing priorities are not NaN."
+    assert batch.changefreq.tolist()[3:] == [
+        None,
+        None,
+    ], "The missing change frequencies are not None."
+    assert (
+        batch.alternate_offsets.tolist() == [0] * 6
+    ), "The offsets of the missing alternate links are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_parsing() -> None:
+    """Tests if an error is raised when giving an empty file."""
+    try:
+        list(iter_sitemap_batches(io.BytesIO(b"")))
+    except XMLSyntaxError:
+        pass
+    else:
+        assert False, "No error is raised when giving an empty file."
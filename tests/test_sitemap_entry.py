@@ -0,0 +1,182 @@
+"""Unit tests for scapy_unit_tests.sitemap.SitemapEntry, as yielded by
+scapy_unit_tests.sitemap.StreamingSitemap.entries
+
+Method type: Processing streams of bytes
+N/A criteria:
+- Inverse relationship: The raw lastmod and priority can't be retrieved from
+    their parsed values.
+- Error: No exception is documented for this method, the invalid values being
+    ignored.
+"""
+
+import tracemalloc
+import typing
+
+import pytest
+from generated_sitemap import generate_sitemap
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import SITEMAP_WITH_MULTIPLE_LINK
+
+from scapy_unit_tests.sitemap import (
+    SeenIndex,
+    SitemapEntry,
+    StreamingSitemap,
+    parse_lastmod,
+)
+
+MEMORY_SITEMAP_ENTRIES = 10000
+MEMORY_RATIO = 0.5
+
+SITEMAP_WITH_OTHER_CHILDREN = """
+<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+    xmlns:xhtml="http://www.w3.org/1999/xhtml"
+    xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+<url>
+<loc>http://www.example.com/english/</loc>
+<lastmod>yesterday</lastmod>
+<priority>high</priority>
+<xhtml:link rel="alternate" hreflang="de"
+    href="http://www.example.com/deutsch/"/>
+<image:image>http://www.example.com/image.jpg</image:image>
+</url>
+</urlset>"""
+
+
+def __parse_values(entry: dict) -> dict:
+    # The values of a dict of Sitemap, as parsed by SitemapEntry
+    entry = dict(entry)
+    if "lastmod" in entry:
+        entry["lastmod"] = int(parse_lastmod(entry["lastmod"]) or 0)
+    if "priority" in entry:
+        entry["priority"] = float(entry["priority"])
+
+    return entry
+
+
+def __retained_memory(
+    content: bytes, parse: typing.Callable[[StreamingSitemap], list]
+) -> int:
+    tracemalloc.start()
+    try:
+        entries = parse(StreamingSitemap(content))
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert (
+        len(entries) == MEMORY_SITEMAP_ENTRIES
+    ), "The entries of the sitemap were not all parsed."
+
+    return retained
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_parsed_values() -> None:
+    """Tests if the entries hold the values of the dicts of Sitemap, with the
+    lastmod and the priority parsed."""
+    entries = list(StreamingSitemap(SITEMAP_WITH_MULTIPLE_LINK).entries())
+
+    assert [dict(entry) for entry in entries] == [
+        __parse_values(entry) for entry in Sitemap(SITEMAP_WITH_MULTIPLE_LINK)
+    ], "The values of the entries are invalid."
+    assert isinstance(entries[0].lastmod, int) and isinstance(
+        entries[0].priority, float
+    ), "The lastmod and the priority were not parsed."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_conformance
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_mapping() -> None:
+    """Tests if an entry can be used as the dicts of Sitemap."""
+    entry = SitemapEntry(loc="http://www.google.com/", changefreq="monthly")
+
+    assert entry == {
+        "loc": "http://www.google.com/",
+        "changefreq": "monthly",
+    }, "The entry is not equal to its dict."
+    assert (
+        entry.get("lastmod") is None and "priority" not in entry
+    ), "The missing fields are in the entry."
+    assert (
+        isinstance(dict(entry), dict) and "loc" in dict(entry).keys()
+    ), "The entry can't be converted into a dict."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_upper
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_other_children() -> None:
+    """Tests if the alternate links and the other children are kept, and the
+    invalid values ignored."""
+    (entry,) = StreamingSitemap(SITEMAP_WITH_OTHER_CHILDREN).entries()
+
+    assert dict(entry) == {
+        "loc": "http://www.example.com/english/",
+        "alternate": ["http://www.example.com/deutsch/"],
+        "image": "http://www.example.com/image.jpg",
+    }, "The children of the entry are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cross_check
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_filtered_entries() -> None:
+    """Tests if the entries are filtered by SeenIndex as the dicts of
+    Sitemap."""
+    with SeenIndex() as index:
+        index.update("http://www.google.com/", parse_lastmod("2009-02-06"))
+        modified_entries = list(
+            index.filter_modified(
+                StreamingSitemap(SITEMAP_WITH_MULTIPLE_LINK).entries()
+            )
+        )
+        modified_dicts = list(
+            index.filter_modified(Sitemap(SITEMAP_WITH_MULTIPLE_LINK))
+        )
+
+    assert [entry["loc"] for entry in modified_entries] == [
+        entry["loc"] for entry in modified_dicts
+    ], "The entries are filtered differently than the dicts."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_retained_memory() -> None:
+    """Tests if the entries of a large sitemap take only a fraction of the
+    memory of its dicts."""
+    content = generate_sitemap(MEMORY_SITEMAP_ENTRIES)
+
+    entries_memory = __retained_memory(
+        content, lambda sitemap: list(sitemap.entries())
+    )
+    dicts_memory = __retained_memory(content, list)
+
+    assert (
+        entries_memory < dicts_memory * MEMORY_RATIO
+    ), "The entries take as much memory as the dicts."
@@ -0,0 +1,209 @@
+"""Unit tests for scapy_unit_tests.sitemap.StreamingSitemap.__iter__
+
+Method type: Processing streams of bytes
+N/A criteria:
+- Inverse relationship: No method is exposed to return the initial sitemap
+    tree.
+"""
+
+import gzip
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from lxml.etree import XMLSyntaxError
+from scrapy.utils.sitemap import Sitemap
+from test_sitemap_iter import (
+    EMPTY_URLSET_SITEMAP,
+    SITEMAP_WITH_MULTIPLE_LINK,
+    SITEMAP_WITH_ONE_LINK,
+)
+
+from scapy_unit_tests.sitemap import StreamingSitemap
+
+LARGE_SITEMAP_ENTRIES = 50000
+
+# The peak RSS is read from /proc, as ru_maxrss keeps the one of the parent
+# process across exec().
+MEMORY_MEASUREMENT_SCRIPT = """
+import sys
+
+from scrapy.utils.sitemap import Sitemap
+
+from scapy_unit_tests.sitemap import StreamingSitemap
+
+
+def get_peak_memory():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+before = get_peak_memory()
+if sys.argv[2] == "streaming":
+    with open(sys.argv[1], "rb") as file:
+        count = sum(1 for _ in StreamingSitemap(file))
+else:
+    with open(sys.argv[1], "rb") as file:
+        count = sum(1 for _ in Sitemap(file.read()))
+after = get_peak_memory()
+
+print(count, after - before)
+"""
+
+
+def __generate_sitemap(entries_count: int) -> bytes:
+    entries = "\n".join(
+        f"<url><loc>https://example.com/page/{index}</loc>"
+        "<lastmod>2009-02-06</lastmod><changefreq>monthly</changefreq>"
+        "<priority>0.9</priority></url>"
+        for index in range(entries_count)
+    )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<urlset'
+        ' xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        f"{entries}\n</urlset>"
+    ).encode("utf-8")
+
+
+def __split_in_chunks(content: bytes, size: int) -> list[bytes]:
+    return [content[i : i + size] for i in range(0, len(content), size)]
+
+
+def __measure_peak_memory(filename: str, mode: str) -> tuple[int, int]:
+    output = subprocess.check_output(
+        [sys.executable, "-c", MEMORY_MEASUREMENT_SCRIPT, filename, mode],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    count, memory = output.split()
+
+    return int(count), int(memory)
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_0
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_urlset() -> None:
+    """Tests if an empty sitemap is streamed like Sitemap iterates it."""
+    sitemap = StreamingSitemap(EMPTY_URLSET_SITEMAP)
+
+    assert sitemap.type == "urlset", "The sitemap's type is invalid."
+    assert (
+        list(sitemap) == []
+    ), "Nodes were returned despite the empty sitemap."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_1
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_sitemap_with_single_url() -> None:
+    """Tests if a sitemap with one URL is streamed like Sitemap iterates it."""
+    nodes = list(StreamingSitemap(SITEMAP_WITH_ONE_LINK))
+
+    assert nodes == list(
+        Sitemap(SITEMAP_WITH_ONE_LINK)
+    ), "The streamed element is different from the iterated one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.principle_conformance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_valid_sitemap_with_many_urls() -> None:
+    """Tests if a sitemap with multiple URLs is streamed like Sitemap iterates
+    it."""
+    nodes = list(StreamingSitemap(SITEMAP_WITH_MULTIPLE_LINK))
+
+    assert nodes == list(
+        Sitemap(SITEMAP_WITH_MULTIPLE_LINK)
+    ), "The streamed elements are different from the iterated ones."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_gzipped_chunks() -> None:
+    """Tests if a gzipped sitemap arriving in small chunks is streamed
+    correctly."""
+    compressed = gzip.compress(SITEMAP_WITH_MULTIPLE_LINK.encode("utf-8"))
+    chunks = __split_in_chunks(compressed, 7)
+
+    nodes = list(StreamingSitemap(iter(chunks), chunk_size=16))
+
+    assert nodes == list(
+        Sitemap(SITEMAP_WITH_MULTIPLE_LINK)
+    ), "The elements streamed from gzipped chunks are invalid."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_empty_parsing() -> None:
+    """Tests if an error is raised when giving an empty file."""
+    try:
+        StreamingSitemap(io.BytesIO(b""))
+    except XMLSyntaxError:
+        pass
+    else:
+        assert False, "No error is raised when giving an empty file."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_cardinality_n
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.sitemap_testing
+@pytest.mark.offline
+@pytest.mark.timeout(10)
+def test_bounded_memory() -> None:
+    """Tests if streaming a large gzipped sitemap takes only a fraction of the
+    memory needed by Sitemap."""
+    content = __generate_sitemap(LARGE_SITEMAP_ENTRIES)
+
+    with tempfile.NamedTemporaryFile(suffix=".xml.gz") as compressed:
+        compressed.write(gzip.compress(content))
+        compressed.flush()
+        streamed_count, streamed_memory = __measure_peak_memory(
+            compressed.name, "streaming"
+        )
+
+    with tempfile.NamedTemporaryFile(suffix=".xml") as uncompressed:
+        uncompressed.write(content)
+        uncompressed.flush()
+        parsed_count, parsed_memory = __measure_peak_memory(
+            uncompressed.name, "tree"
+        )
+
+    assert (
+        streamed_count == parsed_count == LARGE_SITEMAP_ENTRIES
+    ), "Not all the entries of the large sitemap were returned."
+    assert streamed_memory * 4 < parsed_memory, (
+        "The streaming parser does not use substantially less memory than"
+        " the tree-based one."
+    )
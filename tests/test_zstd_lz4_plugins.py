@@ -0,0 +1,197 @@
+"""Unit tests for ZstdPlugin and LZ4Plugin's write() from
+scapy_unit_tests.postprocessing
+
+Methods type: Returning an integer
+"""
+
+import tempfile
+import typing
+
+import lz4.frame
+import pytest
+import zstandard
+
+from scapy_unit_tests.postprocessing import LZ4Plugin, ZstdPlugin
+
+JSON_LINE = b'{"url": "https://example.com/", "title": "Example"}\n'
+
+
+def zstd_wrapper(
+    filename: str,
+    data: bytes,
+    feed_options: typing.Optional[dict[str, typing.Any]] = None,
+) -> int:
+    with open(filename, "wb") as file:
+        plugin = ZstdPlugin(file, feed_options=feed_options or {})
+        return_code = plugin.write(data)
+        plugin.close()
+
+        return return_code
+
+
+def lz4_wrapper(filename: str, data: bytes) -> int:
+    with open(filename, "wb") as file:
+        plugin = LZ4Plugin(file, feed_options={"lz4_compression_level": 9})
+        return_code = plugin.write(data)
+        plugin.close()
+
+        return return_code
+
+
+def unzstd(
+    filename: str,
+    dict_data: typing.Optional[zstandard.ZstdCompressionDict] = None,
+) -> bytes:
+    with open(filename, "rb") as file:
+        return (
+            zstandard.ZstdDecompressor(dict_data=dict_data)
+            .stream_reader(file)
+            .read()
+        )
+
+
+def unlz4(filename: str) -> bytes:
+    return lz4.frame.open(filename).read()
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_zstd_valid_content() -> None:
+    """Tests if the content is written correctly into the Zstandard file."""
+    data = b"data"
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_code = zstd_wrapper(temp.name, data)
+        assert return_code == len(
+            data
+        ), "The written size for Zstd is invalid."
+
+        uncompressed_content = unzstd(temp.name)
+        assert (
+            data == uncompressed_content
+        ), "The written data for Zstd is different from the original one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_lz4_valid_content() -> None:
+    """Tests if the content is written correctly into the LZ4 file."""
+    data = b"data"
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_code = lz4_wrapper(temp.name, data)
+        assert return_code == len(data), "The written size for LZ4 is invalid."
+
+        uncompressed_content = unlz4(temp.name)
+        assert (
+            data == uncompressed_content
+        ), "The written data for LZ4 is different from the original one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_inverse
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(1)
+def test_zstd_threads_and_dictionary() -> None:
+    """Tests if the content compressed with threads and a dictionary is
+    decompressed with the same dictionary."""
+    data = JSON_LINE * 10000
+    dict_data = zstandard.ZstdCompressionDict(JSON_LINE * 8)
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        zstd_wrapper(
+            temp.name,
+            data,
+            {"zstd_level": 19, "zstd_threads": 2, "zstd_dict": dict_data},
+        )
+
+        uncompressed_content = unzstd(temp.name, dict_data)
+        assert (
+            data == uncompressed_content
+        ), "The written data for Zstd is different from the original one."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_zstd_zero_length() -> None:
+    """Tests if length 0 is returned when passing an empty input to Zstd."""
+    data = b""
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_code = zstd_wrapper(temp.name, data)
+        assert (
+            return_code == 0
+        ), "Zstd size is non-0, despite the empty content."
+        assert unzstd(temp.name) == b"", "The Zstd file is not empty."
+
+
+@pytest.mark.principle_right
+@pytest.mark.principle_range_lower
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_lz4_zero_length() -> None:
+    """Tests if length 0 is returned when passing an empty input to LZ4."""
+    data = b""
+
+    with tempfile.NamedTemporaryFile("wb", delete=False) as temp:
+        return_code = lz4_wrapper(temp.name, data)
+        assert (
+            return_code == 0
+        ), "LZ4 size is non-0, despite the empty content."
+        assert unlz4(temp.name) == b"", "The LZ4 file is not empty."
+
+
+@pytest.mark.principle_existence
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_zstd_inexistent_file() -> None:
+    """Tests if an generic exception is raised when passing an inexistent file
+    to Zstd.
+    """
+    try:
+        zstd_wrapper("/path/to/no/file", b"exception")
+    except Exception:
+        pass
+    else:
+        assert (
+            False
+        ), "No exception was raised when processing an inexistent Zstd file."
+
+
+@pytest.mark.principle_existence
+@pytest.mark.principle_error
+@pytest.mark.principle_time
+@pytest.mark.principle_performance
+@pytest.mark.offline
+@pytest.mark.timeout(0.1)
+def test_lz4_inexistent_file() -> None:
+    """Tests if an generic exception is raised when passing an inexistent file
+    to LZ4.
+    """
+    try:
+        lz4_wrapper("/path/to/no/file", b"exception")
+    except Exception:
+        pass
+    else:
+        assert (
+            False
+        ), "No exception was raised when processing an inexistent LZ4 file."